@@ -0,0 +1,316 @@
+"""
+Benchmark the per-frame pipeline without a camera.
+
+Runs VisionProcessor over synthetic frames and reports FPS, p95 frame time
+and how the frame time splits between the optional motion gate, BGR->RGB
+conversion, inference,
+annotation (post-processing and drawing) and the UI overlay. With the
+default fake backend inference costs nothing, so the numbers show the
+cost of everything downstream of MediaPipe.
+
+    python benchmark.py                          # fake backend, all modes
+    python benchmark.py --backend legacy --modes hands face
+    python benchmark.py --check-allocations      # fail if the hot path allocates frames
+    python benchmark.py --motion-gate            # static frames: report skipped inference
+    python benchmark.py --runtime-profile split  # OpenCV threads and CPU pinning
+    python benchmark.py --sweep-profiles         # every built-in profile, one process each
+    python benchmark.py --trace trace.json       # Chrome trace of the run (chrome://tracing, Perfetto)
+    python benchmark.py --hands 4 --modes gestures  # four tracked hands in a changing order
+    python benchmark.py --backend legacy --modes multipose  # fps per number of people in view
+
+Thread counts and CPU affinity are inherited by threads when they are
+created, so a sweep runs each profile in a fresh process. The graphs are
+built on a thread pinned to the profile's inference CPUs and the frame
+loop runs pinned to its render CPUs, as in main.py. There is no camera,
+so the capture CPUs are not used.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.buffer_pool import FRAME_POOL
+from src.latency import percentile
+from src.motion_gate import MotionGate
+from src.inference import create_backend
+from src.processor import VisionProcessor
+from src.runtime_profile import RuntimeProfile, builtin_profiles
+from src.tracing import TRACER
+from src.utils import draw_text_with_background
+
+MODES = ['hands', 'count', 'draw', 'gestures', 'face', 'pose', 'multipose', 'segment', 'none']
+STAGES = ['gate', 'convert', 'inference', 'annotate', 'overlay']
+
+
+def make_frame(width, height, seed=0):
+    """Create a deterministic textured BGR frame."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (height // 16 + 1, width // 16 + 1, 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.repeat(np.repeat(small, 16, axis=0), 16, axis=1)[:height, :width])
+
+
+def run_mode(processor, mode, source, frames, fps=30.0, check_allocations=False):
+    """Run one mode for a number of frames.
+
+    Args:
+        processor: VisionProcessor
+        mode: Mode to benchmark
+        source: BGR frame copied into a pooled buffer for every iteration
+                (like WebcamStream.read_timestamped in main.py)
+        frames: Number of frames to time (after a short warm-up)
+        fps: Nominal frame rate used for the synthetic timestamps
+        check_allocations: Track the peak traced memory of every steady-state
+                           frame with tracemalloc
+
+    Returns:
+        dict: fps, mean_ms, p95_ms, the mean ms spent in each stage,
+              for 'multipose' the fps per number of people in view
+              (by_people) and, when checking allocations, max_peak_bytes
+              and pool_allocations (new pool buffers created after the warm-up)
+    """
+    processor.set_mode(mode)
+    frame_times = []
+    stage_totals = dict.fromkeys(STAGES, 0.0)
+    warmup = min(20, frames)
+    max_peak = 0
+    pool_allocations = 0
+    by_people = {}
+
+    for i in range(frames + warmup):
+        if check_allocations and i == warmup:
+            pool_allocations = FRAME_POOL.allocations
+        if check_allocations and i >= warmup:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        frame = FRAME_POOL.acquire_like(source)
+        np.copyto(frame, source)
+        start = time.perf_counter()
+        processed = processor.process(frame, i / fps)
+        overlay_start = time.perf_counter()
+        draw_text_with_background(processed, f"Mode: {mode.upper()}", (20, 40))
+        draw_text_with_background(processed, "FPS: 0", (20, 80))
+        end = time.perf_counter()
+        FRAME_POOL.release(processed)
+        TRACER.end_frame(start, {'mode': mode, 'frame': i})
+
+        if i < warmup:
+            continue
+        if check_allocations:
+            max_peak = max(max_peak, tracemalloc.get_traced_memory()[1] - baseline)
+        frame_times.append(end - start)
+        if mode == 'multipose':
+            by_people.setdefault(processor.people_in_view, []).append(end - start)
+        for stage in ('gate', 'convert', 'inference', 'annotate'):
+            stage_totals[stage] += processor.timings[stage]
+        stage_totals['overlay'] += end - overlay_start
+
+    mean = sum(frame_times) / len(frame_times)
+    report = {
+        'fps': 1.0 / mean if mean > 0 else 0.0,
+        'mean_ms': mean * 1000,
+        'p95_ms': percentile(frame_times, 95) * 1000
+    }
+    for stage in STAGES:
+        report[stage] = stage_totals[stage] / len(frame_times) * 1000
+    if by_people:
+        report['by_people'] = {people: len(times) / sum(times)
+                               for people, times in sorted(by_people.items())}
+    if check_allocations:
+        report['max_peak_bytes'] = max_peak
+        report['pool_allocations'] = FRAME_POOL.allocations - pool_allocations
+    return report
+
+
+def check_allocation_report(results, width, height):
+    """Check that no steady-state frame allocated a frame-sized buffer.
+
+    Args:
+        results: Reports from run_mode(..., check_allocations=True)
+        width: Frame width
+        height: Frame height
+
+    Returns:
+        bool: True if every mode passed
+    """
+    # Anything smaller than one single-channel frame is bookkeeping, not a frame copy
+    limit = width * height
+    passed = True
+    print(f"\nAllocation check (limit {limit / 1024:.0f} KiB per frame):")
+    for mode, report in results.items():
+        ok = report['max_peak_bytes'] < limit and report['pool_allocations'] == 0
+        passed = passed and ok
+        print(f"{mode:<10} peak {report['max_peak_bytes'] / 1024:8.1f} KiB, "
+              f"new pool buffers {report['pool_allocations']:3d}  {'ok' if ok else 'FAIL'}")
+    return passed
+
+
+def print_report(results):
+    header = f"{'mode':<10} {'fps':>8} {'mean ms':>8} {'p95 ms':>8} " + " ".join(
+        f"{stage:>10}" for stage in STAGES)
+    print(header)
+    print("-" * len(header))
+    for mode, report in results.items():
+        total = sum(report[stage] for stage in STAGES) or 1.0
+        shares = " ".join(f"{report[stage] / total * 100:9.1f}%" for stage in STAGES)
+        print(f"{mode:<10} {report['fps']:8.1f} {report['mean_ms']:8.2f} {report['p95_ms']:8.2f} {shares}")
+
+
+def build_processor(args, runtime_profile=None):
+    """Create the processor, building its graphs on the inference CPUs of a profile."""
+    kwargs = {'backend': args.backend, 'model_dir': args.model_dir, 'max_num_hands': args.hands,
+              'max_num_people': args.people}
+    if args.backend == 'fake':
+        # Synthesise the requested number of hands, in a changing order, and people
+        kwargs['backend'] = create_backend('fake', num_hands=args.hands, swap_hands=args.hands > 1,
+                                           num_people=args.people)
+    if runtime_profile is None:
+        return VisionProcessor(**kwargs)
+
+    def build():
+        runtime_profile.pin('inference')
+        return VisionProcessor(**kwargs)
+
+    with ThreadPoolExecutor(1, thread_name_prefix='inference') as executor:
+        return executor.submit(build).result()
+
+
+def sweep_profiles(args):
+    """Run the benchmark once per runtime profile, each in its own process.
+
+    Returns:
+        dict: Profile name -> {'layout': ..., 'results': ...}
+    """
+    names = args.sweep_profiles or list(builtin_profiles())
+    forwarded = ['--backend', args.backend, '--frames', str(args.frames),
+                 '--resolution', args.resolution, '--hands', str(args.hands), '--people', str(args.people),
+                 '--modes', *args.modes]
+    if args.model_dir:
+        forwarded += ['--model-dir', args.model_dir]
+
+    sweep = {}
+    for name in names:
+        print(f"Profile {name}...", flush=True)
+        command = [sys.executable, __file__, '--runtime-profile', name, '--json', *forwarded]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"  failed (exit {completed.returncode}): {completed.stderr.strip()[-500:]}")
+            continue
+        sweep[name] = json.loads(lines[-1])
+    return sweep
+
+
+def print_sweep(sweep):
+    print(f"\n{'profile':<10} {'mode':<10} {'fps':>8} {'p95 ms':>8}  layout")
+    print("-" * 78)
+    for name, run in sweep.items():
+        layout = run['layout']
+        threads = ", ".join(f"{role} {entry['cpus']}" for role, entry in layout['threads'].items())
+        placement = f"cv {layout['cv_threads']}, {threads}"
+        for mode, report in run['results'].items():
+            print(f"{name:<10} {mode:<10} {report['fps']:8.1f} {report['p95_ms']:8.2f}  {placement}")
+            placement = ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Vision Pro frame pipeline")
+    parser.add_argument('--backend', choices=['fake', 'legacy', 'tasks'], default='fake',
+                        help="Inference backend (default: fake, i.e. no inference cost)")
+    parser.add_argument('--model-dir', help="Model cache directory (tasks backend models, multipose person detector)")
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES, help="Modes to benchmark")
+    parser.add_argument('--frames', type=int, default=300, help="Frames per mode")
+    parser.add_argument('--resolution', default='640x480', help="Frame size as WIDTHxHEIGHT")
+    parser.add_argument('--hands', type=int, default=1,
+                        help="Hands to detect and track (the fake backend synthesises this many)")
+    parser.add_argument('--people', type=int, default=4,
+                        help="Maximum people in multipose mode (the fake backend cycles from one to this many)")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="Skip inference on static frames and report the skip ratio")
+    parser.add_argument('--motion-roi', action=argparse.BooleanOptionalAction, default=True,
+                        help="With --motion-gate, gate on the landmark area only "
+                             "(--no-motion-roi: whole frame)")
+    parser.add_argument('--check-allocations', action='store_true',
+                        help="Fail if a steady-state frame allocates a frame-sized buffer")
+    parser.add_argument('--runtime-profile', type=RuntimeProfile.from_spec,
+                        help="Built-in runtime profile or spec (see src/runtime_profile.py)")
+    parser.add_argument('--sweep-profiles', nargs='*',
+                        help="Benchmark each runtime profile in a separate process "
+                             "(default: every built-in profile)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Record spans and write them as Chrome trace JSON to PATH")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the results and runtime layout as one JSON line at the end")
+    args = parser.parse_args()
+
+    if args.sweep_profiles is not None:
+        print_sweep(sweep_profiles(args))
+        return
+
+    runtime_profile = args.runtime_profile
+    if runtime_profile is not None:
+        runtime_profile.apply_process()
+        runtime_profile.pin('render')
+
+    if args.trace:
+        TRACER.enable()
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    processor = build_processor(args, runtime_profile)
+    source = make_frame(width, height)
+
+    print(f"Backend: {args.backend}, {width}x{height}, {args.frames} frames per mode")
+    print("Stage columns show each stage's share of the frame time.\n")
+    if args.check_allocations:
+        tracemalloc.start()
+    results = {}
+    for mode in args.modes:
+        if args.motion_gate:
+            processor.motion_gate = MotionGate(use_roi=args.motion_roi)
+        results[mode] = run_mode(processor, mode, source, args.frames,
+                                 check_allocations=args.check_allocations)
+        if args.motion_gate:
+            results[mode]['motion_gate'] = processor.motion_gate.get_stats()
+    print_report(results)
+
+    if 'by_people' in results.get('multipose', {}):
+        throughput = ", ".join(f"{people} in view {fps:.1f} fps"
+                               for people, fps in results['multipose']['by_people'].items())
+        print(f"\nMulti-person pose: {throughput}")
+
+    tracker = processor.hand_tracker.get_stats()
+    if tracker['updates']:
+        print(f"\nHand tracking: {tracker['max_hands_seen']} hands, {tracker['ids_assigned']} IDs "
+              f"assigned, {tracker['mean_update_us']:.1f} us per update")
+
+    if 'segment' in results:
+        segment = processor.segmenter.get_stats()
+        print(f"\nSegment mask: {segment['mask_updates']} upsampled, reused on "
+              f"{segment['reuse_ratio'] * 100:.1f}% of frames")
+
+    if args.motion_gate:
+        print("\nMotion gate:")
+        for mode, report in results.items():
+            gate = report['motion_gate']
+            print(f"{mode:<10} skipped {gate['skip_ratio'] * 100:5.1f}% of frames, "
+                  f"gate {gate['gate_ms']:.3f} ms/frame, saved {gate['saved_pct']:5.1f}% of inference time")
+
+    stats = FRAME_POOL.get_stats()
+    print(f"\nBuffer pool: {stats['allocations']} buffers allocated "
+          f"({stats['bytes_allocated'] / 1e6:.1f} MB), {stats['reuses']} reuses")
+    if args.check_allocations:
+        tracemalloc.stop()
+        if not check_allocation_report(results, width, height):
+            sys.exit(1)
+    if args.trace:
+        print(f"Trace written to {TRACER.dump(args.trace)}")
+    if args.json:
+        layout = runtime_profile.layout if runtime_profile is not None else None
+        print(json.dumps({'layout': layout, 'results': results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,82 @@
-import urllib.request
+import argparse
 import os
+import urllib.request
+from src.model_cache import (MODELS, DEFAULT_MODEL_DIR, ModelCacheError, expected_checksum,
+                             record_checksum, sha256_of_file, verify_file)
+
+def download_model(name, model_dir, trust_unpinned=False):
+    """Download a model file if it doesn't exist and verify it against its pin.
+
+    Args:
+        name: Key in MODELS
+        model_dir: Model cache directory
+        trust_unpinned: Accept (and record) a model that has no pinned
+                        checksum, trusting whatever file is found or downloaded
 
-# Model URLs
-HAND_LANDMARKER_URL = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
-FACE_LANDMARKER_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
+    Returns:
+        bool: True if the model is present and matches its checksum
+    """
+    info = MODELS[name]
+    filename = info['filename']
+    path = os.path.join(model_dir, filename)
+    pinned = info['sha256']
+
+    if os.path.exists(path):
+        try:
+            digest = verify_file(name, path, model_dir)
+        except ModelCacheError as e:
+            print(f"✗ {e}; delete it and download again")
+            return False
+        if expected_checksum(name, model_dir) is not None:
+            print(f"✓ {filename} already exists (checksum verified)")
+            return True
+        if not trust_unpinned:
+            print(f"✗ {filename} has no pinned checksum (sha256 {digest}); pin it in MODELS "
+                  f"or rerun with --trust-unpinned")
+            return False
+        record_checksum(filename, digest, model_dir)
+        print(f"! {filename} already exists and is now trusted without a pin (sha256 {digest})")
+        return True
+
+    if not pinned and not trust_unpinned:
+        print(f"✗ {filename} has no pinned checksum; pin it in MODELS or rerun with --trust-unpinned")
+        return False
 
-def download_model(url, filename):
-    """Download a model file if it doesn't exist."""
-    if os.path.exists(filename):
-        print(f"✓ {filename} already exists")
-        return
-    
     print(f"Downloading {filename}...")
+    tmp_path = path + '.part'
     try:
-        urllib.request.urlretrieve(url, filename)
-        print(f"✓ Downloaded {filename}")
+        urllib.request.urlretrieve(info['url'], tmp_path)
+        digest = sha256_of_file(tmp_path)
+        if pinned and digest != pinned:
+            raise ModelCacheError(f"checksum mismatch (expected {pinned}, got {digest})")
+        os.replace(tmp_path, path)
+        if pinned:
+            print(f"✓ Downloaded {filename} (sha256 {digest[:12]}... matches its pin)")
+        else:
+            record_checksum(filename, digest, model_dir)
+            print(f"! Downloaded {filename} without a pin; trusting sha256 {digest}")
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         print(f"✗ Failed to download {filename}: {e}")
+        return False
+    return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download MediaPipe Tasks models into the local cache")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Model cache directory")
+    parser.add_argument('--trust-unpinned', action='store_true',
+                        help="Accept models without a pinned checksum and record the digest "
+                             "of the file found or downloaded (trust on first use)")
+    args = parser.parse_args()
+
+    os.makedirs(args.model_dir, exist_ok=True)
     print("Downloading MediaPipe model files...")
-    download_model(HAND_LANDMARKER_URL, "hand_landmarker.task")
-    download_model(FACE_LANDMARKER_URL, "face_landmarker.task")
-    print("\nAll models downloaded successfully!")
+    ok = all([download_model(name, args.model_dir, args.trust_unpinned) for name in MODELS])
+    if ok:
+        print("\nAll models downloaded successfully!")
+    else:
+        print("\nSome models could not be downloaded.")
+        if not args.trust_unpinned and any(info['sha256'] is None for info in MODELS.values()):
+            print("Models without a pinned checksum need --trust-unpinned "
+                  "(their first download is trusted and its digest recorded).")
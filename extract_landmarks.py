@@ -0,0 +1,286 @@
+"""
+Extract landmarks from image collections into sharded NPZ files.
+
+Walks a directory tree, decodes images on a thread pool and runs the
+MediaPipe graphs in static image mode on a process pool. Results are
+written in columns (one array per field, one row per image) to
+shard_NNNNN.npz files, listed in manifest.json. Re-running the same
+command skips every image already recorded in the manifest, so an
+interrupted job resumes where it stopped.
+
+    python extract_landmarks.py photos/ --output dataset/ --graphs hands
+    python extract_landmarks.py photos/ --output dataset/ --graphs hands face pose --workers 8
+
+Shard columns:
+    path             (N,) image path relative to the input directory
+    ok               (N,) False if the image could not be decoded
+    width, height    (N,) image size before any --max-side downscaling
+    hands            (N, H, 21, 3) float32, NaN where no hand was found
+    handedness       (N, H) 'Left'/'Right', '' where no hand was found
+    handedness_score (N, H) float32
+    face             (N, F, 478, 3) float32, NaN where no face was found
+    pose             (N, 33, 4) float32 (x, y, z, visibility), NaN without a person
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+MANIFEST = 'manifest.json'
+
+# Landmark array shape of every graph, without the leading image axis
+HAND_POINTS = 21
+FACE_POINTS = 478
+POSE_POINTS = 33
+
+
+def find_images(root):
+    """Return image paths under root, relative to it, in a stable order."""
+    paths = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(directory, name), root))
+    return paths
+
+
+def decode_image(root, path, max_side=None):
+    """Read an image as RGB, optionally downscaled so its longest side is max_side.
+
+    Returns:
+        tuple: (rgb image or None if unreadable, (width, height) of the original)
+    """
+    image = cv2.imread(os.path.join(root, path), cv2.IMREAD_COLOR)
+    if image is None:
+        return None, (0, 0)
+    h, w = image.shape[:2]
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        image = cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB), (w, h)
+
+
+# Per-process inference state, created by _init_worker
+_backend = None
+_graphs = ()
+
+
+def _init_worker(backend_name, graphs, max_num_hands, max_num_faces):
+    global _backend, _graphs
+    from src.inference import create_backend
+    kwargs = {'max_num_hands': max_num_hands, 'max_num_faces': max_num_faces}
+    if backend_name == 'legacy':
+        kwargs['static_image_mode'] = True
+    _backend = create_backend(backend_name, **kwargs)
+    _graphs = graphs
+    for name in graphs:
+        _backend.build(name)
+
+
+def _to_array(landmark_list, columns=3):
+    if columns == 4:
+        return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark],
+                        dtype=np.float32)
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmark_list.landmark], dtype=np.float32)
+
+
+def extract(image_rgb, max_num_hands, max_num_faces):
+    """Run every configured graph on one image (in a worker process).
+
+    Returns:
+        dict: One row of every column for the configured graphs
+    """
+    row = {}
+    if 'hands' in _graphs:
+        hands = np.full((max_num_hands, HAND_POINTS, 3), np.nan, dtype=np.float32)
+        labels = [''] * max_num_hands
+        scores = np.zeros(max_num_hands, dtype=np.float32)
+        result = _backend.process('hands', image_rgb, 0.0)
+        if result is not None and result.multi_hand_landmarks:
+            found = zip(result.multi_hand_landmarks, result.multi_handedness)
+            for i, (landmarks, handedness) in enumerate(list(found)[:max_num_hands]):
+                hands[i] = _to_array(landmarks)
+                labels[i] = handedness.classification[0].label
+                scores[i] = handedness.classification[0].score
+        row.update(hands=hands, handedness=labels, handedness_score=scores)
+    if 'face' in _graphs:
+        faces = np.full((max_num_faces, FACE_POINTS, 3), np.nan, dtype=np.float32)
+        result = _backend.process('face', image_rgb, 0.0)
+        if result is not None and result.multi_face_landmarks:
+            for i, landmarks in enumerate(result.multi_face_landmarks[:max_num_faces]):
+                faces[i] = _to_array(landmarks)
+        row['face'] = faces
+    if 'pose' in _graphs:
+        pose = np.full((POSE_POINTS, 4), np.nan, dtype=np.float32)
+        result = _backend.process('pose', image_rgb, 0.0)
+        if result is not None and result.pose_landmarks:
+            pose[:] = _to_array(result.pose_landmarks, columns=4)
+        row['pose'] = pose
+    return row
+
+
+class ShardWriter:
+    """Collects rows and writes them as columnar NPZ shards plus a manifest."""
+
+    def __init__(self, output_dir, graphs, max_num_hands, max_num_faces, shard_size=1000):
+        self.output_dir = output_dir
+        self.graphs = list(graphs)
+        self.max_num_hands = max_num_hands
+        self.max_num_faces = max_num_faces
+        self.shard_size = shard_size
+        self.manifest_path = os.path.join(output_dir, MANIFEST)
+        self.manifest = {'graphs': self.graphs, 'max_num_hands': max_num_hands,
+                         'max_num_faces': max_num_faces, 'shards': []}
+        self.rows = []
+
+        os.makedirs(output_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                existing = json.load(f)
+            for key in ('graphs', 'max_num_hands', 'max_num_faces'):
+                if existing[key] != self.manifest[key]:
+                    raise ValueError(f"{self.manifest_path} was written with {key}={existing[key]}, "
+                                     f"not {self.manifest[key]}; use another output directory")
+            self.manifest = existing
+
+    def done_paths(self):
+        """Paths already stored in a shard."""
+        done = set()
+        for shard in self.manifest['shards']:
+            done.update(shard['paths'])
+        return done
+
+    def add(self, path, size, row):
+        """Add one image; row is None if the image could not be decoded."""
+        self.rows.append((path, size, row))
+        if len(self.rows) >= self.shard_size:
+            self.flush()
+
+    def _empty_row(self):
+        row = {}
+        if 'hands' in self.graphs:
+            row.update(hands=np.full((self.max_num_hands, HAND_POINTS, 3), np.nan, dtype=np.float32),
+                       handedness=[''] * self.max_num_hands,
+                       handedness_score=np.zeros(self.max_num_hands, dtype=np.float32))
+        if 'face' in self.graphs:
+            row['face'] = np.full((self.max_num_faces, FACE_POINTS, 3), np.nan, dtype=np.float32)
+        if 'pose' in self.graphs:
+            row['pose'] = np.full((POSE_POINTS, 4), np.nan, dtype=np.float32)
+        return row
+
+    def flush(self):
+        """Write the pending rows as a new shard and update the manifest."""
+        if not self.rows:
+            return
+        rows = [row if row is not None else self._empty_row() for _, _, row in self.rows]
+        columns = {
+            'path': np.array([path for path, _, _ in self.rows]),
+            'ok': np.array([row is not None for _, _, row in self.rows]),
+            'width': np.array([size[0] for _, size, _ in self.rows], dtype=np.int32),
+            'height': np.array([size[1] for _, size, _ in self.rows], dtype=np.int32)
+        }
+        for key in rows[0]:
+            columns[key] = np.stack([np.asarray(row[key]) for row in rows])
+
+        name = f"shard_{len(self.manifest['shards']):05d}.npz"
+        np.savez_compressed(os.path.join(self.output_dir, name), **columns)
+        self.manifest['shards'].append({'file': name, 'count': len(self.rows),
+                                        'paths': [path for path, _, _ in self.rows]})
+        # Replace the manifest atomically so an interrupted run never leaves it half written
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self.rows = []
+
+
+def run(args):
+    writer = ShardWriter(args.output, args.graphs, args.max_num_hands, args.max_num_faces,
+                         args.shard_size)
+    all_paths = find_images(args.input)
+    done = writer.done_paths()
+    todo = [path for path in all_paths if path not in done]
+    print(f"{len(all_paths)} images found, {len(all_paths) - len(todo)} already extracted, "
+          f"{len(todo)} to go")
+    if not todo:
+        return
+
+    # Bounded number of images in flight, so memory does not grow with the collection
+    window = args.workers * 4
+    paths = iter(todo)
+    decoding = deque()
+    inferring = deque()
+    processed = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(args.decode_threads) as decoders, \
+            ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                initargs=(args.backend, tuple(args.graphs),
+                                          args.max_num_hands, args.max_num_faces)) as workers:
+
+        def decode_next():
+            path = next(paths, None)
+            if path is not None:
+                decoding.append((path, decoders.submit(decode_image, args.input, path, args.max_side)))
+
+        for _ in range(window):
+            decode_next()
+
+        while decoding or inferring:
+            # Keep the workers fed with decoded images
+            while decoding and len(inferring) < window:
+                path, future = decoding.popleft()
+                image, size = future.result()
+                job = None
+                if image is not None:
+                    job = workers.submit(extract, image, args.max_num_hands, args.max_num_faces)
+                inferring.append((path, size, job))
+                decode_next()
+
+            # Collect in submission order so shards follow the directory order
+            path, size, job = inferring.popleft()
+            writer.add(path, size, job.result() if job is not None else None)
+            processed += 1
+            if processed % args.shard_size == 0:
+                rate = processed / (time.perf_counter() - start)
+                print(f"{processed}/{len(todo)} images, {rate:.1f} images/s")
+
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {processed} images in {elapsed:.1f} s "
+          f"({processed / elapsed:.1f} images/s) into {args.output}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract landmarks from an image directory")
+    parser.add_argument('input', help="Directory searched recursively for images")
+    parser.add_argument('--output', default='landmarks', help="Directory for shards and the manifest")
+    parser.add_argument('--graphs', nargs='+', default=['hands'], choices=['hands', 'face', 'pose'],
+                        help="Graphs to run on every image")
+    parser.add_argument('--backend', choices=['legacy', 'fake'], default='legacy',
+                        help="Inference backend ('fake' produces synthetic landmarks for testing)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Inference processes")
+    parser.add_argument('--decode-threads', type=int, default=4, help="Image decoding threads")
+    parser.add_argument('--shard-size', type=int, default=1000, help="Images per shard")
+    parser.add_argument('--max-side', type=int, default=1280,
+                        help="Downscale larger images to this longest side before inference (0 keeps full size)")
+    parser.add_argument('--max-num-hands', type=int, default=2, help="Hands stored per image")
+    parser.add_argument('--max-num-faces', type=int, default=1, help="Faces stored per image")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input):
+        print(f"Not a directory: {args.input}")
+        sys.exit(1)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,224 @@
+import time
+START_TIME = time.perf_counter()
+
+import argparse
 import cv2
 import sys
-from src.camera import WebcamStream
-from src.processor import VisionProcessor
+from src.camera import WebcamStream, CaptureProfile, LOW_LATENCY_PROFILE
 from src.utils import FPSMeter, draw_text_with_background
+from src.latency import LatencyTracker
+from src.startup import StartupProfiler, ProcessorLoader
+from src.recorder import VideoRecorder
+from src.buffer_pool import FRAME_POOL
+from src.motion_gate import MotionGate
+from src.runtime_profile import RuntimeProfile
+from src.power_manager import PowerManager
+from src.tracing import TRACER
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vision Pro")
+    parser.add_argument('--low-latency', action='store_true',
+                        help="Use the low-latency capture profile (640x480 MJPG, 1 buffer)")
+    parser.add_argument('--width', type=int, help="Requested capture width")
+    parser.add_argument('--height', type=int, help="Requested capture height")
+    parser.add_argument('--capture-fps', type=float, help="Requested capture frame rate")
+    parser.add_argument('--fourcc', help="Requested pixel format, e.g. MJPG or YUYV")
+    parser.add_argument('--buffer-size', type=int, help="Driver frame queue length")
+    parser.add_argument('--mode', choices=sorted({mode for mode, _ in MODE_KEYS.values()}),
+                        default='none', help="Mode to start in (its model is loaded first)")
+    parser.add_argument('--backend', choices=['legacy', 'tasks', 'fake'], default='legacy',
+                        help="Inference backend: synchronous mp.solutions, async MediaPipe Tasks "
+                             "or deterministic fake landmarks")
+    parser.add_argument('--model-dir', help="Model cache directory (tasks backend models, multipose person detector)")
+    parser.add_argument('--record', action='store_true', help="Start recording immediately")
+    parser.add_argument('--record-dir', default='recordings', help="Directory for recorded sessions")
+    parser.add_argument('--segment-seconds', type=float, default=300,
+                        help="Start a new recording segment after this many seconds")
+    parser.add_argument('--segment-mb', type=float,
+                        help="Start a new recording segment once a file reaches this size")
+    parser.add_argument('--max-frame-age-ms', type=float, default=100,
+                        help="Drop frames older than this before inference (0 disables)")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="Skip inference and reuse the last results while the scene is static")
+    parser.add_argument('--motion-threshold', type=float, default=0.01,
+                        help="Fraction of changed pixels that counts as motion")
+    parser.add_argument('--motion-roi', action=argparse.BooleanOptionalAction, default=True,
+                        help="With --motion-gate, only look for motion around the last detected "
+                             "landmarks (--no-motion-roi compares the whole frame)")
+    parser.add_argument('--max-skip', type=int, default=30,
+                        help="Run inference at least every this many frames with the motion gate")
+    parser.add_argument('--power-save', action='store_true',
+                        help="Lower the capture rate and resolution and run inference less often "
+                             "while nothing is detected")
+    parser.add_argument('--idle-after', type=float, default=10,
+                        help="With --power-save, seconds without a detection before going idle")
+    parser.add_argument('--sleep-after', type=float, default=60,
+                        help="With --power-save, seconds without a detection before sleeping")
+    parser.add_argument('--runtime-profile', type=RuntimeProfile.from_spec,
+                        help="OpenCV thread count and CPU pinning: a built-in profile "
+                             "(default, cv1, split, shared) or e.g. 'cv=1:capture=0:inference=2-3:render=1'")
+    parser.add_argument('--trace', action='store_true',
+                        help="Record per-frame span traces (press 't' to dump one, also dumped on exit)")
+    parser.add_argument('--trace-dir', default='traces', help="Directory for Chrome trace JSON files")
+    parser.add_argument('--slow-frame-ms', type=float,
+                        help="With --trace, dump a trace automatically after a frame slower than this")
+    parser.add_argument('--max-hands', type=int, default=2,
+                        help="Maximum number of hands detected and tracked")
+    parser.add_argument('--max-people', type=int, default=4,
+                        help="Maximum number of people in multi-person pose mode")
+    parser.add_argument('--background', help="Image to replace the background with in segment mode "
+                                             "(the background is blurred without one)")
+    return parser.parse_args()
+
+
+def build_capture_profile(args):
+    """Build the capture profile from command line options."""
+    base = LOW_LATENCY_PROFILE if args.low_latency else CaptureProfile()
+    return CaptureProfile(
+        width=args.width or base.width,
+        height=args.height or base.height,
+        fps=args.capture_fps or base.fps,
+        fourcc=args.fourcc or base.fourcc,
+        buffer_size=args.buffer_size if args.buffer_size is not None else base.buffer_size,
+        backend=base.backend
+    )
+
+
+def start_recorder(args):
+    """Start a background recorder configured from command line options."""
+    max_bytes = int(args.segment_mb * 1024 * 1024) if args.segment_mb else None
+    recorder = VideoRecorder(output_dir=args.record_dir, max_segment_seconds=args.segment_seconds,
+                             max_segment_bytes=max_bytes).start()
+    print(f"Recording to {args.record_dir}/")
+    return recorder
+
+
+def stop_recorder(recorder):
+    """Stop a recorder and print what it wrote."""
+    recorder.stop()
+    stats = recorder.get_stats()
+    print(f"Recording stopped: {stats['frames_written']} frames in {len(stats['segments'])} "
+          f"segment(s), {stats['frames_dropped']} dropped")
+    if stats['error'] is not None:
+        print(f"Recording failed: {stats['error']}")
+
+
+# Mode selected by each key and the message printed when it is selected
+MODE_KEYS = {
+    ord('f'): ('face', None),
+    ord('h'): ('hands', None),
+    ord('p'): ('pose', "Pose Detection Mode: Full body tracking"),
+    ord('c'): ('count', "Finger Counting Mode: Show fingers to camera"),
+    ord('d'): ('draw', "Air Writing Mode: Point index finger to draw"),
+    ord('g'): ('gestures', "Gesture Control Mode: Rotate palm to control volume"),
+    ord('s'): ('segment', "Segment Mode: Background blurred or replaced"),
+    ord('m'): ('multipose', "Multi-Person Pose Mode: Body landmarks of everyone in view"),
+    ord('n'): ('none', None),
+}
+
+
+def handle_key(key, args, processor, requested_mode, recorder):
+    """Act on a key press, from processed and dropped frames alike.
+
+    Args:
+        key: Key code from cv2.waitKey (masked to 8 bits)
+        args: Parsed command line options
+        processor: VisionProcessor, or None while it is loading
+        requested_mode: Currently requested mode
+        recorder: Active VideoRecorder, or None
+
+    Returns:
+        tuple: (quit, requested_mode, recorder)
+    """
+    if key == ord('q'):
+        return True, requested_mode, recorder
+    if key in MODE_KEYS:
+        mode, message = MODE_KEYS[key]
+        if message:
+            print(message)
+        return False, mode, recorder
+    if key == ord('t') and TRACER.enabled:
+        print(f"Trace written to {TRACER.dump()}")
+    elif key == ord('v'):
+        if recorder is None:
+            recorder = start_recorder(args)
+        else:
+            stop_recorder(recorder)
+            recorder = None
+
+    # Air writing controls
+    elif processor is not None and processor.mode == 'draw':
+        if key == ord('x'):
+            processor.air_writer.clear_canvas()
+            print("Canvas cleared")
+        elif key == ord('r'):
+            processor.air_writer.change_color('red')
+            print("Color: Red")
+        elif key == ord('b'):
+            processor.air_writer.change_color('blue')
+            print("Color: Blue")
+        elif key in (ord('+'), ord('='), ord('-')):
+            processor.air_writer.zoom(1.25 if key != ord('-') else 0.8)
+        elif key == ord('0'):
+            processor.air_writer.reset_view()
+            print("View reset")
+    return False, requested_mode, recorder
+
 
 def main():
+    args = parse_args()
+    profiler = StartupProfiler(START_TIME)
     print("Initializing Vision Pro...")
+
+    # Threads started from here on inherit the render CPUs unless they pin themselves
+    runtime_profile = args.runtime_profile
+    if runtime_profile is not None:
+        runtime_profile.apply_process()
+        runtime_profile.pin('render')
+    if args.trace:
+        TRACER.enable(slow_frame_ms=args.slow_frame_ms, output_dir=args.trace_dir)
     
     try:
         # Initialize components
         # Using src=1 for USB webcam
+        profile = build_capture_profile(args)
         try:
-            webcam = WebcamStream(src=1).start()
+            webcam = WebcamStream(src=1, profile=profile, runtime_profile=runtime_profile).start()
         except ValueError:
             print("USB Webcam (Index 1) not found. Falling back to default (Index 0).")
-            webcam = WebcamStream(src=0).start()
+            webcam = WebcamStream(src=0, profile=profile, runtime_profile=runtime_profile).start()
+
+        profiler.mark('camera open')
+        settings = webcam.settings
+        print(f"Camera: {settings['width']}x{settings['height']} @ {settings['fps']:.0f} FPS, "
+              f"{settings['fourcc']}, buffer={settings['buffer_size']}, backend={settings['backend']}")
             
-        processor = VisionProcessor(mode='none')
+        # MediaPipe is imported and its graphs are built in the background
+        # so the preview appears as soon as the camera is open
+        motion_gate = MotionGate(motion_threshold=args.motion_threshold,
+                                 max_skip=args.max_skip,
+                                 use_roi=args.motion_roi) if args.motion_gate else None
+        power_manager = PowerManager(webcam, idle_after=args.idle_after,
+                                     sleep_after=args.sleep_after) if args.power_save else None
+        background = None
+        if args.background:
+            background = cv2.imread(args.background)
+            if background is None:
+                print(f"Could not read background image {args.background}; blurring instead")
+        requested_mode = args.mode
+        loader = ProcessorLoader(profiler, first_mode=requested_mode, backend=args.backend,
+                                 model_dir=args.model_dir, motion_gate=motion_gate,
+                                 power_manager=power_manager,
+                                 runtime_profile=runtime_profile,
+                                 segment_background=background,
+                                 max_num_hands=args.max_hands,
+                                 max_num_people=args.max_people).start()
+        processor = None
+        recorder = start_recorder(args) if args.record else None
         fps_meter = FPSMeter()
+        latency = LatencyTracker(max_frame_age_ms=args.max_frame_age_ms)
+        last_frame_id = None
+        last_recorded_time = None
         
         print("Vision Pro Started.")
         print("Controls:")
@@ -27,78 +228,148 @@ def main():
         print(" 'c' - Toggle Finger Counting")
         print(" 'd' - Toggle Air Writing (Draw)")
         print(" 'g' - Toggle Gesture Control (Volume)")
+        print(" 's' - Toggle Background Blur/Replacement (Segment)")
+        print(" 'm' - Toggle Multi-Person Pose")
         print(" 'n' - None (Clear)")
+        print(" 'v' - Start/Stop Recording")
+        if args.trace:
+            print(" 't' - Dump a trace of the recent frames")
         print(" 'q' - Quit")
         print("")
         print("Air Writing Controls:")
         print(" 'x' - Clear canvas")
         print(" 'r' - Red, 'b' - Blue, 'g' - Green")
+        print(" '+'/'-' - Zoom in/out, '0' - Reset view")
 
         while True:
-            #Read Frame
-            ret, frame = webcam.read()
+            if power_manager is not None:
+                # Only process new frames, so the loop slows down with the camera
+                last_frame_id = webcam.wait_for_frame(last_frame_id, timeout=0.5)
+            frame_start = time.perf_counter()
+            #Read Frame into a pooled buffer; every path below gives it back
+            shape = webcam.frame_shape
+            frame_buffer = FRAME_POOL.acquire(shape) if shape is not None else None
+            ret, frame, capture_time = webcam.read_timestamped(out=frame_buffer)
+            # Only a frame copied into the pooled buffer goes back to the pool
+            pooled = frame is not None and frame is frame_buffer
+            if not pooled:
+                # Resolution changed between the two calls (the frame is a
+                # new array) or there is no frame
+                FRAME_POOL.release(frame_buffer)
+            release = FRAME_POOL.release if pooled else None
             
             if not ret or frame is None:
+                if release is not None:
+                    release(frame)
+                continue
+
+            # Drop frames that are already too old to be worth processing
+            timing = latency.begin(capture_time)
+            if timing is None:
+                if release is not None:
+                    release(frame)
+                quit_requested, requested_mode, recorder = handle_key(
+                    cv2.waitKey(1) & 0xFF, args, processor, requested_mode, recorder)
+                if quit_requested:
+                    break
                 continue
 
             # Process Frame
-            processed_frame = processor.process(frame)
+            if loader.error:
+                raise loader.error
+            if processor is None:
+                # Until the processor exists, the loader warms this mode up first
+                loader.first_mode = requested_mode
+                processor = loader.processor
+
+            if processor is not None:
+                if processor.mode != requested_mode:
+                    processor.set_mode(requested_mode)
+                processed_frame = processor.process(frame, capture_time)
+                if processor.annotated:
+                    profiler.mark('first annotated frame')
+            else:
+                processed_frame = frame
+                draw_text_with_background(processed_frame, "Loading models...", (20, 120),
+                                          text_color=(0, 255, 255), bg_color=(0, 0, 0))
+            timing.mark('process')
             
             # FPS Calculation
             fps = fps_meter.update()
             
             # UI Overlay
-            mode_text = f"Mode: {processor.mode.upper()}"
-            fps_text = f"FPS: {fps}"
+            mode_text = f"Mode: {requested_mode.upper()}"
+            fps_text = f"FPS: {fps} | Latency p50/p95: {latency.latency_ms(50):.0f}/{latency.latency_ms(95):.0f} ms"
+            if power_manager is not None:
+                fps_text += f" | Power: {power_manager.state}"
             
             draw_text_with_background(processed_frame, mode_text, (20, 40), bg_color=(0, 0, 0))
             draw_text_with_background(processed_frame, fps_text, (20, 80), bg_color=(0, 0, 0))
+            timing.mark('overlay')
 
             # Display
-            cv2.imshow("Vision Pro", processed_frame)
+            with TRACER.span('imshow'):
+                cv2.imshow("Vision Pro", processed_frame)
+            profiler.mark('first frame shown')
+
+            # Hand the finished frame to the background encoder, which returns
+            # the buffer to the pool once it is encoded
+            if recorder is not None and recorder.error is not None:
+                # The encoder thread failed; report it instead of recording nothing
+                stop_recorder(recorder)
+                recorder = None
+            # The loop can run faster than the camera; a frame read again is
+            # shown but not recorded, so the file keeps the capture timing
+            if recorder is not None and capture_time != last_recorded_time:
+                recorder.write(processed_frame, capture_time, release=release)
+                last_recorded_time = capture_time
+            elif release is not None:
+                release(processed_frame)
 
             # Input Handling
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
+            with TRACER.span('waitKey'):
+                key = cv2.waitKey(1) & 0xFF
+            latency.end(timing)
+            TRACER.end_frame(frame_start)
+            quit_requested, requested_mode, recorder = handle_key(
+                key, args, processor, requested_mode, recorder)
+            if quit_requested:
                 break
-            elif key == ord('f'):
-                processor.set_mode('face')
-            elif key == ord('h'):
-                processor.set_mode('hands')
-            elif key == ord('p'):
-                processor.set_mode('pose')
-                print("Pose Detection Mode: Full body tracking")
-            elif key == ord('c'):
-                processor.set_mode('count')
-                print("Finger Counting Mode: Show fingers to camera")
-            elif key == ord('d'):
-                processor.set_mode('draw')
-                print("Air Writing Mode: Point index finger to draw")
-            elif key == ord('g'):
-                processor.set_mode('gestures')
-                print("Gesture Control Mode: Rotate palm to control volume")
-            elif key == ord('n'):
-                processor.set_mode('none')
-            
-            # Air writing controls
-            elif key == ord('x'):
-                if processor.mode == 'draw':
-                    processor.air_writer.clear_canvas()
-                    print("Canvas cleared")
-            elif key == ord('r'):
-                if processor.mode == 'draw':
-                    processor.air_writer.change_color('red')
-                    print("Color: Red")
-            elif key == ord('b'):
-                if processor.mode == 'draw':
-                    processor.air_writer.change_color('blue')
-                    print("Color: Blue")
 
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
+        if locals().get('recorder') is not None:
+            stop_recorder(recorder)
         if 'webcam' in locals():
             webcam.stop()
+            stats = webcam.get_stats()
+            print(f"Capture: {stats['frames']} frames, {stats['fps']:.1f} FPS, "
+                  f"jitter {stats['jitter_ms']:.1f} ms (max interval {stats['max_interval_ms']:.1f} ms)")
+        if 'latency' in locals():
+            report = latency.summary()
+            stages = ", ".join(f"{name} {ms:.1f} ms" for name, ms in report['stages'].items())
+            print(f"Latency: p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, "
+                  f"{report['dropped']} stale frames dropped ({stages})")
+        if locals().get('motion_gate') is not None:
+            gate = motion_gate.get_stats()
+            print(f"Motion gate: skipped {gate['skipped']}/{gate['frames']} frames "
+                  f"({gate['skip_ratio'] * 100:.0f}%), {gate['forced']} forced, "
+                  f"saved ~{gate['saved_ms'] / 1000:.1f} s of inference "
+                  f"({gate['saved_pct']:.0f}%, gate {gate['gate_ms']:.2f} ms/frame)")
+        if locals().get('power_manager') is not None:
+            power = power_manager.get_stats()
+            print(f"Power: {power['transitions']} state changes, woken by motion "
+                  f"{power['wakes']['motion']}x, by detection {power['wakes']['detection']}x")
+            for state, entry in power['states'].items():
+                print(f"  {state:<7} {entry['seconds']:7.1f} s ({entry['share'] * 100:3.0f}%), "
+                      f"CPU {entry['cpu_pct']:5.1f}%, {entry['inferences']}/{entry['frames']} "
+                      f"frames inferred")
+        if runtime_profile is not None:
+            print(runtime_profile.describe())
+        if TRACER.enabled:
+            print(f"Trace written to {TRACER.dump()}")
+        print(profiler.report())
         cv2.destroyAllWindows()
         print("Vision Pro Stopped.")
 
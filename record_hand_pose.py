@@ -0,0 +1,79 @@
+"""
+Record labelled hand poses into the hand-pose template library.
+
+Hold the pose in front of the camera and press SPACE to start/stop
+capturing samples. Press 'q' to save and quit.
+
+    python record_hand_pose.py peace --samples 40
+    python record_hand_pose.py fist --replace
+"""
+import argparse
+import cv2
+import mediapipe as mp
+from src.camera import WebcamStream
+from src.hand_pose_classifier import HandPoseClassifier
+from src.utils import draw_text_with_background, landmarks_to_array
+
+DEFAULT_LIBRARY = "hand_poses.npz"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record hand pose templates")
+    parser.add_argument('label', help="Name of the pose to record, e.g. 'peace'")
+    parser.add_argument('--samples', type=int, default=30, help="Number of samples to record")
+    parser.add_argument('--every', type=int, default=3, help="Keep one sample every N frames")
+    parser.add_argument('--library', default=DEFAULT_LIBRARY, help="Template library file")
+    parser.add_argument('--replace', action='store_true', help="Discard existing samples for this label")
+    parser.add_argument('--camera', type=int, default=0, help="Camera index")
+    args = parser.parse_args()
+
+    classifier = HandPoseClassifier.load(args.library)
+    if args.replace:
+        classifier.remove_label(args.label)
+
+    hands = mp.solutions.hands.Hands(model_complexity=0, max_num_hands=1)
+    webcam = WebcamStream(src=args.camera).start()
+
+    recording = False
+    recorded = 0
+    frame_index = 0
+    try:
+        while recorded < args.samples:
+            ret, frame = webcam.read()
+            if not ret or frame is None:
+                continue
+
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            h, w = frame.shape[:2]
+            if results.multi_hand_landmarks:
+                hand_landmarks = results.multi_hand_landmarks[0]
+                handedness = results.multi_handedness[0].classification[0].label
+                mp.solutions.drawing_utils.draw_landmarks(
+                    frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+
+                frame_index += 1
+                if recording and frame_index % args.every == 0:
+                    classifier.add_samples(args.label, [landmarks_to_array(hand_landmarks)],
+                                           handedness=handedness, aspect_ratio=w / h)
+                    recorded += 1
+
+            status = "RECORDING" if recording else "PAUSED (space to record)"
+            draw_text_with_background(frame, f"{args.label}: {recorded}/{args.samples} - {status}", (20, 40))
+            cv2.imshow("Record Hand Pose", frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord(' '):
+                recording = not recording
+    finally:
+        webcam.stop()
+        cv2.destroyAllWindows()
+
+    classifier.save(args.library)
+    print(f"Saved {recorded} samples for '{args.label}' to {args.library} "
+          f"({len(classifier)} templates, {len(classifier.classes)} poses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Soak test: run the frame pipeline for hours and look for drift.
+
+Drives VisionProcessor with synthetic frames (or a looping video file)
+through random mode switches and resolution changes. At a fixed interval
+it samples resident memory, the Python heap and per-mode frame latency.
+At the end it fits a linear trend to every series and flags the ones
+growing faster than the allowed rate.
+
+    python soak.py --duration 3600                  # one hour, fake backend
+    python soak.py --duration 28800 --backend legacy --input session.mp4
+    python soak.py --duration 600 --tracemalloc     # also report where the heap grew
+
+Exits with status 1 if any trend is flagged.
+"""
+import argparse
+import csv
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict, deque
+import cv2
+import numpy as np
+from benchmark import MODES, make_frame
+from src.latency import percentile
+from src.processor import VisionProcessor
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def read_rss_bytes():
+    """Current resident set size of this process in bytes (None if unknown)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def trend_per_hour(times, values, min_span=0.0):
+    """Fit a least-squares line through (time, value) points.
+
+    Args:
+        times: Sample times in seconds
+        values: Sample values (None = missing)
+        min_span: Shortest time span (seconds) a trend can be significant over
+
+    Returns:
+        tuple: (growth per hour, significant) where significant means the
+               series spans at least min_span and the fitted change is more
+               than twice the scatter around the line; (0.0, False) with
+               fewer than five points
+    """
+    points = [(t, v) for t, v in zip(times, values) if v is not None]
+    if len(points) < 5:
+        return 0.0, False
+    t, v = np.array(points, dtype=np.float64).T
+    if np.ptp(t) == 0:
+        return 0.0, False
+    slope, intercept = np.polyfit(t, v, 1)
+    scatter = np.std(v - (slope * t + intercept))
+    significant = np.ptp(t) >= min_span and abs(slope) * np.ptp(t) > 2 * scatter
+    return float(slope * 3600.0), bool(significant)
+
+
+class FrameSource:
+    """Frames at a given resolution, synthetic or read from a looping video."""
+
+    def __init__(self, path=None):
+        self.capture = cv2.VideoCapture(path) if path else None
+        if self.capture is not None and not self.capture.isOpened():
+            raise ValueError(f"Could not open {path}")
+        self.synthetic = {}
+
+    def read(self, width, height):
+        if self.capture is None:
+            if (width, height) not in self.synthetic:
+                self.synthetic[(width, height)] = make_frame(width, height)
+            return self.synthetic[(width, height)].copy()
+
+        ret, frame = self.capture.read()
+        if not ret:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+            if not ret:
+                raise RuntimeError("Input video has no readable frames")
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height))
+        return frame
+
+    def close(self):
+        if self.capture is not None:
+            self.capture.release()
+
+
+class LatencyWindow:
+    """Frame times of one mode and resolution between two samples.
+
+    Keeps running stage sums and a bounded set of recent frame times, so
+    the harness itself uses the same memory at 30 FPS or 3000 FPS.
+    """
+
+    def __init__(self, max_frames=2000):
+        self.frame_times = deque(maxlen=max_frames)
+        self.stage_totals = defaultdict(float)
+        self.count = 0
+
+    def add(self, frame_time, timings):
+        self.frame_times.append(frame_time)
+        for stage, seconds in timings.items():
+            self.stage_totals[stage] += seconds
+        self.count += 1
+
+    def summary(self):
+        return {'p50_ms': percentile(self.frame_times, 50) * 1000,
+                'p95_ms': percentile(self.frame_times, 95) * 1000,
+                'stages_ms': {stage: total / self.count * 1000
+                              for stage, total in self.stage_totals.items()}}
+
+
+def take_sample(start, frames, windows):
+    """Collect one sample row.
+
+    Args:
+        start: Start time of the run
+        frames: Total frames processed so far
+        windows: 'mode@WxH' -> LatencyWindow since the last sample
+    """
+    gc.collect()
+    return {
+        'elapsed_s': time.perf_counter() - start,
+        'frames': frames,
+        'rss_mb': (read_rss_bytes() or 0) / 1e6 or None,
+        'heap_blocks': sys.getallocatedblocks(),
+        'gc_objects': len(gc.get_objects()),
+        'traced_mb': tracemalloc.get_traced_memory()[0] / 1e6 if tracemalloc.is_tracing() else None,
+        'latency': {key: window.summary() for key, window in windows.items()}
+    }
+
+
+def analyze(samples, args):
+    """Fit trends to the samples after the warm-up and flag excessive growth.
+
+    Returns:
+        list: (series name, first value, last value, growth per hour, flagged)
+    """
+    steady = [s for s in samples if s['elapsed_s'] >= args.warmup] or samples
+    times = [s['elapsed_s'] for s in steady]
+    rows = []
+
+    def add(name, values, limit, relative=False):
+        values = list(values)
+        present = [v for v in values if v is not None]
+        if not present:
+            return
+        slope, significant = trend_per_hour(times, values, args.min_span)
+        growth = slope / (np.mean(present) or 1.0) * 100 if relative else slope
+        # Only flag clear trends of series that ended higher than they started
+        rows.append((name, present[0], present[-1], growth,
+                     significant and growth > limit and present[-1] > present[0]))
+
+    add('rss_mb', (s['rss_mb'] for s in steady), args.max_rss_growth)
+    add('traced_mb', (s['traced_mb'] for s in steady), args.max_rss_growth)
+    add('heap_blocks', (s['heap_blocks'] for s in steady), args.max_heap_growth, relative=True)
+    add('gc_objects', (s['gc_objects'] for s in steady), args.max_heap_growth, relative=True)
+    # Latency depends on the mode and the resolution, so each pair is its own series
+    for key in latency_keys(steady):
+        add(f'{key} p95_ms', (s['latency'].get(key, {}).get('p95_ms') for s in steady),
+            args.max_latency_growth, relative=True)
+    return rows
+
+
+def latency_keys(samples):
+    """Every 'mode@WxH' key seen in the samples, in first-seen order."""
+    keys = []
+    for s in samples:
+        keys.extend(key for key in s['latency'] if key not in keys)
+    return keys
+
+
+def print_summary(rows, samples, frames, elapsed):
+    print(f"\nSoak summary: {frames} frames in {elapsed / 3600:.2f} h "
+          f"({frames / elapsed:.1f} FPS), {len(samples)} samples")
+    print(f"{'series':<28} {'first':>12} {'last':>12} {'growth/h':>12}")
+    print("-" * 68)
+    for name, first, last, growth, flagged in rows:
+        unit = '%' if not name.endswith('_mb') else ' MB'
+        print(f"{name:<28} {first:12.2f} {last:12.2f} {growth:10.2f}{unit:<3}"
+              f"{'  FLAGGED' if flagged else ''}")
+
+
+def write_samples_csv(path, samples):
+    keys = latency_keys(samples)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['elapsed_s', 'frames', 'rss_mb', 'heap_blocks', 'gc_objects', 'traced_mb'] +
+                        [f'{key}_p95_ms' for key in keys])
+        for s in samples:
+            writer.writerow([f"{s['elapsed_s']:.1f}", s['frames'], s['rss_mb'], s['heap_blocks'],
+                             s['gc_objects'], s['traced_mb']] +
+                            [s['latency'].get(key, {}).get('p95_ms') for key in keys])
+
+
+def parse_resolution(text):
+    width, height = (int(v) for v in text.lower().split('x'))
+    return width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test the Vision Pro frame pipeline")
+    parser.add_argument('--duration', type=float, default=3600, help="Run time in seconds")
+    parser.add_argument('--backend', choices=['fake', 'legacy', 'tasks'], default='fake',
+                        help="Inference backend")
+    parser.add_argument('--model-dir', help="Model cache directory (tasks backend models, multipose person detector)")
+    parser.add_argument('--input', help="Video file looped as input (default: synthetic frames)")
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES, help="Modes to switch between")
+    parser.add_argument('--resolutions', nargs='+', default=[(640, 480), (1280, 720), (320, 240)],
+                        type=parse_resolution, help="Resolutions to switch between, as WIDTHxHEIGHT")
+    parser.add_argument('--switch-every', type=float, default=20,
+                        help="Mean seconds between random mode switches")
+    parser.add_argument('--resize-every', type=float, default=300,
+                        help="Mean seconds between random resolution changes")
+    parser.add_argument('--sample-every', type=float, default=30, help="Seconds between samples")
+    parser.add_argument('--warmup', type=float, default=120,
+                        help="Seconds excluded from the trend analysis")
+    parser.add_argument('--min-span', type=float, default=600,
+                        help="Only flag trends seen over at least this many seconds")
+    parser.add_argument('--fps', type=float, default=30,
+                        help="Frame pacing (0 runs as fast as possible)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the random schedule")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Trace Python allocations and report the biggest growth sites (slow)")
+    parser.add_argument('--max-rss-growth', type=float, default=10.0,
+                        help="Flag memory series growing faster than this many MB per hour")
+    parser.add_argument('--max-heap-growth', type=float, default=5.0,
+                        help="Flag heap series growing faster than this many percent per hour")
+    parser.add_argument('--max-latency-growth', type=float, default=10.0,
+                        help="Flag per-mode p95 latency growing faster than this many percent per hour")
+    parser.add_argument('--csv', help="Write the samples to this CSV file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    source = FrameSource(args.input)
+    processor = VisionProcessor(backend=args.backend, model_dir=args.model_dir)
+    if args.tracemalloc:
+        tracemalloc.start(10)
+
+    mode = rng.choice(args.modes)
+    width, height = rng.choice(args.resolutions)
+    processor.set_mode(mode)
+    print(f"Soak: {args.duration / 3600:.2f} h, backend {args.backend}, "
+          f"{'input ' + args.input if args.input else 'synthetic frames'}, "
+          f"RSS from {'/proc' if os.path.exists('/proc/self/statm') else 'psutil' if PSUTIL_AVAILABLE else 'nowhere'}")
+
+    start = time.perf_counter()
+    next_switch = start + rng.expovariate(1.0 / args.switch_every)
+    next_resize = start + rng.expovariate(1.0 / args.resize_every)
+    next_sample = start + args.sample_every
+    frame_interval = 1.0 / args.fps if args.fps else 0.0
+    windows = defaultdict(LatencyWindow)
+    samples = []
+    frames = 0
+    baseline_snapshot = None
+
+    try:
+        while True:
+            now = time.perf_counter()
+            if now - start >= args.duration:
+                break
+            if now >= next_switch:
+                mode = rng.choice(args.modes)
+                processor.set_mode(mode)
+                next_switch = now + rng.expovariate(1.0 / args.switch_every)
+            if now >= next_resize:
+                width, height = rng.choice(args.resolutions)
+                next_resize = now + rng.expovariate(1.0 / args.resize_every)
+
+            frame = source.read(width, height)
+            frame_start = time.perf_counter()
+            processor.process(frame, frame_start)
+            frame_time = time.perf_counter() - frame_start
+            windows[f'{mode}@{width}x{height}'].add(frame_time, processor.timings)
+            frames += 1
+
+            if time.perf_counter() >= next_sample:
+                sample = take_sample(start, frames, windows)
+                samples.append(sample)
+                windows = defaultdict(LatencyWindow)
+                next_sample += args.sample_every
+                if args.tracemalloc and baseline_snapshot is None and sample['elapsed_s'] >= args.warmup:
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                print(f"[{sample['elapsed_s'] / 60:7.1f} min] frames {frames}, "
+                      f"RSS {sample['rss_mb'] or 0:.1f} MB, heap blocks {sample['heap_blocks']}, "
+                      f"mode {mode} {width}x{height}")
+
+            if frame_interval:
+                remaining = frame_interval - (time.perf_counter() - now)
+                if remaining > 0:
+                    time.sleep(remaining)
+    except KeyboardInterrupt:
+        print("Interrupted, summarizing what was collected")
+    finally:
+        source.close()
+        processor.backend.close()
+
+    elapsed = time.perf_counter() - start
+    rows = analyze(samples, args)
+    print_summary(rows, samples, frames, elapsed)
+    if args.csv:
+        write_samples_csv(args.csv, samples)
+        print(f"Samples written to {args.csv}")
+
+    if baseline_snapshot is not None:
+        print("\nLargest Python heap growth since the end of the warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, 'lineno')[:10]:
+            print(f"  {stat}")
+
+    if any(flagged for *_, flagged in rows):
+        print("\nDrift detected.")
+        sys.exit(1)
+    print("\nNo drift detected.")
+
+
+if __name__ == "__main__":
+    main()
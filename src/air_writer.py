@@ -1,26 +1,42 @@
 """
 Air writing module for drawing on screen using index finger.
+
+Ink is kept on a sparse tiled canvas (see tiled_canvas.py) that is larger
+than the frame: two raised fingers pan it and two hands zoom it.
 """
+import math
 import cv2
-import numpy as np
 from collections import deque
+from .tiled_canvas import TiledCanvas
+from .tracing import traced
 
 
 class AirWriter:
     """Allows drawing on screen using index finger as a pen."""
     
-    def __init__(self, max_points=512, line_thickness=5):
+    def __init__(self, max_points=512, line_thickness=5, max_strokes=64, canvas=None):
         """Initialize the air writer.
         
         Args:
-            max_points: Maximum number of points to store in drawing buffer
-            line_thickness: Thickness of drawn lines
+            max_points: Maximum number of points kept per stroke
+            line_thickness: Thickness of drawn lines in frame pixels
+            max_strokes: Maximum number of completed strokes kept
+            canvas: TiledCanvas to draw on (a new one by default)
         """
-        self.drawing_points = deque(maxlen=max_points)
+        self.max_points = max_points
+        # Strokes are kept in canvas (world) coordinates
+        self.strokes = deque(maxlen=max_strokes)
+        # Stroke in progress per pen (one pen per tracked hand)
+        self.current_strokes = {}
+        self.text = ''
         self.line_thickness = line_thickness
         self.is_drawing = False
         self.current_color = (0, 255, 0)  # Green by default
-        self.canvas = None
+        self.canvas = canvas or TiledCanvas()
+        
+        # (pen, previous point) of the panning hand and the two-hand span while navigating
+        self._pan_anchor = None
+        self._zoom_anchor = None
         
         # Colors available
         self.colors = {
@@ -33,15 +49,15 @@ class AirWriter:
             'cyan': (255, 255, 0)
         }
         
-    def initialize_canvas(self, shape):
-        """Initialize transparent canvas for drawing.
+    def set_frame_size(self, size):
+        """Set the (width, height) of the frames points are given on.
         
-        Args:
-            shape: Shape of the canvas (height, width, channels)
+        Drawings live in canvas coordinates, so they keep their place
+        and size when the resolution changes.
         """
-        if self.canvas is None or self.canvas.shape != shape:
-            self.canvas = np.zeros(shape, dtype=np.uint8)
+        self.canvas.set_frame_size(size)
     
+    @traced()
     def detect_drawing_gesture(self, hand_landmarks):
         """Detect if user is in drawing mode (index finger extended).
         
@@ -71,19 +87,115 @@ class AirWriter:
         
         return is_drawing, (index_tip.x, index_tip.y)
     
-    def add_point(self, point):
-        """Add a point to the drawing buffer.
+    @traced()
+    def detect_pan_gesture(self, hand_landmarks):
+        """Detect the pan gesture (index and middle fingers up, ring and pinky down).
+        
+        Args:
+            hand_landmarks: MediaPipe hand landmarks
+            
+        Returns:
+            tuple: (is_panning, point between the index and middle finger tips)
+        """
+        lm = hand_landmarks.landmark
+        index_up = lm[8].y < lm[6].y
+        middle_up = lm[12].y < lm[10].y
+        ring_down = lm[16].y > lm[14].y
+        pinky_down = lm[20].y > lm[18].y
+        
+        is_panning = index_up and middle_up and ring_down and pinky_down
+        
+        return is_panning, ((lm[8].x + lm[12].x) / 2, (lm[8].y + lm[12].y) / 2)
+    
+    def pan_with_hand(self, point, pen=0):
+        """Drag the canvas with the pan gesture.
+        
+        Args:
+            point: Tuple (x, y) in normalized coordinates
+            pen: ID of the panning hand; another hand takes over from scratch
+        """
+        self._zoom_anchor = None
+        if self._pan_anchor is not None and self._pan_anchor[0] == pen:
+            previous = self._pan_anchor[1]
+            self.canvas.pan((point[0] - previous[0], point[1] - previous[1]))
+        self._pan_anchor = (pen, point)
+    
+    def zoom_with_hands(self, p1, p2):
+        """Zoom and pan the canvas by spreading or pinching two hands.
         
         Args:
-            point: Tuple (x, y) in normalized coordinates (0-1)
+            p1, p2: Tuples (x, y) in normalized coordinates, one per hand
         """
-        self.drawing_points.append(point)
+        self._pan_anchor = None
+        span = math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+        center = ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
+        if self._zoom_anchor is not None and span > 0.02:
+            previous_span, previous_center = self._zoom_anchor
+            self.canvas.pan((center[0] - previous_center[0], center[1] - previous_center[1]))
+            self.canvas.zoom_at(span / previous_span, center)
+        if span > 0.02:
+            self._zoom_anchor = (span, center)
+    
+    def zoom(self, factor):
+        """Zoom the canvas about the frame centre."""
+        self.canvas.zoom_at(factor, (0.5, 0.5))
+    
+    def reset_view(self):
+        """Show the canvas origin at zoom 1."""
+        self.canvas.reset_view()
+    
+    def end_navigation(self):
+        """Forget the pan and zoom anchors (gesture released)."""
+        self._pan_anchor = None
+        self._zoom_anchor = None
+    
+    @traced()
+    def add_point(self, point, pen=0):
+        """Add a point to the current stroke of a pen.
+        
+        Args:
+            point: Tuple (x, y) in normalized coordinates (0-1), or None to lift the pen
+            pen: Pen the point belongs to (the hand ID when several hands draw)
+            
+        Returns:
+            list: The completed stroke (canvas coordinates) when None ends one,
+                  otherwise None
+        """
+        if point is None:
+            stroke = self.current_strokes.pop(pen, None)
+            if stroke:
+                self.strokes.append(stroke)
+            return stroke
+        
+        point = self.canvas.to_world(point)
+        stroke = self.current_strokes.setdefault(pen, [])
+        if stroke:
+            self.canvas.draw_line(stroke[-1], point, self.current_color, self.line_thickness)
+        if len(stroke) < self.max_points:
+            stroke.append(point)
+        return None
+    
+    def active_pens(self):
+        """Return the pens with a stroke in progress."""
+        return list(self.current_strokes)
     
     def clear_canvas(self):
-        """Clear all drawings."""
-        self.drawing_points.clear()
-        if self.canvas is not None:
-            self.canvas.fill(0)
+        """Clear all drawings and recognized text."""
+        self.strokes.clear()
+        self.current_strokes.clear()
+        self.text = ''
+        self.canvas.clear()
+    
+    def append_text(self, label, max_length=24):
+        """Append a recognized character to the text shown on screen.
+        
+        Args:
+            label: Recognized label; shape names are added as words
+            max_length: Number of trailing characters kept
+        """
+        if len(label) > 1:
+            label = f" {label} "
+        self.text = (self.text + label)[-max_length:]
     
     def change_color(self, color_name):
         """Change drawing color.
@@ -94,45 +206,16 @@ class AirWriter:
         if color_name in self.colors:
             self.current_color = self.colors[color_name]
     
+    @traced()
     def draw_on_frame(self, frame):
-        """Draw the accumulated points on the frame.
+        """Draw the visible part of the canvas on the frame.
         
         Args:
-            frame: Image frame to draw on
+            frame: Image frame to draw on (modified in place)
         """
-        h, w = frame.shape[:2]
-        
-        # Initialize canvas if needed
-        self.initialize_canvas(frame.shape)
-        
-        # Draw all points on canvas
-        if len(self.drawing_points) > 1:
-            points_list = list(self.drawing_points)
-            for i in range(1, len(points_list)):
-                if points_list[i] is None or points_list[i-1] is None:
-                    continue
-                
-                # Convert normalized coordinates to pixel coordinates
-                pt1 = (int(points_list[i-1][0] * w), int(points_list[i-1][1] * h))
-                pt2 = (int(points_list[i][0] * w), int(points_list[i][1] * h))
-                
-                # Draw line on canvas
-                cv2.line(self.canvas, pt1, pt2, self.current_color, self.line_thickness)
-        
-        # Overlay canvas on frame
-        mask = cv2.cvtColor(self.canvas, cv2.COLOR_BGR2GRAY)
-        _, mask = cv2.threshold(mask, 1, 255, cv2.THRESH_BINARY)
-        mask_inv = cv2.bitwise_not(mask)
-        
-        # Black out the drawing area in the frame
-        frame_bg = cv2.bitwise_and(frame, frame, mask=mask_inv)
-        
-        # Take only the drawing from canvas
-        canvas_fg = cv2.bitwise_and(self.canvas, self.canvas, mask=mask)
-        
-        # Combine
-        frame[:] = cv2.add(frame_bg, canvas_fg)
+        self.canvas.composite(frame)
     
+    @traced()
     def draw_cursor(self, frame, position, is_drawing):
         """Draw cursor at index finger tip.
         
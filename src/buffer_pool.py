@@ -0,0 +1,127 @@
+"""
+Shape-keyed pool of reusable image buffers.
+
+Per-frame stages borrow full-size buffers from the pool, pass them to
+OpenCV as `dst=` outputs and give them back when done, so once the
+pipeline has warmed up a frame allocates no new image buffers.
+
+The pool remembers which buffers it has lent out. Releasing anything
+else (None, an array the pool never handed out, or a buffer that was
+already released) is ignored, so the counters stay exact.
+"""
+import threading
+import weakref
+from collections import defaultdict
+import numpy as np
+
+
+class BufferPool:
+    """Thread-safe pool of NumPy buffers keyed by shape and dtype."""
+
+    def __init__(self, max_free_per_key=8):
+        """
+        Args:
+            max_free_per_key: Maximum number of idle buffers kept per shape;
+                              extra released buffers are left to the GC
+        """
+        self.max_free_per_key = max_free_per_key
+        self._free = defaultdict(list)
+        self._lent = {}
+        # Re-entrant: a lent buffer's weakref callback may run inside a locked block
+        self._lock = threading.RLock()
+
+        # Allocation accounting
+        self.allocations = 0
+        self.reuses = 0
+        self.outstanding = 0
+        self.bytes_allocated = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Borrow a buffer. Its contents are undefined.
+
+        Args:
+            shape: Buffer shape, e.g. frame.shape
+            dtype: Buffer dtype
+
+        Returns:
+            np.ndarray: A C-contiguous buffer of the requested shape
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            self.outstanding += 1
+            free = self._free.get(key)
+            if free:
+                self.reuses += 1
+                buffer = free.pop()
+                self._lend(buffer)
+                return buffer
+            self.allocations += 1
+        buffer = np.empty(shape, dtype=dtype)
+        with self._lock:
+            self.bytes_allocated += buffer.nbytes
+            self._lend(buffer)
+        return buffer
+
+    def _lend(self, buffer):
+        """Remember a lent buffer (called with the lock held)."""
+        key = id(buffer)
+
+        def forget(ref):
+            # A lent buffer was dropped without being released
+            with self._lock:
+                if self._lent.get(key) is ref:
+                    del self._lent[key]
+        self._lent[key] = weakref.ref(buffer, forget)
+
+    def owns(self, buffer):
+        """Return True if a buffer is currently lent out by this pool."""
+        with self._lock:
+            ref = self._lent.get(id(buffer))
+            return ref is not None and ref() is buffer
+
+    def acquire_like(self, array):
+        """Borrow a buffer with the same shape and dtype as an array."""
+        return self.acquire(array.shape, array.dtype)
+
+    def release(self, buffer):
+        """Return a borrowed buffer to the pool.
+
+        None and arrays that are not currently lent out by this pool are
+        ignored.
+        """
+        if buffer is None:
+            return
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            ref = self._lent.get(id(buffer))
+            if ref is None or ref() is not buffer:
+                return
+            del self._lent[id(buffer)]
+            self.outstanding -= 1
+            free = self._free[key]
+            if len(free) < self.max_free_per_key:
+                free.append(buffer)
+
+    def clear(self):
+        """Drop every idle buffer (e.g. after a resolution change)."""
+        with self._lock:
+            self._free.clear()
+
+    def get_stats(self):
+        """Return allocation statistics.
+
+        Returns:
+            dict: allocations, reuses, outstanding, idle and bytes_allocated
+        """
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'outstanding': self.outstanding,
+                'idle': sum(len(free) for free in self._free.values()),
+                'bytes_allocated': self.bytes_allocated
+            }
+
+
+# Pool shared by the capture, processing and drawing stages
+FRAME_POOL = BufferPool()
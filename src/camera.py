@@ -1,48 +1,300 @@
 import cv2
 import threading
 import time
+from collections import deque
+from .tracing import TRACER, traced
+
+
+def fourcc_to_str(code):
+    """Decode an integer FOURCC code (as returned by CAP_PROP_FOURCC) to text."""
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class CaptureProfile:
+    """Requested capture settings for a WebcamStream.
+
+    Any setting left as None is not sent to the driver, so the default
+    profile only requests 30 FPS (the historic behaviour).
+    """
+
+    def __init__(self, width=None, height=None, fps=30, fourcc=None,
+                 buffer_size=None, backend=cv2.CAP_ANY):
+        """
+        Args:
+            width: Requested frame width in pixels
+            height: Requested frame height in pixels
+            fps: Requested frame rate
+            fourcc: Pixel format as a 4 character string, e.g. 'MJPG'
+            buffer_size: Number of frames the driver may queue (1 = lowest latency)
+            backend: OpenCV capture backend, e.g. cv2.CAP_DSHOW or cv2.CAP_V4L2
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.backend = backend
+
+    def apply(self, capture):
+        """Send the requested settings to an opened capture.
+
+        FOURCC is set first because many drivers reset the resolution
+        and frame rate when the pixel format changes.
+
+        Args:
+            capture: cv2.VideoCapture (or compatible object)
+
+        Returns:
+            dict: Settings actually negotiated with the driver
+        """
+        if self.fourcc:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            capture.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size is not None:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return self.negotiated(capture)
+
+    @staticmethod
+    def negotiated(capture):
+        """Read back the settings the driver is actually using.
+
+        Args:
+            capture: cv2.VideoCapture (or compatible object)
+
+        Returns:
+            dict: width, height, fps, fourcc, buffer_size and backend name
+        """
+        try:
+            backend = capture.getBackendName()
+        except (AttributeError, cv2.error):
+            backend = 'unknown'
+
+        return {
+            'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': capture.get(cv2.CAP_PROP_FPS),
+            'fourcc': fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC)),
+            'buffer_size': int(capture.get(cv2.CAP_PROP_BUFFERSIZE)),
+            'backend': backend
+        }
+
+
+# Small MJPG frames with a single driver buffer: the usual low-latency setup
+LOW_LATENCY_PROFILE = CaptureProfile(width=640, height=480, fps=30,
+                                     fourcc='MJPG', buffer_size=1)
+
+
+class CaptureStats:
+    """Tracks capture timestamps and inter-frame jitter over a sliding window."""
+
+    def __init__(self, window=300):
+        self.intervals = deque(maxlen=window)
+        self.last_timestamp = None
+        self.frame_count = 0
+
+    def record(self, timestamp):
+        """Record the capture time of a new frame (seconds, perf_counter clock)."""
+        if self.last_timestamp is not None:
+            self.intervals.append(timestamp - self.last_timestamp)
+        self.last_timestamp = timestamp
+        self.frame_count += 1
+
+    def summary(self):
+        """Summarize the recent capture cadence.
+
+        Returns:
+            dict: frames, fps, mean_interval_ms, jitter_ms (standard deviation
+                  of the inter-frame interval) and max_interval_ms
+        """
+        n = len(self.intervals)
+        if n == 0:
+            return {'frames': self.frame_count, 'fps': 0.0, 'mean_interval_ms': 0.0,
+                    'jitter_ms': 0.0, 'max_interval_ms': 0.0}
+
+        mean = sum(self.intervals) / n
+        variance = sum((i - mean) ** 2 for i in self.intervals) / n
+        return {
+            'frames': self.frame_count,
+            'fps': 1.0 / mean if mean > 0 else 0.0,
+            'mean_interval_ms': mean * 1000,
+            'jitter_ms': (variance ** 0.5) * 1000,
+            'max_interval_ms': max(self.intervals) * 1000
+        }
+
 
 class WebcamStream:
-    def __init__(self, src=0):
-        self.capture = cv2.VideoCapture(src)
+    def __init__(self, src=0, profile=None, capture=None, runtime_profile=None):
+        """
+        Args:
+            src: Camera index or path to a video file
+            profile: CaptureProfile to apply (defaults to 30 FPS only)
+            capture: Already constructed capture object to use instead of
+                     opening src (e.g. a fake VideoCapture in tests)
+            runtime_profile: Optional RuntimeProfile; the capture thread
+                             pins itself to its 'capture' CPUs
+        """
+        self.profile = profile or CaptureProfile()
+        self.runtime_profile = runtime_profile
+        if capture is None:
+            capture = cv2.VideoCapture(src, self.profile.backend)
+        self.capture = capture
         if not self.capture.isOpened():
             raise ValueError("Could not open webcam.")
-        
+
         # Optimize camera settings for speed
-        self.capture.set(cv2.CAP_PROP_FPS, 30)
-        
+        self.settings = self.profile.apply(self.capture)
+
+        self.stats = CaptureStats()
         self.ret, self.frame = self.capture.read()
+        self.timestamp = time.perf_counter()
+        self.frame_id = 0
+        if self.ret:
+            self.stats.record(self.timestamp)
         self.stopped = False
         self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+
+        # Profile changes are applied by the capture thread between reads;
+        # frames are also paced in software when the driver keeps a higher rate
+        self._requested_profile = None
+        self._wake = threading.Event()
+        self.min_interval = 0.0
 
     def start(self):
         """Starts the thread to read frames from the video stream."""
-        t = threading.Thread(target=self.update, args=())
+        t = threading.Thread(target=self.update, args=(), name="capture")
         t.daemon = True
         t.start()
         return self
 
     def update(self):
         """Keep looping infinitely until the stream is stopped."""
+        if self.runtime_profile is not None:
+            self.runtime_profile.pin('capture')
         while True:
             if self.stopped:
                 return
-            
-            ret, frame = self.capture.read()
+
+            if self._requested_profile is not None:
+                self._apply_requested_profile()
+
+            with TRACER.span('capture'):
+                ret, frame = self.capture.read()
+            timestamp = time.perf_counter()
             if ret:
                 with self.lock:
                     self.ret = ret
                     self.frame = frame
+                    self.timestamp = timestamp
+                    self.frame_id += 1
+                    self.stats.record(timestamp)
+                    self.new_frame.notify_all()
             else:
                 self.stop()
+                continue
+
+            # reconfigure() interrupts the wait, so speeding up is immediate
+            remaining = self.min_interval - (time.perf_counter() - timestamp)
+            if remaining > 0:
+                self._wake.wait(remaining)
+            self._wake.clear()
+
+    def _apply_requested_profile(self):
+        with self.lock:
+            profile, self._requested_profile = self._requested_profile, None
+        settings = profile.apply(self.capture)
+        # Many drivers ignore a frame rate change on an open stream
+        if profile.fps and settings['fps'] > profile.fps * 1.05:
+            self.min_interval = 1.0 / profile.fps
+        else:
+            self.min_interval = 0.0
+        with self.lock:
+            self.profile = profile
+            self.settings = settings
+
+    def reconfigure(self, profile):
+        """Switch to another capture profile without reopening the camera.
+
+        The capture thread applies the profile before its next read. If the
+        driver keeps a higher frame rate than requested, frames are paced in
+        software instead.
+
+        Args:
+            profile: CaptureProfile to apply
+        """
+        with self.lock:
+            self._requested_profile = profile
+        self._wake.set()
+
+    def _copy_frame(self, out):
+        """Copy the current frame into out when it fits, else into a new array."""
+        if self.frame is None:
+            return None
+        if out is not None and out.shape == self.frame.shape and out.dtype == self.frame.dtype:
+            out[...] = self.frame
+            return out
+        return self.frame.copy()
+
+    @property
+    def frame_shape(self):
+        """Shape of the most recent frame (None before the first frame)."""
+        with self.lock:
+            return self.frame.shape if self.frame is not None else None
+
+    @traced('read')
+    def read(self, out=None):
+        """Return the most recent frame.
+
+        Args:
+            out: Optional preallocated buffer to copy the frame into
+        """
+        with self.lock:
+            return self.ret, self._copy_frame(out)
+
+    @traced('read')
+    def read_timestamped(self, out=None):
+        """Return the most recent frame with its capture time.
+
+        Args:
+            out: Optional preallocated buffer to copy the frame into
+
+        Returns:
+            tuple: (ret, frame, timestamp) where timestamp is the
+                   time.perf_counter() value taken when the frame was read
+        """
+        with self.lock:
+            return self.ret, self._copy_frame(out), self.timestamp
+
+    def wait_for_frame(self, frame_id, timeout=None):
+        """Block until a frame newer than `frame_id` has been captured.
+
+        Args:
+            frame_id: ID of the last frame the caller has seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            int: ID of the current frame (equal to frame_id on timeout)
+        """
+        with self.new_frame:
+            self.new_frame.wait_for(lambda: self.frame_id != frame_id or self.stopped, timeout)
+            return self.frame_id
 
-    def read(self):
-        """Return the most recent frame."""
+    def get_stats(self):
+        """Return capture cadence statistics (see CaptureStats.summary)."""
         with self.lock:
-            return self.ret, self.frame.copy() if self.frame is not None else None
+            return self.stats.summary()
 
     def stop(self):
         """Indicate that the thread should be stopped."""
         self.stopped = True
+        self._wake.set()
+        with self.new_frame:
+            self.new_frame.notify_all()
         if self.capture.isOpened():
             self.capture.release()
@@ -0,0 +1,201 @@
+"""
+Face metrics from the 478-point FaceMesh output.
+
+Only the handful of landmarks the metrics need are read out of the
+results, using precomputed index arrays, and every metric is computed for
+all faces at once with array operations:
+
+- eye aspect ratio (EAR) per eye, with blink events from a small state machine
+- mouth opening (inner lip gap over mouth width)
+- head yaw, pitch and roll from cv2.solvePnP on six stable landmarks
+"""
+import cv2
+import numpy as np
+
+# FaceMesh indices of the six EAR points per eye: corner, two upper lid
+# points, the other corner, two lower lid points (p1..p6)
+LEFT_EYE = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+# Inner upper lip, inner lower lip, left and right mouth corners
+MOUTH = [13, 14, 78, 308]
+# Nose tip, chin, outer eye corners, mouth corners
+HEAD_POSE = [1, 152, 263, 33, 291, 61]
+
+# Every landmark the metrics read, and where each group sits in that subset
+SUBSET = np.array(LEFT_EYE + RIGHT_EYE + MOUTH + HEAD_POSE)
+_EYES = np.arange(12).reshape(2, 6)
+_MOUTH = np.arange(12, 16)
+_HEAD_POSE = np.arange(16, 22)
+
+# Generic face model (millimetres) matching HEAD_POSE, in camera axes:
+# x to the image right, y down, z away from the camera, nose tip at the origin
+FACE_MODEL = np.array([
+    (0.0, 0.0, 0.0),         # nose tip
+    (0.0, 63.6, 12.5),       # chin
+    (43.3, -32.7, 26.0),     # left eye outer corner (image right)
+    (-43.3, -32.7, 26.0),    # right eye outer corner
+    (28.9, 28.9, 24.1),      # left mouth corner
+    (-28.9, 28.9, 24.1),     # right mouth corner
+], dtype=np.float64)
+
+
+def landmark_subset(landmark_list, indices=SUBSET):
+    """Read only the given landmarks of a NormalizedLandmarkList.
+
+    Returns:
+        np.ndarray: (len(indices), 2) normalized x, y
+    """
+    landmarks = landmark_list.landmark
+    return np.array([(landmarks[i].x, landmarks[i].y) for i in indices], dtype=np.float64)
+
+
+def eye_aspect_ratios(points):
+    """Eye aspect ratio of both eyes for a batch of faces.
+
+    Args:
+        points: (F, len(SUBSET), 2) landmark subset in pixels
+
+    Returns:
+        np.ndarray: (F, 2) EAR of the left and right eye
+    """
+    eyes = points[:, _EYES]                          # (F, 2, 6, 2)
+    a = eyes[..., [1, 2, 0], :]
+    b = eyes[..., [5, 4, 3], :]
+    lengths = np.linalg.norm(a - b, axis=-1)         # (F, 2, 3)
+    return (lengths[..., 0] + lengths[..., 1]) / (2.0 * lengths[..., 2] + 1e-9)
+
+
+def mouth_opening(points):
+    """Inner lip gap divided by mouth width for a batch of faces.
+
+    Args:
+        points: (F, len(SUBSET), 2) landmark subset in pixels
+
+    Returns:
+        np.ndarray: (F,) mouth opening ratio
+    """
+    mouth = points[:, _MOUTH]
+    gap = np.linalg.norm(mouth[:, 0] - mouth[:, 1], axis=-1)
+    width = np.linalg.norm(mouth[:, 2] - mouth[:, 3], axis=-1)
+    return gap / (width + 1e-9)
+
+
+def head_pose(points, image_size, guess=None):
+    """Estimate head yaw, pitch and roll of one face.
+
+    Args:
+        points: (len(SUBSET), 2) landmark subset in pixels
+        image_size: (width, height) of the frame
+        guess: Optional (rvec, tvec) from the previous frame to start from
+
+    Returns:
+        tuple: ((yaw, pitch, roll) in degrees, (rvec, tvec)), or (None, None)
+               if solvePnP failed
+    """
+    w, h = image_size
+    camera = np.array([[w, 0, w / 2], [0, w, h / 2], [0, 0, 1]], dtype=np.float64)
+    image_points = np.ascontiguousarray(points[_HEAD_POSE])
+    if guess is not None:
+        rvec, tvec = guess[0].copy(), guess[1].copy()
+        ok, rvec, tvec = cv2.solvePnP(FACE_MODEL, image_points, camera, None, rvec, tvec,
+                                      useExtrinsicGuess=True, flags=cv2.SOLVEPNP_ITERATIVE)
+    else:
+        ok, rvec, tvec = cv2.solvePnP(FACE_MODEL, image_points, camera, None,
+                                      flags=cv2.SOLVEPNP_ITERATIVE)
+    if not ok:
+        return None, None
+    rotation, _ = cv2.Rodrigues(rvec)
+    pitch, yaw, roll = cv2.RQDecomp3x3(rotation)[0]
+    return (yaw, pitch, roll), (rvec, tvec)
+
+
+class FaceAnalyzer:
+    """Computes per-face metrics and keeps the blink state between frames."""
+
+    def __init__(self, blink_threshold=0.21, blink_max_duration=0.5, mouth_open_threshold=0.35,
+                 max_faces=4):
+        """
+        Args:
+            blink_threshold: EAR below which the eyes count as closed
+            blink_max_duration: Longest closure (seconds) still counted as a blink
+            mouth_open_threshold: Mouth opening ratio above which the mouth is open
+            max_faces: Number of faces whose temporal state is tracked
+        """
+        self.blink_threshold = blink_threshold
+        # Eyes must open a little past the threshold to end a closure
+        self.reopen_threshold = blink_threshold + 0.02
+        self.blink_max_duration = blink_max_duration
+        self.mouth_open_threshold = mouth_open_threshold
+        self.max_faces = max_faces
+        self.reset()
+
+    def reset(self):
+        """Forget the blink state and head pose of every face."""
+        self.closed_since = [None] * self.max_faces
+        self.blink_counts = [0] * self.max_faces
+        self.last_seen = [None] * self.max_faces
+        self.pose_guess = [None] * self.max_faces
+
+    def analyze(self, face_landmarks, image_size, timestamp):
+        """Compute the metrics of every face in a frame.
+
+        Args:
+            face_landmarks: List of NormalizedLandmarkList (multi_face_landmarks)
+            image_size: (width, height) of the frame
+            timestamp: Capture time in seconds
+
+        Returns:
+            list: One dict per face with ear_left, ear_right, ear, eyes_closed,
+                  blink (True on the frame a blink ends), blinks (count),
+                  mouth_open_ratio, mouth_open, yaw, pitch and roll (degrees,
+                  None if the pose could not be solved)
+        """
+        faces = list(face_landmarks or [])[:self.max_faces]
+        if not faces:
+            return []
+
+        w, h = image_size
+        points = np.stack([landmark_subset(face) for face in faces])
+        points *= (w, h)
+        ears = eye_aspect_ratios(points)
+        mouths = mouth_opening(points)
+
+        metrics = []
+        for i in range(len(faces)):
+            ear = float(ears[i].mean())
+            blink = self._update_blink(i, ear, timestamp)
+            angles, self.pose_guess[i] = head_pose(points[i], image_size, self.pose_guess[i])
+            yaw, pitch, roll = angles if angles else (None, None, None)
+            metrics.append({
+                'ear_left': float(ears[i, 0]),
+                'ear_right': float(ears[i, 1]),
+                'ear': ear,
+                'eyes_closed': self.closed_since[i] is not None,
+                'blink': blink,
+                'blinks': self.blink_counts[i],
+                'mouth_open_ratio': float(mouths[i]),
+                'mouth_open': bool(mouths[i] > self.mouth_open_threshold),
+                'yaw': yaw,
+                'pitch': pitch,
+                'roll': roll
+            })
+        return metrics
+
+    def _update_blink(self, i, ear, timestamp):
+        # A face that vanished for a while starts over
+        if self.last_seen[i] is not None and timestamp - self.last_seen[i] > self.blink_max_duration:
+            self.closed_since[i] = None
+            self.pose_guess[i] = None
+        self.last_seen[i] = timestamp
+
+        if self.closed_since[i] is None:
+            if ear < self.blink_threshold:
+                self.closed_since[i] = timestamp
+            return False
+        if ear >= self.reopen_threshold:
+            duration = timestamp - self.closed_since[i]
+            self.closed_since[i] = None
+            if duration <= self.blink_max_duration:
+                self.blink_counts[i] += 1
+                return True
+        return False
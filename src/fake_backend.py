@@ -0,0 +1,302 @@
+"""
+Deterministic fake inference backend.
+
+Either replays landmark fixtures or synthesises plausible motion: a hand
+drifting around the frame while it rotates, curls its fingers and pinches,
+a swaying face mesh, a body (or a group) doing arm curls and squats, and a swaying
+head-and-shoulders person mask. Landmark results are precomputed when a
+graph is built, so `process` costs nothing and the stages after inference
+can be profiled and load-tested on their own. Masks depend on the input
+size, so they are drawn on demand (a few microseconds at segmentation
+resolution); fixtures carry no masks, so they are always synthesised.
+
+Output depends only on how many frames have been processed, never on wall
+time, so runs are reproducible.
+"""
+import math
+import cv2
+import numpy as np
+from .inference import (InferenceBackend, make_hands_result, make_face_result,
+                        make_pose_result, make_multi_pose_result, make_segmentation_result)
+
+
+# Hand skeleton in "hand units": wrist at the origin, wrist to middle MCP = 1,
+# fingers pointing up (-y). Each finger: base position, direction, segment lengths.
+_FINGERS = [
+    ((-0.35, -0.15), -50.0, (0.35, 0.30, 0.25)),  # thumb (1-4)
+    ((-0.30, -0.95), -8.0, (0.45, 0.28, 0.22)),   # index (5-8)
+    ((0.00, -1.00), 0.0, (0.50, 0.30, 0.24)),     # middle (9-12)
+    ((0.25, -0.95), 8.0, (0.45, 0.28, 0.22)),     # ring (13-16)
+    ((0.45, -0.85), 16.0, (0.35, 0.22, 0.20)),    # pinky (17-20)
+]
+
+# Synthesised sequences repeat after this many frames
+SYNTHETIC_PERIOD = 180
+
+
+def synth_hand(frame, hand_index=0):
+    """Synthesise one frame of plausible hand motion.
+
+    Args:
+        frame: Frame number
+        hand_index: 0 for the first hand, 1 for a second (mirrored) hand;
+                    further hands repeat the pair higher up in the frame
+
+    Returns:
+        np.ndarray: (21, 3) normalized landmarks
+    """
+    t = frame / SYNTHETIC_PERIOD * 2 * math.pi
+    side = -1.0 if hand_index % 2 else 1.0
+
+    # Fingers curl one after another, the thumb pinches the index every cycle
+    curls = [max(0.0, math.sin(3 * t - i * 0.9)) * 70.0 for i in range(5)]
+    curls[0] = max(0.0, math.sin(2 * t)) * 35.0
+
+    points = np.zeros((21, 3), dtype=np.float32)
+    for f, (base, direction, lengths) in enumerate(_FINGERS):
+        x, y = base
+        points[1 + 4 * f] = (x, y, -0.02 * f)
+        angle = math.radians(direction)
+        for j, length in enumerate(lengths):
+            angle += math.radians(curls[f]) * (1 if f else -1)
+            x += length * math.sin(angle)
+            y -= length * math.cos(angle)
+            points[2 + 4 * f + j] = (x, y, -0.03 * (j + 1))
+
+    points[:, 0] *= side
+    rotation = math.radians(20.0 * math.sin(2 * t))
+    cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+    xy = points[:, :2].copy()
+    points[:, 0] = xy[:, 0] * cos_r - xy[:, 1] * sin_r
+    points[:, 1] = xy[:, 0] * sin_r + xy[:, 1] * cos_r
+
+    scale = 0.16
+    cx = 0.5 + side * 0.22 * math.sin(t) - (0.2 if hand_index % 2 else 0.0)
+    cy = 0.62 + 0.1 * math.sin(2 * t) - 0.3 * (hand_index // 2)
+    points[:, 0] = cx + points[:, 0] * scale
+    points[:, 1] = cy + points[:, 1] * scale
+    points[:, 2] *= scale
+    return points
+
+
+def synth_face(frame, seed=0):
+    """Synthesise one frame of a 478-point face mesh swaying left and right."""
+    rng = np.random.default_rng(seed)
+    radius = np.sqrt(rng.uniform(0, 1, 478))
+    theta = rng.uniform(0, 2 * math.pi, 478)
+    base = np.stack([0.11 * radius * np.cos(theta), 0.15 * radius * np.sin(theta),
+                     -0.05 * (1 - radius)], axis=1)
+
+    t = frame / SYNTHETIC_PERIOD * 2 * math.pi
+    face = base.astype(np.float32)
+    face[:, 0] += 0.5 + 0.05 * math.sin(t)
+    face[:, 1] += 0.45 + 0.02 * math.sin(2 * t)
+    return face
+
+
+def synth_pose(frame):
+    """Synthesise one frame of a body doing arm curls and squats.
+
+    Returns:
+        np.ndarray: (33, 4) landmarks (x, y, z, visibility)
+    """
+    t = frame / SYNTHETIC_PERIOD * 2 * math.pi
+    elbow_angle = math.radians(105 + 70 * math.cos(3 * t))  # 35-175 deg, 3 curls per period
+    knee_angle = math.radians(125 + 50 * math.cos(2 * t))   # 75-175 deg, 2 squats per period
+
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[:, 3] = 0.99
+    thigh = shin = 0.16
+    upper_arm = forearm = 0.12
+
+    for side, sign in ((0, 1.0), (1, -1.0)):  # 0 = left (image right), 1 = right
+        ankle = np.array([0.5 + sign * 0.08, 0.92])
+        hip_height = 2 * thigh * math.sin(knee_angle / 2)
+        hip = np.array([0.5 + sign * 0.06, ankle[1] - hip_height])
+        knee = (hip + ankle) / 2 + np.array([sign * thigh * math.cos(knee_angle / 2), 0.0])
+
+        shoulder = np.array([0.5 + sign * 0.1, hip[1] - 0.28])
+        elbow = shoulder + np.array([sign * 0.02, upper_arm])
+        # The forearm is the elbow->shoulder direction turned (outwards) by
+        # the elbow angle: 175 deg hangs the arm straight, 35 deg curls it up
+        up = (shoulder - elbow) / np.linalg.norm(shoulder - elbow)
+        turn = sign * elbow_angle
+        wrist = elbow + forearm * np.array([up[0] * math.cos(turn) - up[1] * math.sin(turn),
+                                            up[0] * math.sin(turn) + up[1] * math.cos(turn)])
+
+        pose[11 + side, :2] = shoulder
+        pose[13 + side, :2] = elbow
+        pose[15 + side, :2] = wrist
+        for k, offset in enumerate((17, 19, 21)):  # pinky, index, thumb
+            pose[offset + side, :2] = wrist + np.array([sign * 0.01 * (k - 1), 0.02])
+        pose[23 + side, :2] = hip
+        pose[25 + side, :2] = knee
+        pose[27 + side, :2] = ankle
+        pose[29 + side, :2] = ankle + np.array([-0.01 * sign, 0.02])
+        pose[31 + side, :2] = ankle + np.array([0.03 * sign, 0.025])
+
+    head = (pose[11, :2] + pose[12, :2]) / 2 + np.array([0.0, -0.1])
+    pose[0, :2] = head
+    for i in range(1, 11):
+        dx = ((i - 1) % 5 - 2) * 0.012
+        dy = -0.015 if i < 7 else (0.005 if i < 9 else 0.025)
+        pose[i, :2] = head + np.array([dx, dy])
+    return pose
+
+
+def synth_people(frame, num_people):
+    """Synthesise a group: people side by side doing curls and squats out of step.
+
+    The number in view cycles from one to num_people over the period, so
+    throughput can be measured per number of people.
+
+    Returns:
+        tuple: (list of (33, 4) landmark arrays, person IDs, boxes)
+    """
+    in_view = 1 + (frame * num_people // SYNTHETIC_PERIOD) % num_people
+    scale = min(1.0, 1.6 / num_people)
+    poses, ids, boxes = [], [], []
+    for person in range(in_view):
+        pose = synth_pose(frame + person * SYNTHETIC_PERIOD // 7)
+        cx = (person + 0.5) / num_people
+        pose[:, 0] = cx + (pose[:, 0] - 0.5) * scale
+        pose[:, 1] = 1.0 - (1.0 - pose[:, 1]) * scale
+        poses.append(pose)
+        ids.append(person)
+        boxes.append((float(pose[:, 0].min()), float(pose[:, 1].min()),
+                      float(pose[:, 0].max()), float(pose[:, 1].max())))
+    return poses, ids, boxes
+
+
+def synth_segmentation(frame, size):
+    """Synthesise one frame of a head-and-shoulders person mask swaying left and right.
+
+    Args:
+        frame: Frame number
+        size: (width, height) of the mask
+
+    Returns:
+        np.ndarray: (height, width) float32 mask, 1 on the person
+    """
+    w, h = size
+    t = frame / SYNTHETIC_PERIOD * 2 * math.pi
+    cx = round(w * (0.5 + 0.08 * math.sin(t)))
+    mask = np.zeros((h, w), dtype=np.float32)
+    cv2.ellipse(mask, (cx, round(h * 0.4)), (round(w * 0.09), round(h * 0.17)), 0, 0, 360, 1.0, -1)
+    cv2.ellipse(mask, (cx, h), (round(w * 0.26), round(h * 0.42)), 0, 180, 360, 1.0, -1)
+    return mask
+
+
+def write_fixture(path, hands=None, handedness=None, face=None, pose=None):
+    """Save landmark sequences as a fixture for FakeBackend.
+
+    Args:
+        path: Output .npz path
+        hands: (T, H, 21, 3) array; NaN rows mean the hand is missing
+        handedness: (H,) labels for the hands
+        face: (T, F, 478, 3) array; NaN rows mean the face is missing
+        pose: (T, 33, 4) array; NaN frames mean no person
+    """
+    arrays = {}
+    for key, value in (('hands', hands), ('handedness', handedness), ('face', face), ('pose', pose)):
+        if value is not None:
+            arrays[key] = np.asarray(value)
+    np.savez_compressed(path, **arrays)
+
+
+class FakeBackend(InferenceBackend):
+    """Zero-cost backend replaying fixtures or synthesised landmarks."""
+
+    name = 'fake'
+
+    def __init__(self, fixture=None, num_hands=1, max_num_hands=None, max_num_faces=None,
+                 seed=0, swap_hands=False, num_people=1, max_num_people=None):
+        """
+        Args:
+            fixture: Optional .npz written by write_fixture() to replay
+            num_hands: Number of synthesised hands
+            max_num_hands: Accepted for interface compatibility; caps num_hands
+            max_num_faces: Accepted for interface compatibility
+            seed: Seed for the synthesised face mesh
+            swap_hands: Rotate the order of synthesised hands every frame, as
+                        MediaPipe's order is not stable either
+            num_people: Largest number of synthesised people in 'multipose'
+            max_num_people: Accepted for interface compatibility; caps num_people
+        """
+        self.fixture = fixture
+        self.num_hands = min(num_hands, max_num_hands) if max_num_hands else num_hands
+        self.seed = seed
+        self.swap_hands = swap_hands
+        self.num_people = min(num_people, max_num_people) if max_num_people else num_people
+        self.sequences = {}
+        self.frame_counts = {}
+        self._data = None
+        if fixture:
+            with np.load(fixture) as data:
+                self._data = {key: data[key] for key in data.files}
+
+    def build(self, name):
+        if name == 'segment':
+            # Masks are drawn in process() at the size of the input
+            self.sequences[name] = None
+        elif self._data is not None:
+            self.sequences[name] = self._replay(name)
+        else:
+            self.sequences[name] = self._synthesise(name)
+        self.frame_counts[name] = 0
+        return self.sequences[name]
+
+    def _synthesise(self, name):
+        frames = range(SYNTHETIC_PERIOD)
+        if name == 'hands':
+            sequence = []
+            for k in frames:
+                order = list(range(self.num_hands))
+                if self.swap_hands:
+                    shift = k % self.num_hands
+                    order = order[shift:] + order[:shift]
+                sequence.append(make_hands_result([synth_hand(k, h) for h in order],
+                                                  [('Right', 'Left')[h % 2] for h in order]))
+            return sequence
+        elif name == 'face':
+            return [make_face_result([synth_face(k, self.seed)]) for k in frames]
+        elif name == 'pose':
+            return [make_pose_result(synth_pose(k)) for k in frames]
+        elif name == 'multipose':
+            return [make_multi_pose_result(*synth_people(k, self.num_people)) for k in frames]
+        raise ValueError(f"Unknown graph: {name}")
+
+    def _replay(self, name):
+        data = self._data
+        if name == 'hands' and 'hands' in data:
+            labels = [str(label) for label in data.get('handedness', [])]
+            sequence = []
+            for hands in data['hands']:
+                present = [i for i, hand in enumerate(hands) if not np.isnan(hand).any()]
+                sequence.append(make_hands_result(
+                    [hands[i] for i in present],
+                    [labels[i] if i < len(labels) else 'Right' for i in present]))
+            return sequence
+        elif name == 'face' and 'face' in data:
+            return [make_face_result([face for face in faces if not np.isnan(face).any()])
+                    for faces in data['face']]
+        elif name == 'pose' and 'pose' in data:
+            return [make_pose_result(None if np.isnan(pose).any() else pose)
+                    for pose in data['pose']]
+        elif name == 'multipose' and 'pose' in data:
+            # The fixture's single person, as a group of one
+            return [make_multi_pose_result([] if np.isnan(pose).any() else [pose], [0])
+                    for pose in data['pose']]
+        # Graph not in the fixture: behave like an empty scene
+        empty = {'hands': make_hands_result([]), 'face': make_face_result([]),
+                 'pose': make_pose_result(None), 'multipose': make_multi_pose_result([], [])}
+        return [empty[name]]
+
+    def process(self, name, image_rgb, timestamp):
+        sequence = self.sequences[name]
+        index = self.frame_counts[name]
+        self.frame_counts[name] = index + 1
+        if name == 'segment':
+            h, w = image_rgb.shape[:2]
+            return make_segmentation_result(synth_segmentation(index, (w, h)))
+        return sequence[index % len(sequence)]
@@ -1,6 +1,7 @@
 """
 Finger counter module for detecting and counting raised fingers.
 """
+from .tracing import traced
 
 class FingerCounter:
     """Counts the number of raised fingers from hand landmarks."""
@@ -91,6 +92,7 @@ class FingerCounter:
         
         return fingers_up
     
+    @traced()
     def count_all_hands(self, multi_hand_landmarks, multi_handedness):
         """Count total fingers from all detected hands.
         
@@ -0,0 +1,315 @@
+"""
+Temporal gesture engine for dynamic hand gestures.
+
+Recent hand landmarks are kept in a fixed-size NumPy ring buffer. Sliding
+window features (velocity, pinch distance, angular velocity, accumulated
+turning and direction reversals) are updated incrementally in O(1) per
+frame, and every registered gesture is evaluated against the feature
+vector with a handful of vectorized comparisons.
+"""
+import math
+import numpy as np
+from .tracing import traced
+
+
+# Landmark indices used by the features
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+
+# Names of the entries of the feature vector, in order
+FEATURES = ('vx', 'vy', 'speed', 'pinch', 'angular_velocity', 'turn', 'reversals', 'duration')
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+
+def _wrap_degrees(angle):
+    """Wrap an angle difference to the range [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class GestureSpec:
+    """Declarative description of a gesture.
+
+    A gesture is active while every condition holds. It fires an event once
+    it has been active for `hold` seconds, then stays latched until the
+    conditions stop holding, and does not fire again within `cooldown`.
+    """
+
+    def __init__(self, name, conditions, hold=0.0, cooldown=0.5):
+        """
+        Args:
+            name: Gesture name reported in events
+            conditions: Dict mapping a feature name (see FEATURES) to an
+                        inclusive (min, max) range; use None for no bound
+            hold: Seconds the conditions must hold before the event fires
+            cooldown: Minimum seconds between two events of this gesture
+        """
+        unknown = set(conditions) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown gesture features: {sorted(unknown)}")
+        self.name = name
+        self.conditions = conditions
+        self.hold = hold
+        self.cooldown = cooldown
+
+
+# Velocities are in frame widths/heights per second and directions are in
+# image coordinates (the preview is not mirrored). Pinch distance is
+# relative to the wrist-to-middle-MCP length so it does not depend on how
+# far the hand is from the camera.
+DEFAULT_GESTURES = [
+    GestureSpec('swipe_right', {'vx': (1.2, None), 'pinch': (0.35, None)}, cooldown=0.6),
+    GestureSpec('swipe_left', {'vx': (None, -1.2), 'pinch': (0.35, None)}, cooldown=0.6),
+    GestureSpec('swipe_up', {'vy': (None, -1.2), 'pinch': (0.35, None)}, cooldown=0.6),
+    GestureSpec('swipe_down', {'vy': (1.2, None), 'pinch': (0.35, None)}, cooldown=0.6),
+    GestureSpec('pinch', {'pinch': (None, 0.25), 'speed': (None, 0.3)}, hold=0.15),
+    GestureSpec('pinch_drag', {'pinch': (None, 0.25), 'speed': (0.3, None)}, hold=0.1),
+    GestureSpec('wave', {'reversals': (3, None)}, cooldown=1.0),
+    GestureSpec('circle_cw', {'turn': (300, None)}, cooldown=1.0),
+    GestureSpec('circle_ccw', {'turn': (None, -300)}, cooldown=1.0),
+]
+
+
+class LandmarkHistory:
+    """Fixed-size ring buffer of hand landmarks with per-frame derived values.
+
+    Frames are addressed by an ever increasing index; frame i lives in slot
+    i % capacity.
+    """
+
+    def __init__(self, capacity=128, num_landmarks=21):
+        self.capacity = capacity
+        self.points = np.zeros((capacity, num_landmarks, 3), dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.angles = np.zeros(capacity, dtype=np.float64)
+        # Signed heading change of the index fingertip path (degrees)
+        self.turns = np.zeros(capacity, dtype=np.float64)
+        # 1 where the horizontal direction of motion reversed
+        self.reversals = np.zeros(capacity, dtype=np.float64)
+        self.head = 0  # Index of the next frame to be written
+
+    def __len__(self):
+        return min(self.head, self.capacity)
+
+    def slot(self, index):
+        return index % self.capacity
+
+    def clear(self):
+        self.head = 0
+
+
+class GestureEngine:
+    """Evaluates declarative dynamic gestures over a landmark history."""
+
+    def __init__(self, gestures=None, window=1.0, velocity_window=0.25,
+                 capacity=128, max_gap=0.3, min_motion_speed=0.3):
+        """
+        Args:
+            gestures: List of GestureSpec (defaults to DEFAULT_GESTURES)
+            window: Seconds of history used for turning and reversals
+            velocity_window: Seconds of history used for velocities
+            capacity: Maximum number of frames kept in the ring buffer
+            max_gap: History is reset when no hand is seen for this long
+            min_motion_speed: Fingertip speed (frame widths per second) below
+                              which motion is treated as jitter
+        """
+        self.window = window
+        self.velocity_window = velocity_window
+        self.max_gap = max_gap
+        self.min_motion_speed = min_motion_speed
+        self.history = LandmarkHistory(capacity)
+        self.features = np.zeros(len(FEATURES), dtype=np.float64)
+        self.gestures = []
+        self.register(gestures if gestures is not None else DEFAULT_GESTURES)
+        self.reset()
+
+    def register(self, gestures):
+        """Add gestures and recompile the vectorized detector tables.
+
+        Args:
+            gestures: Iterable of GestureSpec
+        """
+        self.gestures.extend(gestures)
+
+        feature_ids, lows, highs, owners = [], [], [], []
+        for owner, spec in enumerate(self.gestures):
+            for feature, (low, high) in spec.conditions.items():
+                feature_ids.append(FEATURE_INDEX[feature])
+                lows.append(-np.inf if low is None else low)
+                highs.append(np.inf if high is None else high)
+                owners.append(owner)
+
+        n = len(self.gestures)
+        self._clause_feature = np.array(feature_ids, dtype=np.intp)
+        self._clause_low = np.array(lows, dtype=np.float64)
+        self._clause_high = np.array(highs, dtype=np.float64)
+        self._clause_owner = np.array(owners, dtype=np.intp)
+        self._hold = np.array([spec.hold for spec in self.gestures], dtype=np.float64)
+        self._cooldown = np.array([spec.cooldown for spec in self.gestures], dtype=np.float64)
+        self._names = np.array([spec.name for spec in self.gestures])
+        self._active_since = np.full(n, np.nan)
+        self._last_fired = np.full(n, -np.inf)
+        self._latched = np.zeros(n, dtype=bool)
+        self.active = np.zeros(n, dtype=bool)
+
+    def reset(self):
+        """Forget the landmark history and all gesture state."""
+        self.history.clear()
+        self._tail = 0
+        self._velocity_tail = 0
+        self._turn_sum = 0.0
+        self._reversal_sum = 0.0
+        self._last_heading = None
+        self._last_x_sign = 0
+        self.features.fill(0.0)
+        self._active_since.fill(np.nan)
+        self._latched.fill(False)
+        self.active.fill(False)
+
+    def _evict(self):
+        """Drop the oldest frame from the long window."""
+        h = self.history
+        self._tail += 1
+        slot = h.slot(self._tail)
+        self._turn_sum -= h.turns[slot]
+        self._reversal_sum -= h.reversals[slot]
+        self._velocity_tail = max(self._velocity_tail, self._tail)
+
+    def push(self, points, timestamp):
+        """Append one frame of landmarks and update the window features.
+
+        Args:
+            points: (21, 3) array of normalized landmark coordinates
+            timestamp: Capture time of the frame in seconds
+
+        Returns:
+            np.ndarray: The updated feature vector (see FEATURES)
+        """
+        h = self.history
+        if h.head and timestamp - h.times[h.slot(h.head - 1)] > self.max_gap:
+            self.reset()
+
+        # Ring is full: the oldest frame is about to be overwritten
+        if h.head - self._tail >= h.capacity:
+            self._evict()
+
+        index = h.head
+        slot = h.slot(index)
+        h.points[slot] = points
+        h.times[slot] = timestamp
+
+        wrist = h.points[slot, WRIST]
+        palm = h.points[slot, MIDDLE_MCP]
+        h.angles[slot] = math.degrees(math.atan2(palm[0] - wrist[0], palm[1] - wrist[1]))
+
+        turn = 0.0
+        reversal = 0.0
+        if index > 0:
+            previous = h.slot(index - 1)
+            dt = timestamp - h.times[previous]
+            if dt > 0:
+                dx = float(h.points[slot, INDEX_TIP, 0] - h.points[previous, INDEX_TIP, 0])
+                dy = float(h.points[slot, INDEX_TIP, 1] - h.points[previous, INDEX_TIP, 1])
+                if math.hypot(dx, dy) / dt >= self.min_motion_speed:
+                    heading = math.degrees(math.atan2(dy, dx))
+                    if self._last_heading is not None:
+                        turn = _wrap_degrees(heading - self._last_heading)
+                    self._last_heading = heading
+                if abs(dx) / dt >= self.min_motion_speed:
+                    x_sign = 1 if dx > 0 else -1
+                    if self._last_x_sign and x_sign != self._last_x_sign:
+                        reversal = 1.0
+                    self._last_x_sign = x_sign
+
+        h.turns[slot] = turn
+        h.reversals[slot] = reversal
+        h.head += 1
+        if index > self._tail:
+            self._turn_sum += turn
+            self._reversal_sum += reversal
+
+        # Slide both windows forward (amortized O(1))
+        while self._tail < index and timestamp - h.times[h.slot(self._tail)] > self.window:
+            self._evict()
+        while (self._velocity_tail < index and
+               timestamp - h.times[h.slot(self._velocity_tail)] > self.velocity_window):
+            self._velocity_tail += 1
+
+        self._update_features(slot, timestamp)
+        return self.features
+
+    def _update_features(self, slot, timestamp):
+        h = self.history
+        f = self.features
+
+        v_slot = h.slot(self._velocity_tail)
+        v_dt = timestamp - h.times[v_slot]
+        if v_dt > 0:
+            f[0] = (h.points[slot, MIDDLE_MCP, 0] - h.points[v_slot, MIDDLE_MCP, 0]) / v_dt
+            f[1] = (h.points[slot, MIDDLE_MCP, 1] - h.points[v_slot, MIDDLE_MCP, 1]) / v_dt
+            f[4] = _wrap_degrees(h.angles[slot] - h.angles[v_slot]) / v_dt
+        else:
+            f[0] = f[1] = f[4] = 0.0
+        f[2] = math.hypot(f[0], f[1])
+
+        p = h.points[slot]
+        scale = math.hypot(p[MIDDLE_MCP, 0] - p[WRIST, 0], p[MIDDLE_MCP, 1] - p[WRIST, 1])
+        pinch = math.hypot(p[THUMB_TIP, 0] - p[INDEX_TIP, 0], p[THUMB_TIP, 1] - p[INDEX_TIP, 1])
+        f[3] = pinch / scale if scale > 1e-6 else 0.0
+
+        f[5] = self._turn_sum
+        f[6] = self._reversal_sum
+        f[7] = timestamp - h.times[h.slot(self._tail)]
+
+    def evaluate(self, timestamp):
+        """Evaluate all registered gestures against the current features.
+
+        Args:
+            timestamp: Time of the current frame in seconds
+
+        Returns:
+            list: Names of gestures that fired on this frame
+        """
+        if not self.gestures:
+            return []
+
+        values = self.features[self._clause_feature]
+        failed = ~((values >= self._clause_low) & (values <= self._clause_high))
+        failures = np.bincount(self._clause_owner, weights=failed, minlength=len(self.gestures))
+        active = failures == 0
+
+        starting = active & np.isnan(self._active_since)
+        self._active_since[starting] = timestamp
+        self._active_since[~active] = np.nan
+        self._latched &= active
+
+        held = active & (timestamp - self._active_since >= self._hold)
+        fire = held & ~self._latched & (timestamp - self._last_fired >= self._cooldown)
+        self._last_fired[fire] = timestamp
+        self._latched |= fire
+        self.active = active
+
+        return self._names[fire].tolist()
+
+    @traced()
+    def update(self, points, timestamp):
+        """Push a frame and evaluate gestures in one call.
+
+        Args:
+            points: (21, 3) array of normalized landmark coordinates
+            timestamp: Capture time of the frame in seconds
+
+        Returns:
+            list: Names of gestures that fired on this frame
+        """
+        self.push(points, timestamp)
+        return self.evaluate(timestamp)
+
+    def active_gestures(self):
+        """Return the names of gestures whose conditions currently hold."""
+        return self._names[self.active].tolist()
+
+    def get_features(self):
+        """Return the current features as a dict keyed by feature name."""
+        return dict(zip(FEATURES, self.features.tolist()))
@@ -1,19 +1,44 @@
 import math
+import time
 import numpy as np
+from .tracing import traced
 
 
 class GestureRecognizer:
-    """Recognizes hand gestures from MediaPipe hand landmarks."""
+    """Recognizes hand gestures from MediaPipe hand landmarks.
+
+    All dynamics are based on frame timestamps rather than frame counts, so
+    the response is the same at any frame rate and frames can be skipped.
+    The per-frame constants below were tuned at REFERENCE_FPS and are
+    converted to rates once.
+    """
     
     # Configuration
-    ROTATION_THRESHOLD = 5.0  # Minimum rotation angle (degrees) to trigger volume change
-    SMOOTHING_FACTOR = 0.15   # Volume change smoothing (0-1) - lower = smoother
+    REFERENCE_FPS = 30.0      # Frame rate the per-frame constants were tuned at
+    ROTATION_THRESHOLD = 5.0  # Minimum rotation (degrees per frame at REFERENCE_FPS) to trigger volume change
+    SMOOTHING_FACTOR = 0.15   # Volume change smoothing per frame at REFERENCE_FPS (0-1) - lower = smoother
     VOLUME_CHANGE_RATE = 2.0  # Volume change per degree of rotation
+
+    # Time-based equivalents
+    ROTATION_SPEED_THRESHOLD = ROTATION_THRESHOLD * REFERENCE_FPS  # degrees per second
+    SMOOTHING_TIME_CONSTANT = -1.0 / (REFERENCE_FPS * math.log(1.0 - SMOOTHING_FACTOR))  # ~0.2 s
+    # The old per-frame smoothing applied 15% of each step and discarded the
+    # rest, so the net response was this many volume points per degree
+    VOLUME_PER_DEGREE = VOLUME_CHANGE_RATE * SMOOTHING_FACTOR
     
-    def __init__(self):
+    def __init__(self, clock=time.perf_counter):
+        """
+        Args:
+            clock: Function returning the current time in seconds, used when
+                   no frame timestamp is passed
+        """
+        self.clock = clock
         self.current_volume = 50  # Start at 50%
+        self.target_volume = 50  # Volume the smoothed volume moves towards
         self.previous_angle = None  # Track previous palm angle
+        self.previous_time = None  # Timestamp of the previous palm angle
         self.base_angle = None  # Reference angle when palm is centered
+        self.rotation_speed = 0.0  # Palm angular speed (degrees per second)
         
     def calculate_distance(self, point1, point2):
         """Calculate Euclidean distance between two landmarks.
@@ -63,93 +88,110 @@ class GestureRecognizer:
         
         return angle_deg
     
-    def detect_rotation(self, hand_landmarks):
+    def detect_rotation(self, hand_landmarks, timestamp=None):
         """Detect palm rotation and calculate volume change.
         
         Args:
             hand_landmarks: MediaPipe hand landmarks
+            timestamp: Frame time in seconds (defaults to the clock)
             
         Returns:
             tuple: (current_angle, angle_delta, rotation_direction)
                   rotation_direction: 'right', 'left', or 'none'
         """
+        if timestamp is None:
+            timestamp = self.clock()
         current_angle = self.calculate_palm_angle(hand_landmarks)
         
         # Initialize base angle on first detection
         if self.base_angle is None:
             self.base_angle = current_angle
             self.previous_angle = current_angle
+            self.previous_time = timestamp
+            self.rotation_speed = 0.0
             return current_angle, 0, 'none'
         
-        # Calculate angle change from previous frame
-        if self.previous_angle is not None:
-            angle_delta = current_angle - self.previous_angle
-            
-            # Determine rotation direction
-            if abs(angle_delta) > self.ROTATION_THRESHOLD:
-                if angle_delta > 0:
-                    rotation_direction = 'right'
-                else:
-                    rotation_direction = 'left'
+        # Calculate angle change since the previous frame, wrapped to
+        # (-180, 180] so crossing the atan2 discontinuity is not a full turn
+        angle_delta = (current_angle - self.previous_angle + 180.0) % 360.0 - 180.0
+        dt = timestamp - self.previous_time
+        self.rotation_speed = angle_delta / dt if dt > 0 else 0.0
+        
+        # Determine rotation direction from the angular speed
+        if abs(self.rotation_speed) > self.ROTATION_SPEED_THRESHOLD:
+            if angle_delta > 0:
+                rotation_direction = 'right'
             else:
-                rotation_direction = 'none'
+                rotation_direction = 'left'
         else:
-            angle_delta = 0
             rotation_direction = 'none'
         
         self.previous_angle = current_angle
+        self.previous_time = timestamp
         
         return current_angle, angle_delta, rotation_direction
     
-    def update_volume_from_rotation(self, angle_delta):
+    def update_volume_from_rotation(self, angle_delta, dt=0.0):
         """Update volume based on rotation angle change.
         
         Args:
             angle_delta: Change in palm angle (degrees)
+            dt: Seconds since the previous frame
             
         Returns:
             int: New volume level (0-100)
         """
-        # Calculate volume change
         # Positive angle_delta (right rotation) = increase volume
         # Negative angle_delta (left rotation) = decrease volume
-        volume_change = angle_delta * self.VOLUME_CHANGE_RATE
-        
-        # Apply change with smoothing
-        target_volume = self.current_volume + volume_change
+        target_volume = self.target_volume + angle_delta * self.VOLUME_PER_DEGREE
         
         # Clamp to valid range
-        target_volume = max(0, min(100, target_volume))
+        self.target_volume = max(0, min(100, target_volume))
         
-        # Apply smoothing to avoid jitter
-        self.current_volume = (
-            self.SMOOTHING_FACTOR * target_volume +
-            (1 - self.SMOOTHING_FACTOR) * self.current_volume
-        )
+        return self.smooth_volume(dt)
+    
+    def smooth_volume(self, dt):
+        """Move the volume towards the target volume to avoid jitter.
         
-        return int(self.current_volume)
+        Args:
+            dt: Seconds since the previous frame
+            
+        Returns:
+            int: New volume level (0-100)
+        """
+        if dt > 0:
+            alpha = 1.0 - math.exp(-dt / self.SMOOTHING_TIME_CONSTANT)
+            self.current_volume += alpha * (self.target_volume - self.current_volume)
+        return int(round(self.current_volume))
     
-    def get_gesture_info(self, hand_landmarks):
+    @traced()
+    def get_gesture_info(self, hand_landmarks, timestamp=None):
         """Get comprehensive gesture information.
         
         Args:
             hand_landmarks: MediaPipe hand landmarks
+            timestamp: Frame time in seconds (defaults to the clock)
             
         Returns:
             dict: Gesture information including:
                 - palm_angle: float (current palm rotation angle)
                 - rotation_direction: str ('right', 'left', or 'none')
+                - rotation_speed: float (degrees per second)
                 - volume: int (0-100)
                 - wrist_pos: tuple (x, y)
                 - middle_mcp_pos: tuple (x, y)
         """
-        current_angle, angle_delta, rotation_direction = self.detect_rotation(hand_landmarks)
+        if timestamp is None:
+            timestamp = self.clock()
+        previous_time = self.previous_time
+        current_angle, angle_delta, rotation_direction = self.detect_rotation(hand_landmarks, timestamp)
+        dt = timestamp - previous_time if previous_time is not None else 0.0
         
         # Update volume based on rotation
         if rotation_direction != 'none':
-            volume = self.update_volume_from_rotation(angle_delta)
+            volume = self.update_volume_from_rotation(angle_delta, dt)
         else:
-            volume = int(self.current_volume)
+            volume = self.smooth_volume(dt)
         
         # Get landmark positions for visual feedback
         wrist = hand_landmarks.landmark[0]
@@ -158,12 +200,20 @@ class GestureRecognizer:
         return {
             'palm_angle': current_angle,
             'rotation_direction': rotation_direction,
+            'rotation_speed': self.rotation_speed,
             'volume': volume,
             'wrist_pos': (wrist.x, wrist.y),
             'middle_mcp_pos': (middle_mcp.x, middle_mcp.y)
         }
     
+    def set_volume(self, level):
+        """Continue from a volume level (e.g. one set by another hand) without easing."""
+        self.current_volume = level
+        self.target_volume = level
+
     def reset(self):
         """Reset the gesture recognizer state."""
         self.previous_angle = None
+        self.previous_time = None
         self.base_angle = None
+        self.rotation_speed = 0.0
@@ -0,0 +1,152 @@
+"""
+Static hand-pose classifier backed by a library of labelled template poses.
+
+Landmarks are normalized for translation, scale and in-plane rotation into
+a fixed-length embedding, then matched against every stored template with
+a single matrix product over a precomputed index.
+"""
+import os
+import numpy as np
+
+
+WRIST = 0
+MIDDLE_MCP = 9
+
+# Depth estimates are noisier than x/y, so they count less in the distance
+DEPTH_WEIGHT = 0.5
+
+
+def normalize_hand(points, handedness=None, aspect_ratio=1.0):
+    """Normalize 21 hand landmarks into a pose embedding.
+
+    The wrist is moved to the origin, the hand is rotated so the wrist to
+    middle-finger-MCP direction points up, and everything is scaled so that
+    segment has unit length. Left hands are mirrored so one template serves
+    both hands.
+
+    Args:
+        points: (21, 3) array of normalized landmark coordinates
+        handedness: 'Left', 'Right' or None
+        aspect_ratio: Image width / height, so x and y use the same units
+
+    Returns:
+        np.ndarray: Flattened (63,) float32 embedding
+    """
+    pts = np.array(points, dtype=np.float32)
+    pts[:, 0] *= aspect_ratio
+    pts -= pts[WRIST]
+    if handedness == 'Left':
+        pts[:, 0] = -pts[:, 0]
+
+    axis = pts[MIDDLE_MCP, :2]
+    length = float(np.hypot(axis[0], axis[1]))
+    if length < 1e-6:
+        return np.zeros(pts.size, dtype=np.float32)
+
+    # Rotate so the palm axis maps onto (0, -1), i.e. straight up in image space
+    cos_a, sin_a = -axis[1] / length, -axis[0] / length
+    rotation = np.array([[cos_a, -sin_a], [sin_a, cos_a]], dtype=np.float32)
+    pts[:, :2] = pts[:, :2] @ rotation.T
+    pts /= length
+    pts[:, 2] *= DEPTH_WEIGHT
+    return pts.ravel()
+
+
+class HandPoseClassifier:
+    """Nearest-neighbour classifier over a library of labelled hand poses."""
+
+    def __init__(self, k=3, max_distance=0.6):
+        """
+        Args:
+            k: Number of nearest templates that vote on the label
+            max_distance: RMS per-landmark distance above which a pose is
+                          reported as 'unknown'
+        """
+        self.k = k
+        self.max_distance = max_distance
+        self.labels = np.array([], dtype=str)
+        self.embeddings = np.zeros((0, 63), dtype=np.float32)
+        self._build_index()
+
+    def _build_index(self):
+        """Precompute the label ids and squared norms used by every lookup."""
+        self.classes, self._label_ids = np.unique(self.labels, return_inverse=True)
+        self._norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add_samples(self, label, samples, handedness=None, aspect_ratio=1.0):
+        """Add recorded landmark samples as templates for a label.
+
+        Args:
+            label: Pose name, e.g. 'peace'
+            samples: Iterable of (21, 3) landmark arrays
+            handedness: Handedness of the samples ('Left', 'Right' or None)
+            aspect_ratio: Image width / height the samples were recorded at
+        """
+        new = [normalize_hand(s, handedness, aspect_ratio) for s in samples]
+        if not new:
+            return
+        self.embeddings = np.vstack([self.embeddings, np.stack(new)])
+        self.labels = np.concatenate([self.labels, np.full(len(new), label)])
+        self._build_index()
+
+    def remove_label(self, label):
+        """Remove every template recorded for a label."""
+        keep = self.labels != label
+        self.embeddings = self.embeddings[keep]
+        self.labels = self.labels[keep]
+        self._build_index()
+
+    def classify(self, points, handedness=None, aspect_ratio=1.0):
+        """Classify a hand pose.
+
+        Args:
+            points: (21, 3) array of normalized landmark coordinates
+            handedness: 'Left', 'Right' or None
+            aspect_ratio: Image width / height
+
+        Returns:
+            tuple: (label, distance) where distance is the RMS per-landmark
+                   distance to the closest template of that label
+        """
+        if len(self.labels) == 0:
+            return 'unknown', float('inf')
+
+        query = normalize_hand(points, handedness, aspect_ratio)
+        distances = self._norms - 2.0 * (self.embeddings @ query) + float(query @ query)
+        np.maximum(distances, 0.0, out=distances)
+
+        k = min(self.k, len(distances))
+        nearest = np.argpartition(distances, k - 1)[:k]
+        votes = np.bincount(self._label_ids[nearest], minlength=len(self.classes))
+        best = int(np.argmax(votes))
+        distance = float(np.sqrt(distances[nearest][self._label_ids[nearest] == best].min() / 21))
+
+        if distance > self.max_distance:
+            return 'unknown', distance
+        return str(self.classes[best]), distance
+
+    def save(self, path):
+        """Save the template library to an .npz file."""
+        np.savez_compressed(path, labels=self.labels, embeddings=self.embeddings)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load a template library saved with save().
+
+        Args:
+            path: Path to the .npz file
+            **kwargs: Passed to the constructor
+
+        Returns:
+            HandPoseClassifier
+        """
+        classifier = cls(**kwargs)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                classifier.labels = data['labels'].astype(str)
+                classifier.embeddings = data['embeddings'].astype(np.float32)
+            classifier._build_index()
+        return classifier
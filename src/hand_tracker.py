@@ -0,0 +1,179 @@
+"""
+Stable identities for detected hands across frames.
+
+MediaPipe returns hands in no fixed order, and the order can swap from
+one frame to the next. The tracker keeps one track per hand with a wrist
+position predicted at constant velocity and the hand's handedness. Every
+frame it builds a (tracks x detections) cost matrix in one vectorized
+step: the distance between predicted and detected wrists plus a penalty
+when the handedness differs. Pairs are then assigned greedily, cheapest
+first, up to a maximum distance. Unmatched detections start new tracks
+and tracks unseen for a while are dropped. With a handful of hands the
+greedy assignment matches the optimal one, and the per-frame cost only
+depends on the number of hands.
+
+Per-hand state (gesture recognizers, pens, ...) lives in each track's
+`state` dict, created by a factory when the track starts and dropped with
+the track, so state never jumps from one hand to another.
+"""
+import time
+import numpy as np
+
+WRIST = 0
+
+
+class TrackedHand:
+    """One hand followed across frames."""
+
+    def __init__(self, hand_id, position, handedness, timestamp, state):
+        self.hand_id = hand_id
+        self.position = position
+        self.velocity = np.zeros(2)
+        self.handedness = handedness
+        self.last_seen = timestamp
+        self.frames = 1
+        self.visible = True
+        self.state = state
+        # Latest MediaPipe landmarks and handedness of this hand
+        self.landmarks = None
+        self.handedness_info = None
+
+    def predict(self, timestamp, max_gap):
+        """Wrist position expected at a timestamp."""
+        return self.position + self.velocity * min(timestamp - self.last_seen, max_gap)
+
+
+class HandTracker:
+    """Assigns stable IDs to hands and keeps per-hand state."""
+
+    def __init__(self, max_num_hands=2, max_distance=0.2, handedness_penalty=0.1,
+                 max_missed_time=0.3, state_factory=None, velocity_smoothing=0.5):
+        """
+        Args:
+            max_num_hands: Maximum number of hands tracked at once
+            max_distance: Largest matching cost (in frame heights) for a
+                          detection to continue a track
+            handedness_penalty: Cost added when the handedness differs;
+                                kept finite because MediaPipe's label flickers
+            max_missed_time: Seconds a track survives without a detection
+            state_factory: Function (hand_id) -> dict of per-hand state
+            velocity_smoothing: Weight of the newest velocity estimate (0-1)
+        """
+        self.max_num_hands = max_num_hands
+        self.max_distance = max_distance
+        self.handedness_penalty = handedness_penalty
+        self.max_missed_time = max_missed_time
+        self.state_factory = state_factory or (lambda hand_id: {})
+        self.velocity_smoothing = velocity_smoothing
+
+        self.tracks = []
+        self.removed = []
+        self.next_id = 0
+
+        # Accounting
+        self.updates = 0
+        self.update_time = 0.0
+        self.max_hands_seen = 0
+
+    def reset(self):
+        """Forget every track (IDs keep counting up)."""
+        self.tracks = []
+        self.removed = []
+
+    def update(self, multi_hand_landmarks, multi_handedness, timestamp, aspect_ratio=1.0):
+        """Match this frame's detections to the tracks.
+
+        Args:
+            multi_hand_landmarks: Detected hand landmarks (may be None)
+            multi_handedness: Handedness of each detection (may be None)
+            timestamp: Frame time in seconds
+            aspect_ratio: Frame width / height, so distances are isotropic
+
+        Returns:
+            list: Visible TrackedHand objects ordered by hand ID, with
+                  landmarks and handedness_info set for this frame
+        """
+        start = time.perf_counter()
+        detections = list(multi_hand_landmarks or [])
+        infos = list(multi_handedness or [None] * len(detections))
+        self.max_hands_seen = max(self.max_hands_seen, len(detections))
+
+        positions = np.array([(hand.landmark[WRIST].x * aspect_ratio, hand.landmark[WRIST].y)
+                              for hand in detections]).reshape(-1, 2)
+        labels = [info.classification[0].label if info is not None else None for info in infos]
+
+        for track in self.tracks:
+            track.visible = False
+        matched = self._assign(positions, labels, timestamp)
+
+        for d, (hand, info) in enumerate(zip(detections, infos)):
+            track = matched.get(d)
+            if track is None:
+                if len(self.tracks) >= self.max_num_hands:
+                    continue
+                track = TrackedHand(self.next_id, positions[d], labels[d], timestamp,
+                                    self.state_factory(self.next_id))
+                self.next_id += 1
+                self.tracks.append(track)
+            else:
+                dt = timestamp - track.last_seen
+                if dt > 0:
+                    velocity = (positions[d] - track.position) / dt
+                    track.velocity += self.velocity_smoothing * (velocity - track.velocity)
+                track.position = positions[d]
+                track.handedness = labels[d]
+                track.last_seen = timestamp
+                track.frames += 1
+            track.visible = True
+            track.landmarks = hand
+            track.handedness_info = info
+
+        # Drop tracks that have not been seen for too long
+        self.removed = [track for track in self.tracks
+                        if timestamp - track.last_seen > self.max_missed_time]
+        if self.removed:
+            self.tracks = [track for track in self.tracks if track not in self.removed]
+
+        self.updates += 1
+        self.update_time += time.perf_counter() - start
+        return sorted((track for track in self.tracks if track.visible),
+                      key=lambda track: track.hand_id)
+
+    def _assign(self, positions, labels, timestamp):
+        """Greedy assignment on the cost matrix; returns detection index -> track."""
+        if not self.tracks or not len(positions):
+            return {}
+        predicted = np.array([track.predict(timestamp, self.max_missed_time)
+                              for track in self.tracks])
+        cost = np.linalg.norm(predicted[:, None, :] - positions[None, :, :], axis=2)
+        track_labels = np.array([track.handedness for track in self.tracks], dtype=object)
+        cost += self.handedness_penalty * (track_labels[:, None] != np.array(labels, dtype=object)[None, :])
+
+        matched = {}
+        used_tracks = set()
+        for flat in np.argsort(cost, axis=None):
+            t, d = divmod(int(flat), cost.shape[1])
+            if cost[t, d] > self.max_distance:
+                break
+            if t in used_tracks or d in matched:
+                continue
+            used_tracks.add(t)
+            matched[d] = self.tracks[t]
+        return matched
+
+    def get(self, hand_id):
+        """Return the track with an ID, or None."""
+        for track in self.tracks:
+            if track.hand_id == hand_id:
+                return track
+        return None
+
+    def get_stats(self):
+        """Return how many IDs were handed out and the mean update cost."""
+        return {
+            'tracks': len(self.tracks),
+            'ids_assigned': self.next_id,
+            'max_hands_seen': self.max_hands_seen,
+            'updates': self.updates,
+            'mean_update_us': self.update_time / self.updates * 1e6 if self.updates else 0.0
+        }
@@ -0,0 +1,215 @@
+"""
+Pluggable inference backends.
+
+A backend turns RGB frames into landmark results for the 'hands', 'face',
+'pose' and 'multipose' graphs and person masks for the 'segment' graph.
+Every backend returns results in the shape of the legacy `mp.solutions`
+results (multi_hand_landmarks, multi_handedness, multi_face_landmarks,
+pose_landmarks, segmentation_mask), plus multi_pose_landmarks with
+person_ids and person_boxes for 'multipose', so everything downstream of
+inference works unchanged whichever backend produced them.
+"""
+from types import SimpleNamespace
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+
+
+GRAPHS = ('hands', 'face', 'pose', 'segment', 'multipose')
+
+
+def array_to_landmark_list(points):
+    """Convert an (N, 3) or (N, 4) array (x, y, z[, visibility]) to a NormalizedLandmarkList."""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for point in points:
+        lm = landmark_list.landmark.add()
+        lm.x, lm.y, lm.z = float(point[0]), float(point[1]), float(point[2])
+        if len(point) > 3:
+            lm.visibility = float(point[3])
+    return landmark_list
+
+
+def make_classification_list(label, score=1.0, index=None):
+    """Build a ClassificationList with a single entry (e.g. hand handedness)."""
+    classification_list = classification_pb2.ClassificationList()
+    entry = classification_list.classification.add()
+    entry.label = label
+    entry.score = score
+    entry.index = index if index is not None else (0 if label == 'Left' else 1)
+    return classification_list
+
+
+def make_hands_result(hands, handedness=None):
+    """Build a hands result from landmark arrays.
+
+    Args:
+        hands: List of (21, 3) landmark arrays
+        handedness: List of 'Left'/'Right' labels (defaults to 'Right')
+    """
+    if not len(hands):
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    handedness = handedness or ['Right'] * len(hands)
+    return SimpleNamespace(
+        multi_hand_landmarks=[array_to_landmark_list(hand) for hand in hands],
+        multi_handedness=[make_classification_list(label) for label in handedness])
+
+
+def make_face_result(faces):
+    """Build a face mesh result from a list of (478, 3) landmark arrays."""
+    if not len(faces):
+        return SimpleNamespace(multi_face_landmarks=None)
+    return SimpleNamespace(multi_face_landmarks=[array_to_landmark_list(face) for face in faces])
+
+
+def make_pose_result(pose):
+    """Build a pose result from a (33, 4) landmark array, or None for no person."""
+    if pose is None:
+        return SimpleNamespace(pose_landmarks=None)
+    return SimpleNamespace(pose_landmarks=array_to_landmark_list(pose))
+
+
+def make_multi_pose_result(poses, person_ids, boxes=None):
+    """Build a multi-person pose result.
+
+    Args:
+        poses: List of (33, 4) landmark arrays in frame coordinates
+        person_ids: Stable ID of each person
+        boxes: Normalized (x0, y0, x1, y1) box of each person
+    """
+    if not len(poses):
+        return SimpleNamespace(multi_pose_landmarks=None, person_ids=[], person_boxes=[])
+    return SimpleNamespace(
+        multi_pose_landmarks=[array_to_landmark_list(pose) for pose in poses],
+        person_ids=list(person_ids), person_boxes=list(boxes or []))
+
+
+def make_segmentation_result(mask):
+    """Build a selfie segmentation result from a float32 (H, W) person mask, or None."""
+    return SimpleNamespace(segmentation_mask=mask)
+
+
+class InferenceBackend:
+    """Interface implemented by all inference backends."""
+
+    name = 'base'
+
+    def build(self, name):
+        """Create whatever is needed to run a graph ('hands', 'face', 'pose', 'segment' or 'multipose')."""
+        raise NotImplementedError
+
+    def process(self, name, image_rgb, timestamp):
+        """Run a graph on an RGB frame.
+
+        Args:
+            name: 'hands', 'face', 'pose', 'segment' or 'multipose'
+            image_rgb: RGB frame
+            timestamp: Capture time in seconds
+
+        Returns:
+            Result object in the legacy mp.solutions shape (may be None)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+class LegacyBackend(InferenceBackend):
+    """Synchronous inference with the legacy mp.solutions graphs."""
+
+    name = 'legacy'
+
+    def __init__(self, max_num_hands=2, max_num_faces=1, static_image_mode=False,
+                 max_num_people=4, pose_workers=2, model_dir=None):
+        """
+        Args:
+            max_num_hands: Maximum number of hands to detect
+            max_num_faces: Maximum number of faces to detect
+            static_image_mode: Treat every frame as an unrelated image (run
+                               detection on each one instead of tracking)
+            max_num_people: Maximum number of people in 'multipose'
+            pose_workers: Threads running the per-person Pose graphs
+            model_dir: Model cache directory of the 'multipose' person detector
+        """
+        self.max_num_hands = max_num_hands
+        self.max_num_faces = max_num_faces
+        self.max_num_people = max_num_people
+        self.pose_workers = pose_workers
+        self.static_image_mode = static_image_mode
+        self.model_dir = model_dir
+        self.graphs = {}
+
+    def build(self, name):
+        if name == 'hands':
+            # Initialize MediaPipe Hands
+            graph = mp.solutions.hands.Hands(
+                static_image_mode=self.static_image_mode,
+                max_num_hands=self.max_num_hands,
+                model_complexity=0,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        elif name == 'face':
+            # Initialize MediaPipe Face Mesh
+            graph = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=self.static_image_mode,
+                max_num_faces=self.max_num_faces,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        elif name == 'pose':
+            # Initialize MediaPipe Pose
+            graph = mp.solutions.pose.Pose(
+                static_image_mode=self.static_image_mode,
+                model_complexity=1,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        elif name == 'segment':
+            # Initialize MediaPipe Selfie Segmentation (landscape model, 256x144)
+            graph = mp.solutions.selfie_segmentation.SelfieSegmentation(model_selection=1)
+        elif name == 'multipose':
+            # One Pose graph per person, run on person crops
+            from .multi_pose import MultiPoseEstimator, create_person_detector
+            graph = MultiPoseEstimator(
+                lambda: mp.solutions.pose.Pose(model_complexity=1, min_detection_confidence=0.5,
+                                               min_tracking_confidence=0.5),
+                create_person_detector(self.model_dir), max_people=self.max_num_people,
+                workers=self.pose_workers)
+        else:
+            raise ValueError(f"Unknown graph: {name}")
+        self.graphs[name] = graph
+        return graph
+
+    def process(self, name, image_rgb, timestamp):
+        return self.graphs[name].process(image_rgb)
+
+    def close(self):
+        for graph in self.graphs.values():
+            graph.close()
+        self.graphs.clear()
+
+
+def create_backend(name, model_dir=None, **kwargs):
+    """Create a backend by name.
+
+    Args:
+        name: 'legacy', 'tasks' or 'fake'
+        model_dir: Model cache directory (tasks backend models and the legacy
+                   backend's person detector)
+        **kwargs: Passed to the backend constructor
+
+    Returns:
+        InferenceBackend
+    """
+    if name == 'legacy':
+        return LegacyBackend(model_dir=model_dir, **kwargs)
+    elif name == 'tasks':
+        from .tasks_backend import TasksBackend
+        if model_dir:
+            kwargs['model_dir'] = model_dir
+        return TasksBackend(**kwargs)
+    elif name == 'fake':
+        from .fake_backend import FakeBackend
+        return FakeBackend(**kwargs)
+    raise ValueError(f"Unknown inference backend: {name}")
@@ -0,0 +1,116 @@
+"""
+End-to-end latency tracking from frame capture to display.
+"""
+import time
+from collections import deque
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of a sequence using nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class FrameTiming:
+    """Stage timestamps for a single frame, starting at its capture time."""
+
+    def __init__(self, capture_time):
+        self.capture_time = capture_time
+        self.marks = []
+
+    def mark(self, stage):
+        """Record that a stage has just finished."""
+        self.marks.append((stage, time.perf_counter()))
+
+    def stage_durations(self):
+        """Return a list of (stage, seconds) measured from the previous mark."""
+        durations = []
+        previous = self.capture_time
+        for stage, timestamp in self.marks:
+            durations.append((stage, timestamp - previous))
+            previous = timestamp
+        return durations
+
+
+class LatencyTracker:
+    """Tracks capture-to-display latency and drops frames that are too old.
+
+    Each frame is tagged with its capture timestamp, marked as it passes
+    through each stage and closed once it has been displayed.
+    """
+
+    def __init__(self, max_frame_age_ms=100, window=300):
+        """
+        Args:
+            max_frame_age_ms: Frames older than this when read are dropped
+                              before inference (None disables dropping)
+            window: Number of recent frames used for the statistics
+        """
+        self.max_frame_age = max_frame_age_ms / 1000.0 if max_frame_age_ms else None
+        self.latencies = deque(maxlen=window)
+        self.stage_times = {}
+        self.window = window
+        self.frames = 0
+        self.dropped = 0
+
+    def begin(self, capture_time, now=None):
+        """Start timing a frame.
+
+        Args:
+            capture_time: time.perf_counter() value taken at capture
+            now: Current time (defaults to time.perf_counter())
+
+        Returns:
+            FrameTiming, or None if the frame is stale and should be dropped
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self.max_frame_age is not None and now - capture_time > self.max_frame_age:
+            self.dropped += 1
+            return None
+
+        timing = FrameTiming(capture_time)
+        timing.marks.append(('read', now))
+        return timing
+
+    def end(self, timing):
+        """Close a frame once it has been displayed.
+
+        Args:
+            timing: FrameTiming returned by begin()
+        """
+        timing.mark('display')
+        self.frames += 1
+        self.latencies.append(timing.marks[-1][1] - timing.capture_time)
+
+        for stage, duration in timing.stage_durations():
+            if stage not in self.stage_times:
+                self.stage_times[stage] = deque(maxlen=self.window)
+            self.stage_times[stage].append(duration)
+
+    def latency_ms(self, pct):
+        """Return the pct-th percentile capture-to-display latency in ms."""
+        return percentile(self.latencies, pct) * 1000
+
+    def summary(self):
+        """Summarize latency over the recent window.
+
+        Returns:
+            dict: frames, dropped, p50_ms, p95_ms, max_ms and stages
+                  (mean milliseconds spent in each stage)
+        """
+        stages = {
+            stage: sum(times) / len(times) * 1000
+            for stage, times in self.stage_times.items() if times
+        }
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'p50_ms': self.latency_ms(50),
+            'p95_ms': self.latency_ms(95),
+            'max_ms': max(self.latencies) * 1000 if self.latencies else 0.0,
+            'stages': stages
+        }
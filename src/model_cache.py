@@ -0,0 +1,166 @@
+"""
+Local cache of MediaPipe Tasks model files with checksum verification.
+
+Models are only ever downloaded by download_models.py, from versioned
+URLs. Each model's SHA-256 is pinned in MODELS; a file that does not match
+its pin is never loaded, whether it was downloaded or already on disk.
+
+A model without a pin can only be used after an explicit
+`download_models.py --trust-unpinned`, which records the digest of the file
+it got in models.sha256. That is trust on first use: later changes to the
+file are caught, a bad first download is not. No model is pinned yet, so
+this is currently the only mode; pin the printed digests in MODELS to get
+real verification.
+"""
+import hashlib
+import os
+
+# Directory the models are cached in; override with VISION_PRO_MODEL_DIR
+DEFAULT_MODEL_DIR = os.environ.get('VISION_PRO_MODEL_DIR', '.')
+
+# Checksums recorded at download time, in `sha256sum` format
+CHECKSUM_FILE = 'models.sha256'
+
+# Registry of known models. 'url' must point at a versioned file (never
+# 'latest') so the pinned 'sha256' stays valid. A model whose pin is None
+# needs `download_models.py --trust-unpinned` before it can be loaded.
+MODELS = {
+    'hand_landmarker': {
+        'filename': 'hand_landmarker.task',
+        'url': 'https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task',
+        'sha256': None
+    },
+    'face_landmarker': {
+        'filename': 'face_landmarker.task',
+        'url': 'https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task',
+        'sha256': None
+    },
+    'pose_landmarker': {
+        'filename': 'pose_landmarker_full.task',
+        'url': 'https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_full/float16/1/pose_landmarker_full.task',
+        'sha256': None
+    },
+    'object_detector': {
+        'filename': 'efficientdet_lite0.tflite',
+        'url': 'https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/float16/1/efficientdet_lite0.tflite',
+        'sha256': None
+    },
+    'selfie_segmenter': {
+        'filename': 'selfie_segmenter_landscape.tflite',
+        'url': 'https://storage.googleapis.com/mediapipe-models/image_segmenter/selfie_segmenter_landscape/float16/1/selfie_segmenter_landscape.tflite',
+        'sha256': None
+    }
+}
+
+
+class ModelCacheError(Exception):
+    """Raised when a model is missing from the cache or fails verification."""
+
+
+def sha256_of_bytes(data):
+    """Return the hex SHA-256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_of_file(path):
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_checksums(model_dir=DEFAULT_MODEL_DIR):
+    """Read the recorded checksums.
+
+    Returns:
+        dict: Mapping of filename to hex SHA-256 digest
+    """
+    path = os.path.join(model_dir, CHECKSUM_FILE)
+    checksums = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    checksums[parts[1].lstrip('*')] = parts[0].lower()
+    return checksums
+
+
+def record_checksum(filename, digest, model_dir=DEFAULT_MODEL_DIR):
+    """Record (or replace) the checksum of a cached model file."""
+    checksums = read_checksums(model_dir)
+    checksums[filename] = digest
+    path = os.path.join(model_dir, CHECKSUM_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        for name in sorted(checksums):
+            f.write(f"{checksums[name]}  {name}\n")
+    os.replace(tmp_path, path)
+
+
+def expected_checksum(name, model_dir=DEFAULT_MODEL_DIR):
+    """Return the checksum a model must match, or None if none is known.
+
+    The pin in MODELS always wins; a recorded checksum only stands in for
+    a missing pin, after the user chose to trust the file.
+    """
+    info = MODELS[name]
+    return info['sha256'] or read_checksums(model_dir).get(info['filename'])
+
+
+def verify_file(name, path, model_dir=DEFAULT_MODEL_DIR):
+    """Check a model file against its pin (or trusted recorded checksum).
+
+    Returns:
+        str: Hex SHA-256 of the file
+
+    Raises:
+        ModelCacheError: If the file does not match
+    """
+    digest = sha256_of_file(path)
+    expected = expected_checksum(name, model_dir)
+    if expected is not None and digest != expected:
+        kind = "pinned" if MODELS[name]['sha256'] else "recorded"
+        raise ModelCacheError(f"{os.path.basename(path)} does not match its {kind} checksum "
+                              f"(expected {expected}, got {digest})")
+    return digest
+
+
+def load_model(name, model_dir=DEFAULT_MODEL_DIR):
+    """Read a cached model and verify its checksum.
+
+    The verified bytes are returned (rather than a path) so the file cannot
+    change between verification and loading.
+
+    Args:
+        name: Key in MODELS, e.g. 'hand_landmarker'
+        model_dir: Cache directory
+
+    Returns:
+        bytes: Model file contents
+
+    Raises:
+        ModelCacheError: If the model is missing, has no known checksum or
+                         does not match it
+    """
+    if name not in MODELS:
+        raise ModelCacheError(f"Unknown model: {name}")
+
+    filename = MODELS[name]['filename']
+    path = os.path.join(model_dir, filename)
+    if not os.path.exists(path):
+        raise ModelCacheError(f"{path} not found. Run download_models.py first.")
+
+    expected = expected_checksum(name, model_dir)
+    if expected is None:
+        raise ModelCacheError(f"No pinned checksum for {filename}. Pin it in MODELS, or run "
+                              f"download_models.py --trust-unpinned to trust the cached file.")
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    actual = sha256_of_bytes(data)
+    if actual != expected:
+        raise ModelCacheError(f"Checksum mismatch for {filename}: expected {expected}, got {actual}")
+    return data
@@ -0,0 +1,172 @@
+"""
+Motion gate for skipping inference on static scenes.
+
+Each frame is shrunk to a small grayscale thumbnail and compared with the
+thumbnail of the last frame that went through inference. If only a tiny
+fraction of pixels changed (by default only looking at the area around the
+last detected landmarks, or over the whole frame with use_roi=False) the
+previous results can be reused. A maximum
+skip count forces a fresh inference now and then so slow drift or objects
+appearing outside the landmark area are never missed for long.
+"""
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decides per frame whether inference has to run."""
+
+    def __init__(self, width=64, pixel_threshold=15, motion_threshold=0.01, max_skip=30,
+                 roi_padding=0.1, use_roi=True):
+        """
+        Args:
+            width: Width of the grayscale thumbnail the frames are compared at
+            pixel_threshold: Per-pixel gray level change counted as motion
+            motion_threshold: Fraction of changed pixels that triggers inference
+            max_skip: Run inference after this many consecutive skipped frames
+            roi_padding: Padding around the landmark bounding box, as a
+                         fraction of the frame size
+            use_roi: Only compare the area around the last landmarks;
+                     False always compares the whole frame
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.roi_padding = roi_padding
+        self.use_roi = use_roi
+
+        self._small = None
+        self._current = None
+        self._reference = None
+        self._diff = None
+        self._roi = None
+        self.consecutive_skips = 0
+        self.last_motion = 0.0
+
+        # Accounting
+        self.frames = 0
+        self.skipped = 0
+        self.forced = 0
+        self.gate_seconds = 0.0
+        self.inference_seconds = 0.0
+        self.inferred = 0
+
+    def reset(self):
+        """Forget the reference frame so the next frame runs inference."""
+        self._reference = None
+        self._roi = None
+        self.consecutive_skips = 0
+
+    def _thumbnail(self, image):
+        h, w = image.shape[:2]
+        size = (self.width, max(1, round(self.width * h / w)))
+        if self._current is None or self._current.shape != size[::-1]:
+            self._small = np.empty(size[::-1] + (3,), dtype=np.uint8)
+            self._current = np.empty(size[::-1], dtype=np.uint8)
+            self._diff = np.empty(size[::-1], dtype=np.uint8)
+            self._reference = None
+        # INTER_LINEAR only reads a few pixels per output pixel; INTER_AREA
+        # averages better but costs more than the rest of the gate together
+        cv2.resize(image, size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._current)
+        return self._current
+
+    def _region(self):
+        """Pixel bounds of the landmark ROI on the thumbnail (whole frame without one)."""
+        h, w = self._current.shape
+        if self._roi is None:
+            return 0, 0, w, h
+        x0, y0, x1, y1 = self._roi
+        x0, x1 = int(x0 * w), int(np.ceil(x1 * w))
+        y0, y1 = int(y0 * h), int(np.ceil(y1 * h))
+        # Keep at least a few pixels so a tiny ROI is not pure noise
+        if x1 - x0 < 4 or y1 - y0 < 4:
+            return 0, 0, w, h
+        return x0, y0, x1, y1
+
+    def check(self, image):
+        """Decide whether a BGR frame needs inference.
+
+        When inference is needed the frame becomes the new reference.
+
+        Args:
+            image: BGR frame
+
+        Returns:
+            bool: True to run inference, False to reuse the previous results
+        """
+        start = time.perf_counter()
+        self.frames += 1
+        current = self._thumbnail(image)
+
+        if self._reference is None:
+            run = True
+        else:
+            cv2.absdiff(current, self._reference, dst=self._diff)
+            x0, y0, x1, y1 = self._region()
+            region = self._diff[y0:y1, x0:x1]
+            changed = np.count_nonzero(region > self.pixel_threshold)
+            self.last_motion = changed / region.size
+            run = self.last_motion >= self.motion_threshold
+            if not run and self.consecutive_skips >= self.max_skip:
+                run = True
+                self.forced += 1
+
+        if run:
+            if self._reference is None:
+                self._reference = current.copy()
+            else:
+                np.copyto(self._reference, current)
+            self.consecutive_skips = 0
+        else:
+            self.consecutive_skips += 1
+            self.skipped += 1
+        self.gate_seconds += time.perf_counter() - start
+        return run
+
+    def update(self, points=None, inference_seconds=None):
+        """Record the outcome of an inference that check() asked for.
+
+        Args:
+            points: (N, 2+) normalized landmarks of everything detected, used
+                    as the ROI for the next checks when use_roi is set
+                    (None = whole frame)
+            inference_seconds: Time the conversion and inference took, for
+                               the savings estimate
+        """
+        if self.use_roi and points is not None and len(points):
+            x0, y0 = points[:, 0].min(), points[:, 1].min()
+            x1, y1 = points[:, 0].max(), points[:, 1].max()
+            pad = self.roi_padding
+            self._roi = (max(0.0, x0 - pad), max(0.0, y0 - pad),
+                         min(1.0, x1 + pad), min(1.0, y1 + pad))
+        else:
+            self._roi = None
+        if inference_seconds is not None:
+            self.inferred += 1
+            self.inference_seconds += inference_seconds
+
+    def get_stats(self):
+        """Return gating statistics.
+
+        Returns:
+            dict: frames, skipped, skip_ratio, forced (inferences forced by
+                  max_skip), gate_ms and inference_ms (means), saved_ms
+                  (estimated inference time avoided minus the gate's own
+                  cost) and saved_pct of the ungated inference time
+        """
+        inference_ms = self.inference_seconds / self.inferred * 1000 if self.inferred else 0.0
+        saved_ms = self.skipped * inference_ms - self.gate_seconds * 1000
+        ungated_ms = self.frames * inference_ms
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / self.frames if self.frames else 0.0,
+            'forced': self.forced,
+            'gate_ms': self.gate_seconds / self.frames * 1000 if self.frames else 0.0,
+            'inference_ms': inference_ms,
+            'saved_ms': saved_ms,
+            'saved_pct': saved_ms / ungated_ms * 100 if ungated_ms else 0.0
+        }
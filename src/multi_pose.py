@@ -0,0 +1,370 @@
+"""
+Multi-person pose estimation from per-person crops.
+
+mp.solutions.pose follows a single person. For a group, people are found
+with a lightweight person detector, each person gets a padded square crop
+of the frame, and the crops are run through a pool of Pose graphs on
+worker threads. A Pose graph in tracking mode uses its previous landmarks
+to find the body in the next crop, so each person ID keeps the same graph
+for as long as it is tracked; the graphs of people who left go back to the
+pool (reset) for newcomers.
+
+The detector only runs every `detect_every` frames, in the background on
+a copy of the frame, and its boxes are applied when they are ready. In
+between, each person's crop follows the bounding box of their latest
+landmarks, which is both cheaper and steadier than detection. Landmarks
+are mapped from crop to frame coordinates before they are returned.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import BaseOptions, vision
+from .inference import make_multi_pose_result
+from .model_cache import DEFAULT_MODEL_DIR, ModelCacheError, load_model
+
+
+def box_iou(a, b):
+    """Intersection over union of every box in a against every box in b.
+
+    Args:
+        a: (M, 4) boxes x0, y0, x1, y1
+        b: (N, 4) boxes x0, y0, x1, y1
+
+    Returns:
+        np.ndarray: (M, N) IoU matrix
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def landmark_box(points, min_visibility=0.5):
+    """Normalized bounding box (x0, y0, x1, y1) of the visible landmarks, or None."""
+    visible = points[points[:, 3] >= min_visibility] if points.shape[1] > 3 else points
+    if len(visible) < 4:
+        return None
+    x0, y0 = visible[:, :2].min(axis=0)
+    x1, y1 = visible[:, :2].max(axis=0)
+    return np.array([x0, y0, x1, y1])
+
+
+class HogPersonDetector:
+    """OpenCV's HOG people detector on a downscaled frame (needs no model file)."""
+
+    def __init__(self, width=320, min_score=0.3):
+        """
+        Args:
+            width: Width of the gray copy detection runs on
+            min_score: Smallest SVM score kept
+        """
+        self.width = width
+        self.min_score = min_score
+        self.hog = cv2.HOGDescriptor()
+        self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+        self._gray = None
+
+    def detect(self, image_rgb):
+        """Find people in an RGB frame.
+
+        Returns:
+            np.ndarray: (N, 5) boxes x0, y0, x1, y1 (normalized) and score
+        """
+        h, w = image_rgb.shape[:2]
+        width = min(w, self.width)
+        size = (width, max(1, round(width * h / w)))
+        if self._gray is None or self._gray.shape != size[::-1]:
+            self._gray = np.empty(size[::-1], dtype=np.uint8)
+        small = cv2.resize(image_rgb, size, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(small, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        rects, weights = self.hog.detectMultiScale(self._gray, winStride=(8, 8), padding=(8, 8),
+                                                   scale=1.05)
+        boxes = []
+        for (x, y, bw, bh), score in zip(rects, np.ravel(weights)):
+            if score >= self.min_score:
+                boxes.append((x / size[0], y / size[1], (x + bw) / size[0], (y + bh) / size[1],
+                              float(score)))
+        return np.array(boxes, dtype=np.float64).reshape(-1, 5)
+
+
+class TasksPersonDetector:
+    """MediaPipe Tasks object detector (EfficientDet-Lite0) restricted to people."""
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, min_score=0.4, max_results=8):
+        """
+        Args:
+            model_dir: Model cache directory (see download_models.py)
+            min_score: Smallest detection score kept
+            max_results: Maximum number of people returned
+
+        Raises:
+            ModelCacheError: If the detector model is missing or fails verification
+        """
+        options = vision.ObjectDetectorOptions(
+            base_options=BaseOptions(model_asset_buffer=load_model('object_detector', model_dir)),
+            running_mode=vision.RunningMode.IMAGE, max_results=max_results,
+            score_threshold=min_score, category_allowlist=['person'])
+        self.detector = vision.ObjectDetector.create_from_options(options)
+
+    def detect(self, image_rgb):
+        """Find people in an RGB frame.
+
+        Returns:
+            np.ndarray: (N, 5) boxes x0, y0, x1, y1 (normalized) and score
+        """
+        h, w = image_rgb.shape[:2]
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+        boxes = []
+        for detection in self.detector.detect(image).detections:
+            box = detection.bounding_box
+            boxes.append((box.origin_x / w, box.origin_y / h, (box.origin_x + box.width) / w,
+                          (box.origin_y + box.height) / h, detection.categories[0].score))
+        return np.array(boxes, dtype=np.float64).reshape(-1, 5)
+
+
+def create_person_detector(model_dir=None):
+    """The Tasks detector when its model is in the cache, otherwise HOG."""
+    try:
+        return TasksPersonDetector(model_dir or DEFAULT_MODEL_DIR)
+    except ModelCacheError as e:
+        print(f"Person detector: {e} Falling back to the HOG people detector.")
+        return HogPersonDetector()
+
+
+class PersonTracker:
+    """Keeps stable person IDs by greedy IoU matching of boxes."""
+
+    def __init__(self, max_people=4, min_iou=0.2, max_missed=3):
+        """
+        Args:
+            max_people: Maximum number of people tracked at once
+            min_iou: Smallest overlap for a box to continue a track
+            max_missed: Updates a track survives without a matching box
+        """
+        self.max_people = max_people
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.boxes = {}
+        self.missed = {}
+        self.next_id = 0
+
+    def update(self, boxes):
+        """Match this frame's boxes to the tracks.
+
+        Args:
+            boxes: (N, 4+) normalized boxes
+
+        Returns:
+            tuple: (IDs, one per box, None for boxes over max_people;
+                    IDs of the tracks dropped this frame)
+        """
+        boxes = np.asarray(boxes, dtype=np.float64)
+        if boxes.ndim != 2:
+            boxes = boxes.reshape(0, 4)
+        ids = [None] * len(boxes)
+        track_ids = list(self.boxes)
+        if track_ids and len(boxes):
+            iou = box_iou(np.array([self.boxes[i] for i in track_ids]), boxes[:, :4])
+            used = set()
+            for flat in np.argsort(-iou, axis=None):
+                t, d = divmod(int(flat), iou.shape[1])
+                if iou[t, d] < self.min_iou:
+                    break
+                if t in used or ids[d] is not None:
+                    continue
+                used.add(t)
+                ids[d] = track_ids[t]
+
+        matched = set(i for i in ids if i is not None)
+        for d, box in enumerate(boxes):
+            if ids[d] is None and len(self.boxes) < self.max_people:
+                ids[d] = self.next_id
+                self.next_id += 1
+            if ids[d] is not None:
+                self.boxes[ids[d]] = box[:4]
+                self.missed[ids[d]] = 0
+
+        dropped = []
+        for track_id in track_ids:
+            if track_id not in matched:
+                self.missed[track_id] += 1
+                if self.missed[track_id] > self.max_missed:
+                    dropped.append(track_id)
+                    del self.boxes[track_id]
+                    del self.missed[track_id]
+        return ids, dropped
+
+    def follow(self, track_id, box):
+        """Move a track to a box found without detection (e.g. from landmarks)."""
+        if track_id in self.boxes:
+            self.boxes[track_id] = box[:4]
+            self.missed[track_id] = 0
+
+    def reset(self):
+        """Forget every track."""
+        self.boxes.clear()
+        self.missed.clear()
+
+
+class MultiPoseEstimator:
+    """Runs one Pose graph per tracked person on person crops."""
+
+    def __init__(self, pose_factory, detector, max_people=4, workers=2, detect_every=5,
+                 padding=0.25, min_visibility=0.5):
+        """
+        Args:
+            pose_factory: Function returning a new single-person Pose graph
+            detector: Person detector with detect(image_rgb) -> (N, 5) boxes
+            max_people: Maximum number of people estimated per frame
+            workers: Threads running Pose graphs in parallel
+            detect_every: Run the person detector every this many frames
+                          (crops follow the landmarks in between)
+            padding: Margin added around a person box on each side, as a
+                     fraction of its larger side
+            min_visibility: Landmarks below this visibility do not count
+                            towards the box a crop follows
+        """
+        self.pose_factory = pose_factory
+        self.detector = detector
+        self.max_people = max_people
+        self.detect_every = max(1, detect_every)
+        self.padding = padding
+        self.min_visibility = min_visibility
+        self.tracker = PersonTracker(max_people)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="pose-worker")
+        self.detect_executor = ThreadPoolExecutor(1, thread_name_prefix="person-detector")
+        self._pending = None
+
+        # Pose graph of each tracked person, and graphs ready for newcomers
+        self.graphs = {}
+        self.free_graphs = [pose_factory() for _ in range(min(workers, max_people))]
+        self.boxes = {}
+        self.frames = 0
+
+        # Accounting: people in view -> [frames, seconds]
+        self.detections = 0
+        self.by_people = {}
+
+    def _crop_box(self, box, w, h):
+        """Padded square pixel box around a normalized box, clipped to the frame."""
+        cx, cy = (box[0] + box[2]) / 2 * w, (box[1] + box[3]) / 2 * h
+        side = max((box[2] - box[0]) * w, (box[3] - box[1]) * h) * (1 + 2 * self.padding)
+        x0, y0 = max(0, int(cx - side / 2)), max(0, int(cy - side / 2))
+        x1, y1 = min(w, int(cx + side / 2)), min(h, int(cy + side / 2))
+        return x0, y0, x1, y1
+
+    def _estimate(self, graph, image_rgb, crop_box):
+        """Run one Pose graph on a crop and map its landmarks to frame coordinates."""
+        x0, y0, x1, y1 = crop_box
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        h, w = image_rgb.shape[:2]
+        crop = np.ascontiguousarray(image_rgb[y0:y1, x0:x1])
+        result = graph.process(crop)
+        if result.pose_landmarks is None:
+            return None
+        points = np.array([(lm.x, lm.y, lm.z, lm.visibility)
+                           for lm in result.pose_landmarks.landmark], dtype=np.float32)
+        cw, ch = x1 - x0, y1 - y0
+        points[:, 0] = (x0 + points[:, 0] * cw) / w
+        points[:, 1] = (y0 + points[:, 1] * ch) / h
+        points[:, 2] *= cw / w
+        return points
+
+    def _graph_for(self, person_id):
+        graph = self.graphs.get(person_id)
+        if graph is None:
+            if self.free_graphs:
+                graph = self.free_graphs.pop()
+                # Drop the tracking state of whoever used it before
+                graph.reset()
+            else:
+                graph = self.pose_factory()
+            self.graphs[person_id] = graph
+        return graph
+
+    def _release(self, person_id):
+        graph = self.graphs.pop(person_id, None)
+        if graph is not None:
+            self.free_graphs.append(graph)
+        self.boxes.pop(person_id, None)
+
+    def _apply_detections(self, detected):
+        self.detections += 1
+        ids, dropped = self.tracker.update(detected)
+        for person_id in dropped:
+            self._release(person_id)
+        for person_id, box in zip(ids, detected):
+            if person_id is not None:
+                self.boxes[person_id] = box[:4]
+
+    def process(self, image_rgb):
+        """Estimate the pose of every person in an RGB frame.
+
+        Returns:
+            Result with multi_pose_landmarks, person_ids and person_boxes
+        """
+        start = time.perf_counter()
+        h, w = image_rgb.shape[:2]
+
+        if self._pending is not None and self._pending.done():
+            self._apply_detections(self._pending.result())
+            self._pending = None
+        if self._pending is None and self.frames % self.detect_every == 0:
+            # The caller may reuse the frame buffer, so detect on a copy
+            self._pending = self.detect_executor.submit(self.detector.detect, image_rgb.copy())
+        self.frames += 1
+
+        # One crop per person, estimated in parallel by the person's own graph
+        people = sorted(self.boxes.items())
+        futures = [(person_id, self.executor.submit(
+                    self._estimate, self._graph_for(person_id), image_rgb,
+                    self._crop_box(box, w, h)))
+                   for person_id, box in people]
+
+        poses, ids, boxes = [], [], []
+        for person_id, future in futures:
+            points = future.result()
+            box = landmark_box(points, self.min_visibility) if points is not None else None
+            if box is None:
+                # Lost: detection will pick the person up again
+                self.boxes.pop(person_id, None)
+                continue
+            # The next crop follows the landmarks
+            self.boxes[person_id] = box
+            self.tracker.follow(person_id, box)
+            poses.append(points)
+            ids.append(person_id)
+            boxes.append(tuple(box))
+
+        entry = self.by_people.setdefault(len(poses), [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+        return make_multi_pose_result(poses, ids, boxes)
+
+    def get_stats(self):
+        """Return the mean processing time per number of people in view."""
+        return {
+            'detections': self.detections,
+            'graphs': len(self.graphs) + len(self.free_graphs),
+            'by_people': {people: {'frames': frames, 'mean_ms': seconds / frames * 1000}
+                          for people, (frames, seconds) in sorted(self.by_people.items())}
+        }
+
+    def close(self):
+        """Stop the workers and release every Pose graph."""
+        self.executor.shutdown(wait=True)
+        self.detect_executor.shutdown(wait=True)
+        for graph in list(self.graphs.values()) + self.free_graphs:
+            graph.close()
+        self.graphs.clear()
+        self.free_graphs.clear()
@@ -0,0 +1,140 @@
+"""
+Joint angles and repetition counting from the 33 Pose landmarks.
+
+All joint angles of a frame come from one precomputed (joint, 3) index
+array and a single vectorized angle computation. Every joint that counts
+repetitions has a two-threshold state machine (extended -> flexed ->
+extended is one rep), updated for all joints at once.
+
+Nothing depends on wall time, so feeding the same landmark stream always
+gives the same angles and counts; recorded streams and the fake backend
+can be used to test and benchmark the analytics without a camera.
+"""
+import numpy as np
+
+# Joint name -> (first landmark, vertex landmark, second landmark)
+JOINTS = {
+    'left_elbow': (11, 13, 15),
+    'right_elbow': (12, 14, 16),
+    'left_shoulder': (23, 11, 13),
+    'right_shoulder': (24, 12, 14),
+    'left_hip': (11, 23, 25),
+    'right_hip': (12, 24, 26),
+    'left_knee': (23, 25, 27),
+    'right_knee': (24, 26, 28),
+}
+JOINT_NAMES = list(JOINTS)
+TRIPLETS = np.array([JOINTS[name] for name in JOINT_NAMES])
+
+# Joint -> (extended above, flexed below) angles in degrees for rep counting
+REP_THRESHOLDS = {
+    'left_elbow': (150.0, 60.0),
+    'right_elbow': (150.0, 60.0),
+    'left_knee': (160.0, 100.0),
+    'right_knee': (160.0, 100.0),
+}
+
+# Exercise -> joints whose reps it reports (the highest count of them, so a
+# squat is still counted while one knee is hidden)
+EXERCISES = {
+    'left_curl': ('left_elbow',),
+    'right_curl': ('right_elbow',),
+    'squat': ('left_knee', 'right_knee'),
+}
+
+
+def pose_landmarks_to_array(landmark_list):
+    """Copy pose landmarks into a (33, 4) float32 array of x, y, z, visibility."""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark],
+                    dtype=np.float32)
+
+
+def joint_angles(points, aspect_ratio=1.0, min_visibility=0.5):
+    """Angle at every joint in TRIPLETS.
+
+    Args:
+        points: (33, 4) landmarks (x, y, z, visibility), normalized coordinates
+        aspect_ratio: Frame width / height, so angles are measured in pixels
+        min_visibility: Joints with a less visible landmark get NaN
+
+    Returns:
+        np.ndarray: (len(JOINT_NAMES),) angles in degrees (0-180)
+    """
+    xy = points[:, :2] * (aspect_ratio, 1.0)
+    a = xy[TRIPLETS[:, 0]] - xy[TRIPLETS[:, 1]]
+    b = xy[TRIPLETS[:, 2]] - xy[TRIPLETS[:, 1]]
+    cross = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    dot = (a * b).sum(axis=1)
+    angles = np.degrees(np.arctan2(np.abs(cross), dot))
+    if points.shape[1] > 3:
+        angles[points[TRIPLETS, 3].min(axis=1) < min_visibility] = np.nan
+    return angles
+
+
+class PoseAnalyzer:
+    """Computes joint angles and counts exercise repetitions."""
+
+    def __init__(self, rep_thresholds=None, exercises=None, min_visibility=0.5):
+        """
+        Args:
+            rep_thresholds: Joint -> (extended, flexed) angles; defaults to REP_THRESHOLDS
+            exercises: Exercise -> joints; defaults to EXERCISES
+            min_visibility: Minimum landmark visibility for a joint angle to count
+        """
+        rep_thresholds = rep_thresholds or REP_THRESHOLDS
+        self.exercises = exercises or EXERCISES
+        self.min_visibility = min_visibility
+
+        # Per-joint thresholds; NaN for joints that do not count reps
+        self._extended = np.full(len(JOINT_NAMES), np.nan)
+        self._flexed = np.full(len(JOINT_NAMES), np.nan)
+        for name, (extended, flexed) in rep_thresholds.items():
+            self._extended[JOINT_NAMES.index(name)] = extended
+            self._flexed[JOINT_NAMES.index(name)] = flexed
+        self._exercise_joints = {exercise: [JOINT_NAMES.index(name) for name in joints]
+                                 for exercise, joints in self.exercises.items()}
+        self.reset()
+
+    def reset(self):
+        """Zero all rep counts."""
+        self.flexed = np.zeros(len(JOINT_NAMES), dtype=bool)
+        self.joint_reps = np.zeros(len(JOINT_NAMES), dtype=np.int64)
+
+    def update(self, points, aspect_ratio=1.0):
+        """Analyze one frame.
+
+        Args:
+            points: (33, 4) pose landmarks, or None when nobody is visible
+            aspect_ratio: Frame width / height
+
+        Returns:
+            dict: angles (joint -> degrees or None), reps (exercise -> count),
+                  flexed (joint -> bool) and completed (exercises whose
+                  count went up on this frame)
+        """
+        if points is None:
+            angles = np.full(len(JOINT_NAMES), np.nan)
+        else:
+            angles = joint_angles(points, aspect_ratio, self.min_visibility)
+
+        # Comparisons with NaN are False, so hidden joints and joints
+        # without thresholds keep their state
+        going_flexed = ~self.flexed & (angles < self._flexed)
+        going_extended = self.flexed & (angles > self._extended)
+        before = self.exercise_reps()
+        self.joint_reps += going_extended
+        self.flexed = (self.flexed | going_flexed) & ~going_extended
+        reps = self.exercise_reps()
+
+        return {
+            'angles': {name: (None if np.isnan(angle) else float(angle))
+                       for name, angle in zip(JOINT_NAMES, angles)},
+            'reps': reps,
+            'flexed': {name: bool(flag) for name, flag in zip(JOINT_NAMES, self.flexed)},
+            'completed': [exercise for exercise in reps if reps[exercise] > before[exercise]]
+        }
+
+    def exercise_reps(self):
+        """Return the rep count of every exercise."""
+        return {exercise: int(self.joint_reps[joints].max())
+                for exercise, joints in self._exercise_joints.items()}
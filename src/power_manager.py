@@ -0,0 +1,210 @@
+"""
+Active, idle and sleep power states for unattended use.
+
+While nothing is detected the manager steps down through the states:
+after `idle_after` seconds without a hand, face or pose it asks the
+WebcamStream for a smaller, slower capture profile and lets inference run
+only on every `idle_every`-th frame; after `sleep_after` seconds it steps
+down again. The frames in between reuse the previous (empty) results.
+
+Every frame, including the skipped ones, goes through a cheap MotionGate
+thumbnail comparison. Motion or a detection switches straight back to the
+active state: that frame already runs inference and the capture thread is
+reconfigured at once, so full rate resumes within a frame.
+
+Wall-clock residency and process CPU time (all threads, from
+time.process_time) are accumulated per state, so the report shows how long
+each state lasted and how much CPU it used.
+
+    power = PowerManager(webcam, idle_after=10, sleep_after=60)
+    if power.check(frame):          # every frame
+        results = run_inference(frame)
+        power.report(detected)       # after each inference
+"""
+import time
+from .camera import CaptureProfile
+from .motion_gate import MotionGate
+
+POWER_STATES = ('active', 'idle', 'sleep')
+
+
+def step_down_profile(profile, settings, max_width, fps):
+    """Capture profile at most `max_width` wide, keeping the aspect ratio.
+
+    Args:
+        profile: CaptureProfile the stream was opened with
+        settings: Negotiated settings of the stream (width and height)
+        max_width: Largest frame width to request
+        fps: Frame rate to request
+
+    Returns:
+        CaptureProfile: Same pixel format, buffering and backend as `profile`
+    """
+    width, height = settings['width'], settings['height']
+    if width and height and width > max_width:
+        width, height = max_width, round(height * max_width / width)
+    return CaptureProfile(width=width or None, height=height or None, fps=fps,
+                          fourcc=profile.fourcc, buffer_size=profile.buffer_size,
+                          backend=profile.backend)
+
+
+class PowerManager:
+    """Switches between active, idle and sleep depending on detections and motion."""
+
+    def __init__(self, stream=None, idle_after=10.0, sleep_after=60.0, idle_every=3,
+                 sleep_every=10, idle_width=640, idle_fps=10, sleep_width=320, sleep_fps=5,
+                 motion_threshold=0.02, settle_frames=3):
+        """
+        Args:
+            stream: WebcamStream to reconfigure (None: only inference is throttled)
+            idle_after: Seconds without a detection before going idle
+            sleep_after: Seconds without a detection before going to sleep
+            idle_every: Run inference on every this many frames while idle
+            sleep_every: Run inference on every this many frames while asleep
+            idle_width: Largest capture width while idle
+            idle_fps: Capture frame rate while idle
+            sleep_width: Largest capture width while asleep
+            sleep_fps: Capture frame rate while asleep
+            motion_threshold: Fraction of changed thumbnail pixels that wakes up
+            settle_frames: Frames after a state change during which motion is
+                           ignored, while the camera adjusts to its new profile
+        """
+        self.stream = stream
+        self.idle_after = idle_after
+        self.sleep_after = sleep_after
+        self.every = {'active': 1, 'idle': idle_every, 'sleep': sleep_every}
+        self.settle_frames = settle_frames
+
+        # Active restores the negotiated resolution, not just the requested one
+        self.profiles = {}
+        if stream is not None:
+            self.profiles = {
+                'active': step_down_profile(stream.profile, stream.settings,
+                                            stream.settings['width'], stream.profile.fps),
+                'idle': step_down_profile(stream.profile, stream.settings, idle_width, idle_fps),
+                'sleep': step_down_profile(stream.profile, stream.settings, sleep_width, sleep_fps)
+            }
+
+        # Never forced: a skipped inference is the whole point here
+        self.motion = MotionGate(motion_threshold=motion_threshold, max_skip=float('inf'))
+
+        self.state = 'active'
+        self.frames_in_state = 0
+        self.settling = 0
+        self.last_activity = None
+
+        # Accounting
+        self.transitions = []
+        self.wakes = {'motion': 0, 'detection': 0}
+        self.residency = dict.fromkeys(POWER_STATES, 0.0)
+        self.cpu = dict.fromkeys(POWER_STATES, 0.0)
+        self.frames = dict.fromkeys(POWER_STATES, 0)
+        self.inferences = dict.fromkeys(POWER_STATES, 0)
+        self._wall = None
+        self._cpu = None
+
+    def _account(self):
+        """Add the time since the last call to the current state."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._wall is not None:
+            self.residency[self.state] += wall - self._wall
+            self.cpu[self.state] += cpu - self._cpu
+        self._wall, self._cpu = wall, cpu
+
+    def set_state(self, state, reason=None):
+        """Switch to a state and reconfigure the stream.
+
+        Args:
+            state: 'active', 'idle' or 'sleep'
+            reason: Why (e.g. 'motion', 'detection', 'timeout'), for the log
+        """
+        if state == self.state:
+            return
+        self._account()
+        self.transitions.append((time.perf_counter(), self.state, state, reason))
+        if reason in self.wakes:
+            self.wakes[reason] += 1
+        self.state = state
+        self.frames_in_state = 0
+        self.settling = self.settle_frames
+        self.motion.reset()
+        if self.stream is not None:
+            self.stream.reconfigure(self.profiles[state])
+
+    def check(self, image, timestamp=None):
+        """Decide whether a frame runs inference; wakes up on motion.
+
+        Args:
+            image: BGR frame
+            timestamp: Frame time in seconds (defaults to time.perf_counter())
+
+        Returns:
+            bool: True to run inference, False to reuse the previous results
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.last_activity is None:
+            self.last_activity = timestamp
+        self._account()
+
+        if self.state != 'active':
+            # The first frames after a change only set the motion reference
+            moved = self.motion.check(image)
+            if self.settling:
+                self.settling -= 1
+            elif moved:
+                self.last_activity = timestamp
+                self.set_state('active', 'motion')
+
+        if self.state != 'sleep':
+            quiet = timestamp - self.last_activity
+            if quiet >= self.sleep_after:
+                self.set_state('sleep', 'timeout')
+            elif quiet >= self.idle_after and self.state == 'active':
+                self.set_state('idle', 'timeout')
+
+        run = self.frames_in_state % self.every[self.state] == 0
+        self.frames[self.state] += 1
+        self.frames_in_state += 1
+        if run:
+            self.inferences[self.state] += 1
+        return run
+
+    def report(self, detected, timestamp=None):
+        """Record the outcome of an inference that check() asked for.
+
+        Args:
+            detected: True if a hand, face or body was found
+            timestamp: Frame time in seconds (defaults to time.perf_counter())
+        """
+        if not detected:
+            return
+        self.last_activity = timestamp if timestamp is not None else time.perf_counter()
+        self.set_state('active', 'detection')
+
+    def get_stats(self):
+        """Return residency and CPU use per state.
+
+        Returns:
+            dict: state, wakes by cause, transitions, and per state the
+                  seconds spent, share of the total, frames, inferences
+                  and average CPU use (percent of one core, all threads)
+        """
+        self._account()
+        total = sum(self.residency.values())
+        states = {}
+        for state in POWER_STATES:
+            seconds = self.residency[state]
+            states[state] = {
+                'seconds': seconds,
+                'share': seconds / total if total else 0.0,
+                'frames': self.frames[state],
+                'inferences': self.inferences[state],
+                'cpu_pct': self.cpu[state] / seconds * 100 if seconds else 0.0
+            }
+        return {
+            'state': self.state,
+            'wakes': dict(self.wakes),
+            'transitions': len(self.transitions),
+            'states': states
+        }
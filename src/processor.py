@@ -1,46 +1,114 @@
+import queue
+import threading
+import time
 import cv2
 import mediapipe as mp
 import numpy as np
 from .gesture_recognizer import GestureRecognizer
+from .gesture_engine import GestureEngine
 from .volume_controller import VolumeController
 from .finger_counter import FingerCounter
+from .hand_tracker import HandTracker
 from .air_writer import AirWriter
-from .utils import VolumeBarDrawer, draw_rotation_indicator, draw_gesture_status, draw_finger_count, draw_air_writing_controls
+from .stroke_recognizer import StrokeRecognizer
+from .hand_pose_classifier import HandPoseClassifier
+from .face_analytics import FaceAnalyzer
+from .pose_analytics import PoseAnalyzer, pose_landmarks_to_array
+from .inference import GRAPHS, create_backend
+from .segmentation import BackgroundCompositor
+from .motion_gate import MotionGate
+from .buffer_pool import FRAME_POOL
+from .tracing import TRACER
+from .utils import VolumeBarDrawer, draw_rotation_indicator, draw_gesture_status, draw_finger_count, draw_air_writing_controls, draw_recognized_text, draw_gesture_event, draw_hand_label, draw_face_metrics, draw_pose_metrics, draw_multi_pose, draw_text_with_background, landmarks_to_array
+
+# Trace span name of each graph's inference call
+INFERENCE_SPANS = {name: f"process {name}" for name in GRAPHS}
+
 
 class VisionProcessor:
-    def __init__(self, mode='none'):
+    # MediaPipe graph needed by each mode
+    GRAPH_FOR_MODE = {
+        'hands': 'hands',
+        'gestures': 'hands',
+        'count': 'hands',
+        'draw': 'hands',
+        'face': 'face',
+        'pose': 'pose',
+        'segment': 'segment',
+        'multipose': 'multipose'
+    }
+
+    # Heavy graphs only built once a mode needs them (several Pose graphs,
+    # a person detector and worker threads for 'multipose')
+    LAZY_GRAPHS = ('multipose',)
+
+    def __init__(self, mode='none', hand_pose_library='hand_poses.npz', lazy_graphs=False,
+                 backend='legacy', model_dir=None, buffer_pool=None, motion_gate=None,
+                 segment_background=None, max_num_hands=2, max_num_people=4,
+                 power_manager=None):
+        """
+        Args:
+            mode: Initial processing mode
+            hand_pose_library: Template library for the static hand-pose classifier
+            lazy_graphs: Do not build the MediaPipe graphs here; call warm_up()
+                         (usually from a background thread) and check is_ready()
+            backend: InferenceBackend instance, or 'legacy' (synchronous
+                     mp.solutions), 'tasks' (asynchronous MediaPipe Tasks)
+                     or 'fake' (deterministic synthetic landmarks)
+            model_dir: Model cache directory for the 'tasks' backend
+            buffer_pool: BufferPool for per-frame temporaries (defaults to FRAME_POOL)
+            motion_gate: Optional MotionGate; skips inference while the scene is static
+            segment_background: BGR image to replace the background with in
+                                'segment' mode (blurred without one)
+            max_num_hands: Maximum number of hands detected and tracked
+            max_num_people: Maximum number of people in 'multipose' mode
+            power_manager: Optional PowerManager; runs inference on fewer
+                           frames while nothing has been detected for a while
+        """
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
-        
-        # Initialize MediaPipe Hands
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            model_complexity=0,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-
-        # Initialize MediaPipe Face Mesh
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-
-        # Initialize MediaPipe Pose
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            model_complexity=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
-        # Initialize gesture recognition and volume control
-        self.gesture_recognizer = GestureRecognizer()
+
+        # Graphs are built by warm_up(); each has its own ready signal
+        if isinstance(backend, str):
+            backend = create_backend(backend, model_dir=model_dir, max_num_hands=max_num_hands,
+                                     max_num_people=max_num_people)
+        self.backend = backend
+        self.ready = {name: threading.Event() for name in GRAPHS}
+        self.errors = {}
+        self._lazy_requests = queue.Queue()
+
+        self.buffer_pool = buffer_pool or FRAME_POOL
+
+        # Seconds spent in each stage of the last processed frame
+        self.timings = {'gate': 0.0, 'convert': 0.0, 'inference': 0.0, 'annotate': 0.0}
+
+        # Optional motion gate; results of the last inference are reused
+        # for frames it lets through without inference
+        self.motion_gate = motion_gate
+        self.last_results = {}
+        
+        # Optional idle/sleep states; every inference reports whether
+        # anything was detected
+        self.power_manager = power_manager
+        
+        # Hands keep their ID across frames; gesture and pen state is kept per ID
+        self.hand_tracker = HandTracker(max_num_hands, state_factory=self._new_hand_state)
+        self.tracked_hands = []
+        
+        # Initialize volume control (driven by the longest-tracked hand)
         self.volume_controller = VolumeController()
         self.volume_bar = VolumeBarDrawer()
+        # The level outlives the hands: a hand that takes control continues
+        # from it instead of from its recognizer's default
+        self.volume_level = self.volume_controller.get_volume()
+        self.volume_hand_id = None
+        
+        # Dynamic gestures (swipe, pinch, wave, circle) are detected per hand
+        self.last_gesture_event = None
+        self.last_gesture_time = 0.0
         
         # Initialize finger counter
         self.finger_counter = FingerCounter()
@@ -48,65 +116,297 @@ class VisionProcessor:
         # Initialize air writer
         self.air_writer = AirWriter()
         
+        # Recognizes completed air-written strokes on a worker thread
+        self.stroke_recognizer = StrokeRecognizer()
+        self.last_stroke_event = None
+        
+        # Initialize static hand-pose classifier (templates recorded with record_hand_pose.py)
+        self.hand_pose_classifier = HandPoseClassifier.load(hand_pose_library)
+        
+        # Initialize face metrics (blink, mouth opening, head pose)
+        self.face_analyzer = FaceAnalyzer()
+        
+        # Initialize pose metrics (joint angles, curl and squat reps)
+        self.pose_analyzer = PoseAnalyzer()
+        
+        # Skeleton of every person in multipose mode, drawn in one pass
+        self.pose_connections = np.array(sorted(self.mp_pose.POSE_CONNECTIONS))
+        self.people_in_view = 0
+        
+        # Initialize background blur / replacement; the segmentation mask is
+        # reused while the scene is static even without the global motion gate
+        self.segmenter = BackgroundCompositor(
+            effect='replace' if segment_background is not None else 'blur',
+            background=segment_background)
+        self.segment_gate = MotionGate(max_skip=5)
+        
         self.mode = mode
+        # True when the last processed frame was annotated from a graph result
+        self.annotated = False
+
+        if not lazy_graphs:
+            self.warm_up(run_inference=False, include_lazy=True)
+            if self.errors:
+                raise next(iter(self.errors.values()))
+
+    def warm_up(self, first_mode=None, profiler=None, run_inference=True, include_lazy=False):
+        """Build every graph that is not ready yet and signal readiness.
+
+        The graph of the current mode goes first, so a mode selected while
+        the warm-up runs only waits for the graph being built. A graph that
+        fails to build is recorded in `errors` and the others are still built.
+        Graphs in LAZY_GRAPHS are skipped unless a selected mode needs them
+        (see serve_lazy_builds).
+
+        Args:
+            first_mode: Mode whose graph is built first when the current
+                        mode needs none
+            profiler: Optional StartupProfiler to record build times into
+            run_inference: Run one blank frame through each graph so the
+                           first real frame does not pay for model loading
+            include_lazy: Build the LAZY_GRAPHS as well
+        """
+        skipped = () if include_lazy else self.LAZY_GRAPHS
+        attempted = set()
+        while True:
+            pending = [name for name in GRAPHS
+                       if name not in attempted and not self.ready[name].is_set()]
+            wanted = [self.GRAPH_FOR_MODE.get(mode) for mode in (self.mode, first_mode)]
+            name = next((graph for graph in wanted if graph in pending), None)
+            if name is None:
+                name = next((graph for graph in pending if graph not in skipped), None)
+            if name is None:
+                return
+            attempted.add(name)
+            self._build_graph(name, profiler, run_inference)
+
+    def serve_lazy_builds(self, profiler=None):
+        """Build LAZY_GRAPHS when a mode that needs them is selected; never returns.
+
+        Meant for the thread that ran warm_up(), so MediaPipe's threads
+        start on the same CPUs as those of the other graphs.
+        """
+        while True:
+            name = self._lazy_requests.get()
+            if not self.ready[name].is_set() and name not in self.errors:
+                self._build_graph(name, profiler, run_inference=True)
+
+    def _build_graph(self, name, profiler=None, run_inference=True):
+        start = time.perf_counter()
+        try:
+            self.backend.build(name)
+            built = time.perf_counter()
+            if run_inference:
+                self._infer(name, np.zeros((240, 320, 3), dtype=np.uint8), 0.0)
+        except Exception as e:
+            self.errors[name] = e
+            print(f"Could not load the {name} graph: {e}")
+            return
+        if profiler:
+            profiler.record(f"build {name} graph", built - start)
+            if run_inference:
+                profiler.record(f"warm {name} graph", time.perf_counter() - built)
+        self.ready[name].set()
+        if profiler:
+            profiler.mark(f"{name} ready")
+
+    def _infer(self, name, image_rgb, timestamp):
+        """Run one graph on an RGB frame with the selected backend."""
+        with TRACER.span(INFERENCE_SPANS[name]):
+            return self.backend.process(name, image_rgb, timestamp)
+
+    def is_ready(self, mode=None):
+        """Return True when the graph needed by a mode (default: current) is ready."""
+        graph = self.GRAPH_FOR_MODE.get(mode or self.mode)
+        return graph is None or self.ready[graph].is_set()
+
+    def graph_error(self, mode=None):
+        """Return the error that stopped a mode's graph from loading, or None."""
+        return self.errors.get(self.GRAPH_FOR_MODE.get(mode or self.mode))
 
     def set_mode(self, mode):
+        if mode != self.mode:
+            # Results of another graph cannot be reused
+            self.last_results = {}
+            if self.motion_gate is not None:
+                self.motion_gate.reset()
+            self.segment_gate.reset()
+            self.hand_tracker.reset()
+            self.tracked_hands = []
+        graph = self.GRAPH_FOR_MODE.get(mode)
+        if graph in self.LAZY_GRAPHS and not self.ready[graph].is_set():
+            self._lazy_requests.put(graph)
         self.mode = mode
 
-    def process(self, image):
-        """Process the image based on current mode."""
-        # Convert the BGR image to RGB
-        image.flags.writeable = False
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        results = {}
+    def _landmark_points(self, results):
+        """Stack every detected landmark of a results dict into an (N, 3) array."""
+        landmark_lists = []
+        if results.get('hands') and results['hands'].multi_hand_landmarks:
+            landmark_lists.extend(results['hands'].multi_hand_landmarks)
+        if results.get('face') and results['face'].multi_face_landmarks:
+            landmark_lists.extend(results['face'].multi_face_landmarks)
+        if results.get('pose') and results['pose'].pose_landmarks:
+            landmark_lists.append(results['pose'].pose_landmarks)
+        if results.get('multipose') and results['multipose'].multi_pose_landmarks:
+            landmark_lists.extend(results['multipose'].multi_pose_landmarks)
+        if not landmark_lists:
+            return None
+        return np.concatenate([landmarks_to_array(landmarks) for landmarks in landmark_lists])
+
+    def _new_hand_state(self, hand_id):
+        """Per-hand state, created when a hand starts being tracked."""
+        return {'gesture': GestureRecognizer(), 'engine': GestureEngine()}
+
+    def _track_hands(self, results, image, timestamp):
+        hands = results.get('hands')
+        h, w = image.shape[:2]
+        self.tracked_hands = self.hand_tracker.update(
+            hands.multi_hand_landmarks if hands else None,
+            hands.multi_handedness if hands else None,
+            timestamp, aspect_ratio=w / h)
+        return self.tracked_hands
+
+    def _finish_stroke(self, timestamp, pen=0):
+        stroke = self.air_writer.add_point(None, pen)
+        if stroke:
+            # Strokes are in canvas coordinates, which have square units
+            self.stroke_recognizer.submit(stroke, timestamp)
+
+    def _collect_stroke_events(self):
+        events = self.stroke_recognizer.poll()
+        for event in events:
+            if event['label'] != 'unknown':
+                self.air_writer.append_text(event['label'])
+            self.last_stroke_event = event
+        return events
+
+    def process(self, image, timestamp=None):
+        """Process the image based on current mode.
+
+        Args:
+            image: BGR frame, annotated in place
+            timestamp: Capture time of the frame in seconds
+                       (defaults to time.perf_counter())
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        # Keep the preview live while this mode's graph is still loading
+        self.annotated = False
+        if not self.is_ready():
+            error = self.graph_error()
+            if error is not None:
+                draw_text_with_background(image, f"Could not load {self.mode} model: {str(error)[:60]}",
+                                          (20, 120), text_color=(0, 0, 255), bg_color=(0, 0, 0))
+            else:
+                draw_text_with_background(image, f"Loading {self.mode} model...", (20, 120),
+                                          text_color=(0, 255, 255), bg_color=(0, 0, 0))
+            return image
 
-        if self.mode == 'hands' or self.mode == 'gestures' or self.mode == 'count' or self.mode == 'draw':
-            results['hands'] = self.hands.process(image_rgb)
-        elif self.mode == 'face':
-            results['face'] = self.face_mesh.process(image_rgb)
-        elif self.mode == 'pose':
-            results['pose'] = self.pose.process(image_rgb)
+        # On a static scene the motion gate skips inference and the
+        # previous results are drawn again
+        start = time.perf_counter()
+        graph = self.GRAPH_FOR_MODE.get(self.mode)
+        gate = self.motion_gate
+        if gate is None and graph == 'segment':
+            gate = self.segment_gate
+        awake = self.power_manager is None or self.power_manager.check(image, timestamp)
+        run_inference = graph is not None and awake and (gate is None or gate.check(image))
+        gated = time.perf_counter()
+
+        if run_inference:
+            # Convert the BGR image to RGB
+            image.flags.writeable = False
+            with TRACER.span('cvtColor'):
+                if graph == 'segment':
+                    # Segmentation runs on a small copy of the frame
+                    image_rgb = self.segmenter.prepare(image, self.buffer_pool)
+                else:
+                    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.buffer_pool.acquire_like(image))
+            converted = time.perf_counter()
+            results = {graph: self._infer(graph, image_rgb, timestamp)}
+            inferred = time.perf_counter()
+            # Backends copy the frame when it is submitted, so the RGB buffer can go back now
+            self.buffer_pool.release(image_rgb)
+            self.last_results = results
+            if gate is not None or self.power_manager is not None:
+                points = self._landmark_points(results)
+                if gate is not None:
+                    gate.update(points, inferred - gated)
+                if self.power_manager is not None:
+                    detected = points is not None
+                    segment = results.get('segment')
+                    if graph == 'segment' and segment is not None and segment.segmentation_mask is not None:
+                        # A person in the mask counts as a detection
+                        detected = segment.segmentation_mask.max() > 0.5
+                    self.power_manager.report(detected, timestamp)
+        else:
+            converted = inferred = gated
+            results = self.last_results
+        self.annotated = graph is not None and results.get(graph) is not None
         
         # Draw the annotations on the image
         image.flags.writeable = True
         
+        # Follow hands across frames in every mode that uses them
+        tracked = self._track_hands(results, image, timestamp) if graph == 'hands' else []
+        
         # Handle gesture mode
-        if self.mode == 'gestures' and results.get('hands') and results['hands'].multi_hand_landmarks:
-            # Use the first detected hand for gesture control
-            hand_landmarks = results['hands'].multi_hand_landmarks[0]
-            
-            # Get gesture information
-            gesture_info = self.gesture_recognizer.get_gesture_info(hand_landmarks)
-            
-            # Update system volume
-            self.volume_controller.set_volume(gesture_info['volume'])
-            
-            # Draw hand landmarks
-            self.mp_drawing.draw_landmarks(
-                image,
-                hand_landmarks,
-                self.mp_hands.HAND_CONNECTIONS,
-                self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                self.mp_drawing_styles.get_default_hand_connections_style())
-            
-            # Draw rotation indicator
-            draw_rotation_indicator(
-                image,
-                gesture_info['wrist_pos'],
-                gesture_info['middle_mcp_pos'],
-                rotation_direction=gesture_info['rotation_direction']
-            )
-            
-            # Draw volume bar
-            self.volume_bar.draw(image, gesture_info['volume'])
+        if self.mode == 'gestures' and tracked:
+            # Every hand keeps its own rotation and dynamic gesture state;
+            # the hand tracked the longest controls the volume
+            controller = tracked[0]
+            if controller.hand_id != self.volume_hand_id:
+                controller.state['gesture'].set_volume(self.volume_level)
+                self.volume_hand_id = controller.hand_id
+            for hand in tracked:
+                hand_landmarks = hand.landmarks
+                
+                # Get gesture information
+                gesture_info = hand.state['gesture'].get_gesture_info(hand_landmarks, timestamp)
+                
+                # Feed the dynamic gesture engine
+                events = hand.state['engine'].update(landmarks_to_array(hand_landmarks), timestamp)
+                if events:
+                    self.last_gesture_event = events[-1]
+                    self.last_gesture_time = timestamp
+                
+                # Draw hand landmarks
+                self.mp_drawing.draw_landmarks(
+                    image,
+                    hand_landmarks,
+                    self.mp_hands.HAND_CONNECTIONS,
+                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
+                    self.mp_drawing_styles.get_default_hand_connections_style())
+                
+                # Draw rotation indicator
+                draw_rotation_indicator(
+                    image,
+                    gesture_info['wrist_pos'],
+                    gesture_info['middle_mcp_pos'],
+                    rotation_direction=gesture_info['rotation_direction']
+                )
+                
+                if hand is controller:
+                    # Update system volume
+                    self.volume_level = gesture_info['volume']
+                    self.volume_controller.set_volume(gesture_info['volume'])
+                    
+                    # Draw volume bar
+                    self.volume_bar.draw(image, gesture_info['volume'])
+                    
+                    # Draw gesture status
+                    draw_gesture_status(
+                        image, 
+                        gesture_info['rotation_direction'],
+                        gesture_info['palm_angle']
+                    )
+                elif len(tracked) > 1:
+                    draw_hand_label(image, f"hand {hand.hand_id}", gesture_info['wrist_pos'])
             
-            # Draw gesture status
-            draw_gesture_status(
-                image, 
-                gesture_info['rotation_direction'],
-                gesture_info['palm_angle']
-            )
+            # Show the most recent dynamic gesture for a moment
+            if self.last_gesture_event and timestamp - self.last_gesture_time < 1.0:
+                draw_gesture_event(image, self.last_gesture_event)
         
         # Handle finger counting mode
         elif self.mode == 'count' and results.get('hands') and results['hands'].multi_hand_landmarks:
@@ -129,46 +429,72 @@ class VisionProcessor:
             draw_finger_count(image, total_fingers, hand_details)
         
         # Handle air writing mode
-        elif self.mode == 'draw' and results.get('hands') and results['hands'].multi_hand_landmarks:
-            # Use first detected hand
-            hand_landmarks = results['hands'].multi_hand_landmarks[0]
+        elif self.mode == 'draw' and tracked:
+            self.air_writer.set_frame_size(image.shape[1::-1])
             
-            # Detect drawing gesture
-            is_drawing, finger_pos = self.air_writer.detect_drawing_gesture(hand_landmarks)
+            # Detect the drawing and pan gestures of every hand
+            gestures = []
+            for hand in tracked:
+                is_drawing, finger_pos = self.air_writer.detect_drawing_gesture(hand.landmarks)
+                is_panning, pan_pos = self.air_writer.detect_pan_gesture(hand.landmarks)
+                gestures.append((hand, is_drawing, finger_pos, is_panning, pan_pos))
+            panning = [(hand, pan_pos) for hand, _, _, is_panning, pan_pos in gestures if is_panning]
             
-            # Add point if drawing
-            if is_drawing:
-                self.air_writer.add_point(finger_pos)
+            if len(panning) > 1:
+                # Two hands with two raised fingers zoom: spread them apart to zoom in
+                self.air_writer.zoom_with_hands(panning[0][1], panning[1][1])
+            elif panning:
+                # Two raised fingers drag the canvas
+                self.air_writer.pan_with_hand(panning[0][1], panning[0][0].hand_id)
             else:
-                # Add None to break the line
-                self.air_writer.add_point(None)
+                self.air_writer.end_navigation()
             
-            # Draw accumulated points
-            self.air_writer.draw_on_frame(image)
+            # Every hand draws with its own pen, keyed by its ID
+            for hand, is_drawing, finger_pos, _, _ in gestures:
+                if is_drawing:
+                    self.air_writer.add_point(finger_pos, hand.hand_id)
+                else:
+                    # Lifting the pen completes the stroke
+                    self._finish_stroke(timestamp, hand.hand_id)
             
-            # Draw cursor at finger tip
-            self.air_writer.draw_cursor(image, finger_pos, is_drawing)
+            # Draw the visible part of the canvas
+            self.air_writer.draw_on_frame(image)
             
-            # Draw hand landmarks
-            self.mp_drawing.draw_landmarks(
-                image,
-                hand_landmarks,
-                self.mp_hands.HAND_CONNECTIONS,
-                self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                self.mp_drawing_styles.get_default_hand_connections_style())
+            for hand, is_drawing, finger_pos, is_panning, pan_pos in gestures:
+                # Draw cursor at finger tip
+                self.air_writer.draw_cursor(image, pan_pos if is_panning else finger_pos, is_drawing)
+                
+                # Draw hand landmarks
+                self.mp_drawing.draw_landmarks(
+                    image,
+                    hand.landmarks,
+                    self.mp_hands.HAND_CONNECTIONS,
+                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
+                    self.mp_drawing_styles.get_default_hand_connections_style())
             
             # Draw instructions
             draw_air_writing_controls(image)
         
         # Handle regular hand tracking mode
-        elif self.mode == 'hands' and results.get('hands') and results['hands'].multi_hand_landmarks:
-            for hand_landmarks in results['hands'].multi_hand_landmarks:
+        elif self.mode == 'hands' and tracked:
+            h, w = image.shape[:2]
+            for hand in tracked:
+                hand_landmarks, hand_info = hand.landmarks, hand.handedness_info
                 self.mp_drawing.draw_landmarks(
                     image,
                     hand_landmarks,
                     self.mp_hands.HAND_CONNECTIONS,
                     self.mp_drawing_styles.get_default_hand_landmarks_style(),
                     self.mp_drawing_styles.get_default_hand_connections_style())
+                
+                # Label the hand with the closest recorded pose
+                if len(self.hand_pose_classifier):
+                    label, _ = self.hand_pose_classifier.classify(
+                        landmarks_to_array(hand_landmarks),
+                        handedness=hand_info.classification[0].label,
+                        aspect_ratio=w / h)
+                    wrist = hand_landmarks.landmark[0]
+                    draw_hand_label(image, label, (wrist.x, wrist.y), hand.hand_id)
                     
         elif self.mode == 'face' and results.get('face') and results['face'].multi_face_landmarks:
             for face_landmarks in results['face'].multi_face_landmarks:
@@ -184,6 +510,12 @@ class VisionProcessor:
                     connections=self.mp_face_mesh.FACEMESH_CONTOURS,
                     landmark_drawing_spec=None,
                     connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_contours_style())
+            
+            # Compute face metrics and expose them with the results
+            h, w = image.shape[:2]
+            results['face_metrics'] = self.face_analyzer.analyze(
+                results['face'].multi_face_landmarks, (w, h), timestamp)
+            draw_face_metrics(image, results['face_metrics'][0])
         
         elif self.mode == 'pose' and results.get('pose') and results['pose'].pose_landmarks:
             # Draw pose landmarks
@@ -192,5 +524,43 @@ class VisionProcessor:
                 results['pose'].pose_landmarks,
                 self.mp_pose.POSE_CONNECTIONS,
                 landmark_drawing_spec=self.mp_drawing_styles.get_default_pose_landmarks_style())
+            
+            # Joint angles and rep counts, exposed with the results
+            h, w = image.shape[:2]
+            results['pose_metrics'] = self.pose_analyzer.update(
+                pose_landmarks_to_array(results['pose'].pose_landmarks), w / h)
+            draw_pose_metrics(image, results['pose_metrics'])
+
+        elif self.mode == 'multipose':
+            people = []
+            if results.get('multipose') and results['multipose'].multi_pose_landmarks:
+                people = [(person_id, pose_landmarks_to_array(landmarks))
+                          for person_id, landmarks in zip(results['multipose'].person_ids,
+                                                          results['multipose'].multi_pose_landmarks)]
+            self.people_in_view = len(people)
+            results['people'] = len(people)
+            draw_multi_pose(image, people, self.pose_connections)
+            draw_text_with_background(image, f"People: {len(people)}", (20, 120), font_scale=0.6)
+
+        elif self.mode == 'segment' and results.get('segment') and results['segment'].segmentation_mask is not None:
+            # Blur or replace the background in place
+            self.segmenter.composite(image, results['segment'].segmentation_mask)
+
+        if self.mode == 'draw':
+            # A hand leaving the frame also completes its stroke
+            visible = {hand.hand_id for hand in tracked}
+            for pen in self.air_writer.active_pens():
+                if pen not in visible:
+                    self._finish_stroke(timestamp, pen)
+            if not tracked:
+                self.air_writer.end_navigation()
+                # The drawing stays on screen without hands
+                self.air_writer.draw_on_frame(image)
+            results['stroke_events'] = self._collect_stroke_events()
+            draw_recognized_text(image, self.air_writer.text, self.last_stroke_event)
 
+        self.timings['gate'] = gated - start
+        self.timings['convert'] = converted - gated
+        self.timings['inference'] = inferred - converted
+        self.timings['annotate'] = time.perf_counter() - inferred
         return image
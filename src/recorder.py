@@ -0,0 +1,210 @@
+"""
+Non-blocking recording of annotated frames.
+
+The live loop only pushes frames onto a bounded queue; a background thread
+owns the cv2.VideoWriter and does all the encoding. When the encoder falls
+behind, new frames are dropped (and counted) instead of stalling the loop.
+"""
+import csv
+import os
+import queue
+import threading
+import time
+import cv2
+
+# File extension used for each supported codec
+EXTENSIONS = {'mp4v': '.mp4', 'avc1': '.mp4', 'MJPG': '.avi', 'XVID': '.avi'}
+
+
+class VideoRecorder:
+    """Records frames to rotating video segments on a background thread.
+
+    Every segment gets a CSV sidecar with one row per frame: frame index,
+    capture timestamp and the time the frame was encoded.
+    """
+
+    def __init__(self, output_dir='recordings', fps=30.0, fourcc='mp4v', queue_size=64,
+                 max_segment_seconds=300.0, max_segment_bytes=None, prefix='session'):
+        """
+        Args:
+            output_dir: Directory the segments are written to
+            fps: Frame rate stored in the video files
+            fourcc: Codec, e.g. 'mp4v' or 'MJPG'
+            queue_size: Maximum number of frames waiting to be encoded
+            max_segment_seconds: Start a new segment after this much capture time
+            max_segment_bytes: Start a new segment once a file reaches this size
+            prefix: File name prefix
+        """
+        self.output_dir = output_dir
+        self.fps = fps
+        self.fourcc = fourcc
+        self.max_segment_seconds = max_segment_seconds
+        self.max_segment_bytes = max_segment_bytes
+        self.prefix = prefix
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.segments = []
+        self.recording = False
+        self.error = None
+
+        self._writer = None
+        self._sidecar = None
+        self._sidecar_file = None
+        self._segment_start = None
+        self._segment_frames = 0
+        self._frame_size = None
+        self._thread = None
+
+    def start(self):
+        """Start the encoder thread."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.recording = True
+        self._thread = threading.Thread(target=self._run, args=(), name="video-recorder")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def write(self, frame, timestamp=None, release=None):
+        """Queue a frame for encoding without blocking.
+
+        The recorder takes ownership of the frame; the caller must not
+        modify it afterwards.
+
+        Args:
+            frame: BGR frame
+            timestamp: Capture time in seconds (defaults to time.perf_counter())
+            release: Optional callback (e.g. BufferPool.release) called with
+                     the frame once the recorder is done with it, whether it
+                     was encoded or dropped
+
+        Returns:
+            bool: False if the frame was dropped because the queue was full
+        """
+        if not self.recording:
+            if release is not None:
+                release(frame)
+            return False
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        try:
+            self.queue.put_nowait((frame, timestamp, release))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            if release is not None:
+                release(frame)
+            return False
+
+    def stop(self):
+        """Finish encoding queued frames and close the current segment.
+
+        Also waits for an encoder thread that stopped on an error; any
+        frames still queued are then handed back to their release callbacks.
+        """
+        if self._thread is None:
+            return
+        if self.recording:
+            self.recording = False
+            self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+        # A frame queued while the encoder was failing is still waiting
+        self._drain()
+
+    def _drain(self):
+        """Release every frame left in the queue without encoding it."""
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                continue
+            frame, _, release = item
+            if release is not None:
+                release(frame)
+
+    def get_stats(self):
+        """Return recording statistics.
+
+        Returns:
+            dict: frames_written, frames_dropped, queued, segments and
+                  error (the exception that stopped the encoder, or None)
+        """
+        return {
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'queued': self.queue.qsize(),
+            'segments': list(self.segments),
+            'error': self.error
+        }
+
+    def _run(self):
+        item = None
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                frame, timestamp, release = item
+                if self._needs_new_segment(frame, timestamp):
+                    self._open_segment(frame, timestamp)
+                self._writer.write(frame)
+                item = None
+                if release is not None:
+                    release(frame)
+                self._sidecar.writerow([self.frames_written, f"{timestamp:.6f}",
+                                        f"{time.perf_counter():.6f}"])
+                self.frames_written += 1
+                self._segment_frames += 1
+        except Exception as e:
+            self.error = e
+            self.recording = False
+            # Give back the frame that failed and everything still queued
+            if item is not None and item[2] is not None:
+                item[2](item[0])
+            self._drain()
+        finally:
+            self._close_segment()
+
+    def _needs_new_segment(self, frame, timestamp):
+        if self._writer is None:
+            return True
+        if frame.shape[1::-1] != self._frame_size:
+            return True
+        if self.max_segment_seconds and timestamp - self._segment_start >= self.max_segment_seconds:
+            return True
+        # Checking the file size is a syscall, so only do it now and then
+        if self.max_segment_bytes and self._segment_frames % 30 == 0:
+            return os.path.getsize(self.segments[-1]) >= self.max_segment_bytes
+        return False
+
+    def _open_segment(self, frame, timestamp):
+        self._close_segment()
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.output_dir, f"{self.prefix}_{stamp}_{len(self.segments):03d}")
+        path = base + EXTENSIONS.get(self.fourcc, '.avi')
+
+        self._frame_size = frame.shape[1::-1]
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                       self.fps, self._frame_size)
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for {path}")
+
+        self._sidecar_file = open(base + '.csv', 'w', newline='')
+        self._sidecar = csv.writer(self._sidecar_file)
+        self._sidecar.writerow(['frame', 'capture_time', 'write_time'])
+        self._segment_start = timestamp
+        self._segment_frames = 0
+        self.segments.append(path)
+
+    def _close_segment(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self._sidecar_file is not None:
+            self._sidecar_file.close()
+            self._sidecar_file = None
+            self._sidecar = None
@@ -0,0 +1,184 @@
+"""
+Thread and core placement for capture, inference and rendering.
+
+A RuntimeProfile sets the size of OpenCV's internal thread pool and pins
+each role's thread to its own CPU set:
+
+- 'capture': the WebcamStream.update thread
+- 'inference': the thread that builds the MediaPipe graphs. MediaPipe and
+  XNNPACK start their worker threads while a graph is built, and new
+  threads inherit the affinity of the thread that creates them, so the
+  inference work ends up on these CPUs
+- 'render': the main loop (processing, drawing and display)
+
+Pinning uses os.sched_setaffinity(0, ...), which on Linux applies to the
+calling thread only. CPU sets are clipped to the CPUs the process may use;
+a role whose set ends up empty, or any role on a platform without
+sched_setaffinity, is left unpinned. Everything actually applied is kept in
+`layout` so it can be printed or stored with benchmark results.
+"""
+import os
+import threading
+import cv2
+
+ROLES = ('capture', 'inference', 'render')
+
+
+def parse_cpus(text):
+    """Parse a CPU list such as '0', '2-3' or '0,2-3' into a set of ints."""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def format_cpus(cpus):
+    """Format a set of CPUs compactly, e.g. {0, 2, 3} -> '0,2-3'."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def available_cpus():
+    """CPUs the calling thread may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+class RuntimeProfile:
+    """OpenCV thread count and per-role CPU sets."""
+
+    def __init__(self, name='default', cv_threads=None, capture_cpus=None, inference_cpus=None,
+                 render_cpus=None):
+        """
+        Args:
+            name: Profile name used in reports
+            cv_threads: Size of OpenCV's thread pool (None leaves it alone,
+                        0 or 1 runs OpenCV functions on the calling thread)
+            capture_cpus: CPUs for the capture thread (None: not pinned)
+            inference_cpus: CPUs for graph building and MediaPipe's threads
+            render_cpus: CPUs for the main loop
+        """
+        self.name = name
+        self.cv_threads = cv_threads
+        self.cpus = {'capture': capture_cpus, 'inference': inference_cpus, 'render': render_cpus}
+        self.layout = {'profile': name, 'cv_threads': None, 'threads': {}}
+        self.lock = threading.Lock()
+        # Read now: once the main thread is pinned, threads it starts only
+        # report their inherited CPU set
+        self.allowed = available_cpus()
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build a profile from a spec like 'cv=1:capture=0:inference=2-3:render=1'.
+
+        Args:
+            spec: Name of a built-in profile (see builtin_profiles) or a spec
+
+        Raises:
+            ValueError: If the spec names an unknown profile or field
+        """
+        profiles = builtin_profiles()
+        if spec in profiles:
+            return profiles[spec]
+        if '=' not in spec:
+            raise ValueError(f"Unknown runtime profile: {spec} (built-in: {', '.join(profiles)})")
+        kwargs = {}
+        for field in spec.split(':'):
+            key, _, value = field.partition('=')
+            if key == 'cv':
+                kwargs['cv_threads'] = int(value)
+            elif key in ROLES:
+                kwargs[f"{key}_cpus"] = parse_cpus(value)
+            else:
+                raise ValueError(f"Unknown runtime profile field: {key}")
+        return cls(name=spec, **kwargs)
+
+    def apply_process(self):
+        """Apply the process-wide settings (OpenCV's thread pool size)."""
+        if self.cv_threads is not None:
+            cv2.setNumThreads(self.cv_threads)
+        with self.lock:
+            self.layout['cv_threads'] = cv2.getNumThreads()
+        return self
+
+    def pin(self, role):
+        """Pin the calling thread to the CPU set of a role and record it.
+
+        Args:
+            role: 'capture', 'inference' or 'render'
+
+        Returns:
+            set: CPUs the thread may now run on
+        """
+        requested = self.cpus[role]
+        pinned = False
+        if requested and hasattr(os, 'sched_setaffinity'):
+            cpus = requested & self.allowed
+            if cpus:
+                os.sched_setaffinity(0, cpus)
+                pinned = True
+        current = available_cpus()
+        with self.lock:
+            self.layout['threads'][role] = {
+                'thread': threading.current_thread().name,
+                'native_id': threading.get_native_id(),
+                'requested': format_cpus(requested) if requested else None,
+                'cpus': format_cpus(current),
+                'pinned': pinned
+            }
+        return current
+
+    def describe(self):
+        """Format the applied layout as one line per role."""
+        with self.lock:
+            lines = [f"Runtime profile '{self.name}': OpenCV threads {self.layout['cv_threads']}"]
+            for role in ROLES:
+                entry = self.layout['threads'].get(role)
+                if entry is None:
+                    continue
+                state = "pinned" if entry['pinned'] else "unpinned"
+                lines.append(f"  {role:<10} {entry['thread']} (tid {entry['native_id']}): "
+                             f"CPUs {entry['cpus']} ({state}, requested {entry['requested']})")
+        return "\n".join(lines)
+
+
+def builtin_profiles(cpus=None):
+    """Profiles for the CPUs this process may use.
+
+    - default: change nothing
+    - cv1: OpenCV runs single-threaded, nothing pinned
+    - split: capture, render and inference on separate cores (inference
+      gets every core from the third on)
+    - shared: capture and render share the first core, inference gets the rest
+
+    Args:
+        cpus: CPU set to lay the profiles out on (defaults to available_cpus())
+
+    Returns:
+        dict: Name -> RuntimeProfile
+    """
+    cpus = sorted(cpus if cpus is not None else available_cpus())
+    profiles = {
+        'default': RuntimeProfile('default'),
+        'cv1': RuntimeProfile('cv1', cv_threads=1),
+    }
+    if len(cpus) >= 3:
+        profiles['split'] = RuntimeProfile('split', cv_threads=1, capture_cpus={cpus[0]},
+                                           render_cpus={cpus[1]}, inference_cpus=set(cpus[2:]))
+    if len(cpus) >= 2:
+        profiles['shared'] = RuntimeProfile('shared', cv_threads=1, capture_cpus={cpus[0]},
+                                            render_cpus={cpus[0]}, inference_cpus=set(cpus[1:]))
+    return profiles
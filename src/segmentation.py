@@ -0,0 +1,160 @@
+"""
+Background blur and replacement from a selfie segmentation mask.
+
+Segmentation runs on a small copy of the frame (256 pixels wide by
+default). The model works at 256x144 anyway, so a full-size input would
+only be shrunk inside the graph and its mask scaled back up to full size.
+The low-resolution mask is feathered while it is still small, upsampled
+once into a preallocated float buffer, and the frame is blended with the
+background in place with cv2.blendLinear. Every full-size buffer is
+allocated once per frame size and then reused.
+
+The upsampled mask is cached: while the motion gate reuses the previous
+inference result (the very same mask array), feathering and upsampling
+are skipped too.
+"""
+import cv2
+import numpy as np
+
+EFFECTS = ('blur', 'replace')
+
+
+class BackgroundCompositor:
+    """Blurs or replaces the background of frames given a person mask."""
+
+    def __init__(self, inference_width=256, feather=5, effect='blur', blur_scale=8,
+                 background=None):
+        """
+        Args:
+            inference_width: Width of the frame copy segmentation runs on
+            feather: Gaussian kernel size (low-resolution pixels) softening
+                     the mask edge; 0 disables feathering
+            effect: 'blur' or 'replace'
+            blur_scale: The blurred background is computed at 1/blur_scale
+                        of the frame size and scaled back up
+            background: BGR image shown behind the person with 'replace'
+                        (flat gray without one)
+        """
+        self.inference_width = inference_width
+        self.feather = feather | 1 if feather else 0
+        self.blur_scale = blur_scale
+        self.set_effect(effect)
+        self.set_background(background)
+
+        self._small = None
+        self._feathered = None
+        self._mask = None
+        self._inverse = None
+        self._background = None
+        self._tiny = None
+        self._mask_source = None
+
+        # Accounting
+        self.mask_updates = 0
+        self.mask_reuses = 0
+
+    def set_effect(self, effect):
+        """Switch between 'blur' and 'replace'."""
+        if effect not in EFFECTS:
+            raise ValueError(f"Unknown background effect: {effect}")
+        self.effect = effect
+        self._background_ready = False
+
+    def set_background(self, image):
+        """Set the replacement background (BGR image, or None for flat gray)."""
+        self.background = image
+        self._background_ready = False
+
+    def input_size(self, image):
+        """Size (width, height) of the frame copy segmentation runs on."""
+        h, w = image.shape[:2]
+        width = min(w, self.inference_width)
+        return width, max(1, round(width * h / w))
+
+    def prepare(self, image, pool):
+        """Shrink a BGR frame and convert it to RGB for segmentation.
+
+        Args:
+            image: BGR frame
+            pool: BufferPool the RGB buffer is borrowed from (release it after inference)
+
+        Returns:
+            np.ndarray: Small RGB frame
+        """
+        w, h = self.input_size(image)
+        if self._small is None or self._small.shape[:2] != (h, w):
+            self._small = np.empty((h, w, 3), dtype=np.uint8)
+        # INTER_LINEAR: INTER_AREA costs ten times more at non-integer scales
+        cv2.resize(image, (w, h), dst=self._small, interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=pool.acquire((h, w, 3)))
+
+    def _allocate(self, shape):
+        h, w = shape[:2]
+        if self._mask is not None and self._mask.shape == (h, w):
+            return
+        tiny = (max(1, h // self.blur_scale), max(1, w // self.blur_scale), 3)
+        self._mask = np.empty((h, w), dtype=np.float32)
+        self._inverse = np.empty((h, w), dtype=np.float32)
+        self._background = np.empty((h, w, 3), dtype=np.uint8)
+        self._tiny = np.empty(tiny, dtype=np.uint8)
+        self._mask_source = None
+        self._background_ready = False
+
+    def _update_mask(self, mask):
+        if mask is self._mask_source:
+            self.mask_reuses += 1
+            return
+        # Keep a reference to the source so a reused result is recognized
+        self._mask_source = mask
+        h, w = self._mask.shape
+        if self.feather:
+            if self._feathered is None or self._feathered.shape != mask.shape:
+                self._feathered = np.empty(mask.shape, dtype=np.float32)
+            cv2.GaussianBlur(mask, (self.feather, self.feather), 0, dst=self._feathered)
+            mask = self._feathered
+        cv2.resize(mask, (w, h), dst=self._mask, interpolation=cv2.INTER_LINEAR)
+        np.subtract(1.0, self._mask, out=self._inverse)
+        self.mask_updates += 1
+
+    def _update_background(self, image):
+        h, w = image.shape[:2]
+        if self.effect == 'blur':
+            # Blur a tiny copy and scale it back up: far cheaper than a
+            # large-kernel blur at full size and just as soft
+            th, tw = self._tiny.shape[:2]
+            cv2.resize(image, (tw, th), dst=self._tiny, interpolation=cv2.INTER_LINEAR)
+            cv2.GaussianBlur(self._tiny, (5, 5), 0, dst=self._tiny)
+            cv2.resize(self._tiny, (w, h), dst=self._background, interpolation=cv2.INTER_LINEAR)
+        elif not self._background_ready:
+            # A replacement background only changes with the frame size
+            if self.background is None:
+                self._background.fill(128)
+            else:
+                cv2.resize(self.background, (w, h), dst=self._background,
+                           interpolation=cv2.INTER_AREA)
+            self._background_ready = True
+
+    def composite(self, image, mask):
+        """Replace or blur the background of a frame in place.
+
+        Args:
+            image: BGR frame, modified in place
+            mask: Low-resolution float32 person mask (1 on the person)
+
+        Returns:
+            np.ndarray: The same frame
+        """
+        self._allocate(image.shape)
+        self._update_mask(mask)
+        self._update_background(image)
+        cv2.blendLinear(image, self._background, self._mask, self._inverse, dst=image)
+        return image
+
+    def get_stats(self):
+        """Return how often the upsampled mask was recomputed or reused."""
+        total = self.mask_updates + self.mask_reuses
+        return {
+            'mask_updates': self.mask_updates,
+            'mask_reuses': self.mask_reuses,
+            'reuse_ratio': self.mask_reuses / total if total else 0.0
+        }
@@ -0,0 +1,117 @@
+"""
+Startup profiling and background loading of the vision processor.
+
+Nothing in this module imports MediaPipe, so the webcam preview can be
+shown while the heavy imports and graph construction run on a
+background thread.
+"""
+import threading
+import time
+
+
+class StartupProfiler:
+    """Records named startup milestones and durations."""
+
+    def __init__(self, start_time=None):
+        """
+        Args:
+            start_time: time.perf_counter() value treated as time zero
+                        (defaults to now)
+        """
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.milestones = {}
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        """Record the first time a milestone is reached (seconds since start)."""
+        with self.lock:
+            if name not in self.milestones:
+                self.milestones[name] = time.perf_counter() - self.start_time
+
+    def record(self, name, seconds):
+        """Record the duration of a startup step."""
+        with self.lock:
+            self.durations[name] = seconds
+
+    def time(self, name):
+        """Context manager that records the duration of the enclosed block."""
+        return _Timed(self, name)
+
+    def report(self):
+        """Format the collected timings as a human readable report."""
+        with self.lock:
+            lines = ["Startup profile:"]
+            for name, seconds in self.durations.items():
+                lines.append(f"  {name:<28} {seconds * 1000:8.1f} ms")
+            for name, seconds in sorted(self.milestones.items(), key=lambda item: item[1]):
+                lines.append(f"  {name:<28} @ {seconds * 1000:6.1f} ms")
+        return "\n".join(lines)
+
+
+class _Timed:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class ProcessorLoader:
+    """Imports and constructs a VisionProcessor on a background thread.
+
+    `processor` stays None until the processor object exists; each mode's
+    graph then becomes usable as soon as its own ready event is set (see
+    VisionProcessor.is_ready).
+    """
+
+    def __init__(self, profiler=None, first_mode='none', runtime_profile=None, **processor_kwargs):
+        """
+        Args:
+            profiler: StartupProfiler to record timings into
+            first_mode: Mode whose graph should be warmed up first
+            runtime_profile: Optional RuntimeProfile; the loader thread pins
+                             itself to the 'inference' CPUs before building
+                             the graphs, so MediaPipe's threads start there
+            **processor_kwargs: Passed to VisionProcessor
+        """
+        self.profiler = profiler or StartupProfiler()
+        self.runtime_profile = runtime_profile
+        self.first_mode = first_mode
+        self.processor_kwargs = processor_kwargs
+        self.processor = None
+        self.error = None
+        self.loaded = threading.Event()
+
+    def start(self):
+        """Start loading on a daemon thread."""
+        t = threading.Thread(target=self._load, args=(), name="processor-loader")
+        t.daemon = True
+        t.start()
+        return self
+
+    def _load(self):
+        try:
+            if self.runtime_profile is not None:
+                self.runtime_profile.pin('inference')
+            with self.profiler.time('import processor'):
+                from .processor import VisionProcessor
+
+            with self.profiler.time('construct processor'):
+                processor = VisionProcessor(lazy_graphs=True, **self.processor_kwargs)
+            self.processor = processor
+            self.loaded.set()
+            self.profiler.mark('processor ready')
+
+            processor.warm_up(first_mode=self.first_mode, profiler=self.profiler)
+            # Graphs left out of the warm-up are built here when first needed
+            processor.serve_lazy_builds(profiler=self.profiler)
+        except Exception as e:
+            self.error = e
+            self.loaded.set()
@@ -0,0 +1,212 @@
+"""
+Single-stroke handwriting recognition for air-written strokes.
+
+Each completed stroke is resampled to a fixed number of points spaced
+evenly along its path, centred and scaled to a unit vector, then matched
+against every template at once in the style of the $1 / Protractor
+recognisers: the best rotation for each template has a closed form, so
+scoring all templates is two matrix-vector products. Rotation is limited
+to a small range because orientation matters for letters and digits
+(a '1' is not a horizontal line).
+
+Recognition runs on a worker thread; results are collected as events
+with poll() from the frame loop.
+"""
+import math
+import queue
+import threading
+import time
+import numpy as np
+
+NUM_POINTS = 64
+
+
+def _arc(cx, cy, rx, ry, start_deg, end_deg, steps=32):
+    angles = np.radians(np.linspace(start_deg, end_deg, steps))
+    return list(zip(cx + rx * np.cos(angles), cy + ry * np.sin(angles)))
+
+
+# Built-in single-stroke templates in a unit box (x right, y down), drawn
+# the way they are usually written. Reversed copies are added automatically.
+DEFAULT_TEMPLATES = {
+    '0': _arc(0.5, 0.5, 0.3, 0.5, -90, -450),
+    '1': [(0.5, 0.0), (0.5, 1.0)],
+    '2': [(0.1, 0.25), (0.3, 0.02), (0.7, 0.02), (0.85, 0.25), (0.1, 1.0), (0.9, 1.0)],
+    '3': [(0.1, 0.1), (0.5, 0.0), (0.85, 0.2), (0.5, 0.5), (0.85, 0.75), (0.5, 1.0), (0.1, 0.9)],
+    '4': [(0.7, 1.0), (0.7, 0.0), (0.05, 0.7), (0.95, 0.7)],
+    '5': [(0.85, 0.0), (0.2, 0.0), (0.15, 0.45), (0.6, 0.4), (0.85, 0.65), (0.6, 1.0), (0.1, 0.9)],
+    '6': [(0.8, 0.0), (0.3, 0.3), (0.15, 0.7), (0.4, 1.0), (0.75, 0.85), (0.7, 0.55),
+          (0.35, 0.55), (0.15, 0.7)],
+    '7': [(0.1, 0.0), (0.9, 0.0), (0.4, 1.0)],
+    '8': [(0.5 + 0.3 * math.sin(t), 0.5 - 0.5 * math.sin(t) * math.cos(t) * 1.9)
+          for t in np.linspace(0, 2 * math.pi, 48)],
+    '9': [(0.8, 0.3), (0.5, 0.05), (0.2, 0.25), (0.45, 0.5), (0.8, 0.3), (0.75, 1.0)],
+    'C': _arc(0.5, 0.5, 0.4, 0.5, -45, -315),
+    'L': [(0.1, 0.0), (0.1, 1.0), (0.8, 1.0)],
+    'M': [(0.0, 1.0), (0.1, 0.0), (0.5, 0.6), (0.9, 0.0), (1.0, 1.0)],
+    'N': [(0.1, 1.0), (0.1, 0.0), (0.9, 1.0), (0.9, 0.0)],
+    'S': [(0.85, 0.1), (0.5, 0.0), (0.15, 0.2), (0.5, 0.5), (0.85, 0.75), (0.5, 1.0), (0.1, 0.9)],
+    'U': [(0.1, 0.0), (0.1, 0.7), (0.3, 1.0), (0.7, 1.0), (0.9, 0.7), (0.9, 0.0)],
+    'V': [(0.0, 0.0), (0.5, 1.0), (1.0, 0.0)],
+    'W': [(0.0, 0.0), (0.25, 1.0), (0.5, 0.3), (0.75, 1.0), (1.0, 0.0)],
+    'Z': [(0.1, 0.0), (0.9, 0.0), (0.1, 1.0), (0.9, 1.0)],
+    'circle': _arc(0.5, 0.5, 0.5, 0.5, -90, -450),
+    'triangle': [(0.5, 0.0), (0.0, 1.0), (1.0, 1.0), (0.5, 0.0)],
+    'rectangle': [(0.0, 0.0), (0.0, 0.7), (1.0, 0.7), (1.0, 0.0), (0.0, 0.0)],
+    'check': [(0.0, 0.6), (0.35, 1.0), (1.0, 0.0)],
+    'line': [(0.0, 0.5), (1.0, 0.5)],
+}
+
+
+def resample(points, n=NUM_POINTS):
+    """Resample a polyline to n points evenly spaced along its length.
+
+    Args:
+        points: (M, 2) array-like of x, y
+        n: Number of output points
+
+    Returns:
+        np.ndarray: (n, 2) float64 points
+    """
+    points = np.asarray(points, dtype=np.float64)
+    segment = np.hypot(*np.diff(points, axis=0).T)
+    distance = np.concatenate([[0.0], np.cumsum(segment)])
+    if distance[-1] == 0:
+        return np.repeat(points[:1], n, axis=0)
+    targets = np.linspace(0.0, distance[-1], n)
+    return np.stack([np.interp(targets, distance, points[:, 0]),
+                     np.interp(targets, distance, points[:, 1])], axis=1)
+
+
+def normalize_stroke(points, n=NUM_POINTS, aspect_ratio=1.0):
+    """Turn a stroke into a unit-length vector for matching.
+
+    Args:
+        points: (M, 2) normalized x, y of the stroke
+        n: Number of resampled points
+        aspect_ratio: Frame width / height, so strokes keep their drawn shape
+
+    Returns:
+        np.ndarray: (n, 2) centred points scaled so the flattened vector has unit length
+    """
+    points = np.asarray(points, dtype=np.float64) * (aspect_ratio, 1.0)
+    points = resample(points, n)
+    points -= points.mean(axis=0)
+    norm = np.linalg.norm(points)
+    return points / norm if norm > 0 else points
+
+
+class StrokeRecognizer:
+    """Matches strokes against templates, optionally on a worker thread."""
+
+    def __init__(self, templates=None, num_points=NUM_POINTS, max_rotation=25.0, min_score=0.85,
+                 min_points=8):
+        """
+        Args:
+            templates: Label -> list of (x, y) points; defaults to DEFAULT_TEMPLATES
+            num_points: Points every stroke is resampled to
+            max_rotation: Largest rotation (degrees) allowed when matching
+            min_score: Cosine similarity below which a stroke is 'unknown'
+            min_points: Strokes with fewer raw points are ignored
+        """
+        self.num_points = num_points
+        self.max_rotation = math.radians(max_rotation)
+        self.min_score = min_score
+        self.min_points = min_points
+
+        self.labels = []
+        self._tx = np.empty((0, num_points))
+        self._ty = np.empty((0, num_points))
+        for label, points in (templates or DEFAULT_TEMPLATES).items():
+            self.add_template(label, points)
+
+        self._queue = queue.Queue(maxsize=16)
+        self._events = queue.Queue()
+        self._thread = None
+
+    def add_template(self, label, points):
+        """Add a template and its reversed copy (strokes drawn the other way round)."""
+        for variant in (points, list(points)[::-1]):
+            vector = normalize_stroke(variant, self.num_points)
+            self.labels.append(label)
+            self._tx = np.vstack([self._tx, vector[:, 0]])
+            self._ty = np.vstack([self._ty, vector[:, 1]])
+
+    def recognize(self, points, aspect_ratio=1.0):
+        """Recognize one stroke.
+
+        Args:
+            points: (M, 2) normalized x, y of the stroke
+            aspect_ratio: Frame width / height
+
+        Returns:
+            tuple: (label, score) with label 'unknown' below min_score
+        """
+        if len(points) < self.min_points:
+            return 'unknown', 0.0
+        vector = normalize_stroke(points, self.num_points, aspect_ratio)
+        x, y = vector[:, 0], vector[:, 1]
+
+        # Protractor: for template g the best rotation is atan(b / a)
+        a = self._tx @ x + self._ty @ y
+        b = self._tx @ y - self._ty @ x
+        theta = np.clip(np.arctan2(b, a), -self.max_rotation, self.max_rotation)
+        scores = a * np.cos(theta) + b * np.sin(theta)
+
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.min_score:
+            return 'unknown', score
+        return self.labels[best], score
+
+    def start(self):
+        """Start the worker thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(), name="stroke-recognizer")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def submit(self, points, timestamp=None, aspect_ratio=1.0):
+        """Queue a completed stroke for recognition without blocking.
+
+        Returns:
+            bool: False if the worker is too far behind and the stroke was dropped
+        """
+        self.start()
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        try:
+            self._queue.put_nowait((list(points), timestamp, aspect_ratio, time.perf_counter()))
+            return True
+        except queue.Full:
+            return False
+
+    def poll(self):
+        """Return the recognition events finished since the last call.
+
+        Returns:
+            list: Dicts with label, score, timestamp (of the stroke end),
+                  latency_ms (submission to result) and bbox (x0, y0, x1, y1
+                  in the stroke's coordinates)
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _run(self):
+        while True:
+            points, timestamp, aspect_ratio, submitted = self._queue.get()
+            label, score = self.recognize(points, aspect_ratio)
+            xy = np.asarray(points)
+            self._events.put({
+                'label': label,
+                'score': score,
+                'timestamp': timestamp,
+                'latency_ms': (time.perf_counter() - submitted) * 1000,
+                'bbox': (float(xy[:, 0].min()), float(xy[:, 1].min()),
+                         float(xy[:, 0].max()), float(xy[:, 1].max()))
+            })
@@ -0,0 +1,220 @@
+"""
+MediaPipe Tasks inference backend running in LIVE_STREAM mode.
+
+Frames are submitted with `detect_async` and results arrive on MediaPipe's
+own threads through result callbacks, so capture and rendering never wait
+for inference. Each call returns the most recent result available, which
+is usually that of the previous frame.
+
+Results are converted to the same shape as the legacy `mp.solutions`
+results (multi_hand_landmarks, multi_handedness, multi_face_landmarks,
+pose_landmarks, segmentation_mask, multi_pose_landmarks) so the rest of the pipeline does not care which backend
+produced them.
+"""
+import threading
+from types import SimpleNamespace
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+from mediapipe.tasks.python import BaseOptions
+from mediapipe.tasks.python import vision
+from .inference import InferenceBackend, make_multi_pose_result
+from .model_cache import DEFAULT_MODEL_DIR, load_model
+from .multi_pose import PersonTracker, landmark_box
+
+
+def _to_landmark_list(landmarks):
+    """Convert a list of Tasks NormalizedLandmark to a NormalizedLandmarkList proto."""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for lm in landmarks:
+        proto = landmark_list.landmark.add()
+        proto.x, proto.y, proto.z = lm.x, lm.y, lm.z
+        if lm.visibility is not None:
+            proto.visibility = lm.visibility
+        if lm.presence is not None:
+            proto.presence = lm.presence
+    return landmark_list
+
+
+def _to_classification_list(categories):
+    """Convert a list of Tasks Category to a ClassificationList proto."""
+    classification_list = classification_pb2.ClassificationList()
+    for category in categories:
+        proto = classification_list.classification.add()
+        proto.index = category.index
+        proto.score = category.score
+        proto.label = category.category_name or ''
+    return classification_list
+
+
+def _convert_hands(result):
+    if not result.hand_landmarks:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    return SimpleNamespace(
+        multi_hand_landmarks=[_to_landmark_list(hand) for hand in result.hand_landmarks],
+        multi_handedness=[_to_classification_list(hand) for hand in result.handedness])
+
+
+def _convert_face(result):
+    if not result.face_landmarks:
+        return SimpleNamespace(multi_face_landmarks=None)
+    return SimpleNamespace(multi_face_landmarks=[_to_landmark_list(face) for face in result.face_landmarks])
+
+
+def _convert_pose(result):
+    if not result.pose_landmarks:
+        return SimpleNamespace(pose_landmarks=None)
+    return SimpleNamespace(pose_landmarks=_to_landmark_list(result.pose_landmarks[0]))
+
+
+def _convert_segment(result):
+    if not result.confidence_masks:
+        return SimpleNamespace(segmentation_mask=None)
+    # The selfie segmenter has a single (person) output; the view belongs
+    # to MediaPipe and is only valid inside the callback
+    return SimpleNamespace(segmentation_mask=result.confidence_masks[0].numpy_view().copy())
+
+
+def _convert_multipose(result, tracker):
+    poses, boxes = [], []
+    for landmarks in result.pose_landmarks or []:
+        points = np.array([(lm.x, lm.y, lm.z, lm.visibility or 0.0) for lm in landmarks],
+                          dtype=np.float32)
+        box = landmark_box(points)
+        if box is not None:
+            poses.append(points)
+            boxes.append(box)
+    # The landmarker has no notion of identity; match people to IDs by box overlap
+    ids, _ = tracker.update(np.array(boxes))
+    kept = [i for i, person_id in enumerate(ids) if person_id is not None]
+    return make_multi_pose_result([poses[i] for i in kept], [ids[i] for i in kept],
+                                  [tuple(boxes[i]) for i in kept])
+
+
+class TasksBackend(InferenceBackend):
+    """Asynchronous HandLandmarker / FaceLandmarker / PoseLandmarker / ImageSegmenter inference."""
+
+    name = 'tasks'
+
+    # Model registry key and result converter for each graph
+    GRAPHS = {
+        'hands': ('hand_landmarker', _convert_hands),
+        'face': ('face_landmarker', _convert_face),
+        'pose': ('pose_landmarker', _convert_pose),
+        'segment': ('selfie_segmenter', _convert_segment),
+        'multipose': ('pose_landmarker', _convert_multipose)
+    }
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, max_num_hands=2, max_num_faces=1,
+                 max_num_people=4):
+        """
+        Args:
+            model_dir: Model cache directory (see download_models.py)
+            max_num_hands: Maximum number of hands to detect
+            max_num_faces: Maximum number of faces to detect
+            max_num_people: Maximum number of people in 'multipose'
+        """
+        self.model_dir = model_dir
+        self.max_num_hands = max_num_hands
+        self.max_num_faces = max_num_faces
+        self.max_num_people = max_num_people
+        self.person_tracker = PersonTracker(max_num_people)
+        self.landmarkers = {}
+        self.latest = {}
+        self.last_timestamp_ms = {}
+        # Graph the last frame went to, and per graph the first frame
+        # timestamp whose result may be shown (older ones predate a switch)
+        self.running = None
+        self.accept_from_ms = {}
+        self.lock = threading.Lock()
+
+    def build(self, name):
+        """Create the landmarker for 'hands', 'face', 'pose' or 'multipose', or the segmenter for 'segment'.
+
+        Raises:
+            ModelCacheError: If the model is missing or fails verification
+        """
+        model_name, convert = self.GRAPHS[name]
+        if name == 'multipose':
+            tracker = self.person_tracker
+            convert = lambda result: _convert_multipose(result, tracker)
+        base_options = BaseOptions(model_asset_buffer=load_model(model_name, self.model_dir))
+        callback = self._make_callback(name, convert)
+        live = vision.RunningMode.LIVE_STREAM
+
+        if name == 'hands':
+            options = vision.HandLandmarkerOptions(
+                base_options=base_options, running_mode=live, num_hands=self.max_num_hands,
+                min_hand_detection_confidence=0.5, min_tracking_confidence=0.5,
+                result_callback=callback)
+            landmarker = vision.HandLandmarker.create_from_options(options)
+        elif name == 'face':
+            options = vision.FaceLandmarkerOptions(
+                base_options=base_options, running_mode=live, num_faces=self.max_num_faces,
+                min_face_detection_confidence=0.5, min_tracking_confidence=0.5,
+                result_callback=callback)
+            landmarker = vision.FaceLandmarker.create_from_options(options)
+        elif name == 'segment':
+            options = vision.ImageSegmenterOptions(
+                base_options=base_options, running_mode=live, output_confidence_masks=True,
+                output_category_mask=False, result_callback=callback)
+            landmarker = vision.ImageSegmenter.create_from_options(options)
+        else:
+            # The landmarker finds and follows up to num_poses people itself
+            num_poses = self.max_num_people if name == 'multipose' else 1
+            options = vision.PoseLandmarkerOptions(
+                base_options=base_options, running_mode=live, num_poses=num_poses,
+                min_pose_detection_confidence=0.5, min_tracking_confidence=0.5,
+                result_callback=callback)
+            landmarker = vision.PoseLandmarker.create_from_options(options)
+
+        self.landmarkers[name] = landmarker
+        self.latest[name] = None
+        self.last_timestamp_ms[name] = -1
+        self.accept_from_ms[name] = 0
+        return landmarker
+
+    def _make_callback(self, name, convert):
+        def on_result(result, output_image, timestamp_ms):
+            # Runs on a MediaPipe thread; convert here to keep the main loop light
+            converted = convert(result)
+            with self.lock:
+                if timestamp_ms >= self.accept_from_ms[name]:
+                    self.latest[name] = converted
+        return on_result
+
+    def process(self, name, image_rgb, timestamp):
+        """Submit a frame and return the most recent available result.
+
+        Args:
+            name: 'hands', 'face', 'pose', 'segment' or 'multipose'
+            image_rgb: RGB frame
+            timestamp: Capture time in seconds (must increase between calls)
+
+        Returns:
+            Result object in the legacy mp.solutions shape, or None until
+            the first result for a frame submitted since the last switch to
+            this graph has arrived
+        """
+        # LIVE_STREAM mode requires strictly increasing millisecond timestamps
+        timestamp_ms = max(int(timestamp * 1000), self.last_timestamp_ms[name] + 1)
+        self.last_timestamp_ms[name] = timestamp_ms
+
+        if name != self.running:
+            # A result from before the switch would show a stale scene
+            with self.lock:
+                self.latest[name] = None
+                self.accept_from_ms[name] = timestamp_ms
+            self.running = name
+
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+        self.landmarkers[name].detect_async(mp_image, timestamp_ms)
+
+        with self.lock:
+            return self.latest[name]
+
+    def close(self):
+        """Release all landmarkers."""
+        for landmarker in self.landmarkers.values():
+            landmarker.close()
+        self.landmarkers.clear()
@@ -0,0 +1,190 @@
+"""
+Sparse tiled drawing canvas with a pannable, zoomable view.
+
+Ink lives in world coordinates on an unbounded plane split into fixed-size
+tiles. A tile is allocated the first time ink touches it, so memory grows
+with the amount drawn, not with the size of the drawing area or the frame.
+World units do not depend on the camera resolution (the view is
+`reference_width` world units wide at zoom 1), so drawings keep their
+place and size when the resolution changes.
+
+Compositing walks only the tiles that hold ink and intersect the view.
+Each visible tile is scaled to screen size once and cached with its ink
+mask until the tile is drawn on or the zoom changes; a frame then costs
+one masked copy per visible tile.
+"""
+import math
+import cv2
+import numpy as np
+
+TILE_SIZE = 128
+REFERENCE_WIDTH = 1280
+
+
+class TiledCanvas:
+    """Unbounded sparse canvas in world coordinates plus the current view."""
+
+    def __init__(self, tile_size=TILE_SIZE, reference_width=REFERENCE_WIDTH, min_zoom=0.25,
+                 max_zoom=4.0):
+        """
+        Args:
+            tile_size: Side of a tile in world units (pixels at zoom 1 and reference width)
+            reference_width: World units across the view at zoom 1
+            min_zoom: Smallest zoom factor (most of the canvas visible)
+            max_zoom: Largest zoom factor
+        """
+        self.tile_size = tile_size
+        self.reference_width = reference_width
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.tiles = {}
+        self.frame_size = (640, 480)
+        self._scaled = {}
+        self._scaled_for = None
+        self.reset_view()
+
+    # View
+
+    def reset_view(self):
+        """Show the world origin at zoom 1."""
+        self.offset = np.zeros(2)
+        self.zoom = 1.0
+
+    def set_frame_size(self, size):
+        """Set the (width, height) of the frames the view is shown on."""
+        self.frame_size = (int(size[0]), int(size[1]))
+
+    def scale(self):
+        """Frame pixels per world unit."""
+        return self.zoom * self.frame_size[0] / self.reference_width
+
+    def to_world(self, point):
+        """Convert a normalized frame point (0-1) to world coordinates."""
+        w, h = self.frame_size
+        s = self.scale()
+        return (self.offset[0] + point[0] * w / s, self.offset[1] + point[1] * h / s)
+
+    def pan(self, delta):
+        """Move the content with the hand.
+
+        Args:
+            delta: (dx, dy) movement in normalized frame coordinates
+        """
+        w, h = self.frame_size
+        s = self.scale()
+        self.offset -= (delta[0] * w / s, delta[1] * h / s)
+
+    def zoom_at(self, factor, center):
+        """Zoom by a factor keeping the world point under `center` in place.
+
+        Args:
+            factor: Zoom multiplier (>1 zooms in)
+            center: (x, y) in normalized frame coordinates
+        """
+        anchor = self.to_world(center)
+        self.zoom = min(self.max_zoom, max(self.min_zoom, self.zoom * factor))
+        w, h = self.frame_size
+        s = self.scale()
+        self.offset = np.array([anchor[0] - center[0] * w / s, anchor[1] - center[1] * h / s])
+
+    # Ink
+
+    def clear(self):
+        """Drop every tile."""
+        self.tiles.clear()
+        self._scaled.clear()
+
+    def draw_line(self, p1, p2, color, thickness):
+        """Draw a line between two world points.
+
+        Args:
+            p1, p2: (x, y) in world coordinates
+            color: BGR color
+            thickness: Line thickness in frame pixels at the current zoom
+        """
+        t = self.tile_size
+        width = max(1, round(thickness / self.scale()))
+        margin = width // 2 + 1
+        tx0 = math.floor((min(p1[0], p2[0]) - margin) / t)
+        tx1 = math.floor((max(p1[0], p2[0]) + margin) / t)
+        ty0 = math.floor((min(p1[1], p2[1]) - margin) / t)
+        ty1 = math.floor((max(p1[1], p2[1]) + margin) / t)
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                ox, oy = tx * t, ty * t
+                pt1 = (round(p1[0] - ox), round(p1[1] - oy))
+                pt2 = (round(p2[0] - ox), round(p2[1] - oy))
+                # The bounding box can cover tiles the line itself misses;
+                # only tiles the (thick) line reaches get allocated
+                if not cv2.clipLine((-margin, -margin, t + 2 * margin, t + 2 * margin), pt1, pt2)[0]:
+                    continue
+                key = (tx, ty)
+                tile = self.tiles.get(key)
+                if tile is None:
+                    tile = self.tiles[key] = np.zeros((t, t, 3), dtype=np.uint8)
+                cv2.line(tile, pt1, pt2, color, width)
+                cached = self._scaled.get(key)
+                if cached is not None:
+                    cached[2] = True
+
+    def memory_bytes(self):
+        """Bytes held by allocated tiles."""
+        return sum(tile.nbytes for tile in self.tiles.values())
+
+    # Compositing
+
+    def _scaled_tile(self, key, size):
+        """Tile and ink mask resized to (width, height) on screen, cached.
+
+        A cached entry is refreshed in place after the tile is drawn on,
+        so drawing does not allocate new screen-size buffers.
+        """
+        cached = self._scaled.get(key)
+        if cached is None or cached[0].shape[1::-1] != size:
+            w, h = size
+            cached = [np.empty((h, w, 3), dtype=np.uint8), np.empty((h, w), dtype=np.uint8), True]
+            self._scaled[key] = cached
+        image, mask, dirty = cached
+        if dirty:
+            interpolation = cv2.INTER_AREA if size[0] < self.tile_size else cv2.INTER_LINEAR
+            cv2.resize(self.tiles[key], size, dst=image, interpolation=interpolation)
+            cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=mask)
+            cv2.threshold(mask, 1, 255, cv2.THRESH_BINARY, dst=mask)
+            cached[2] = False
+        return image, mask
+
+    def composite(self, frame):
+        """Copy the visible ink over a frame in place.
+
+        Args:
+            frame: BGR frame; also sets the view's frame size
+        """
+        h, w = frame.shape[:2]
+        self.set_frame_size((w, h))
+        s = self.scale()
+        if self._scaled_for != s:
+            self._scaled.clear()
+            self._scaled_for = s
+        t = self.tile_size
+        ox, oy = self.offset
+
+        for key in self.tiles:
+            tx, ty = key
+            # Screen rectangle of the tile; neighbours share rounded edges
+            x0 = round((tx * t - ox) * s)
+            x1 = round(((tx + 1) * t - ox) * s)
+            y0 = round((ty * t - oy) * s)
+            y1 = round(((ty + 1) * t - oy) * s)
+            if x1 <= 0 or y1 <= 0 or x0 >= w or y0 >= h or x1 <= x0 or y1 <= y0:
+                continue
+            image, mask = self._scaled_tile(key, (x1 - x0, y1 - y0))
+            fx0, fy0 = max(x0, 0), max(y0, 0)
+            fx1, fy1 = min(x1, w), min(y1, h)
+            cv2.copyTo(image[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0],
+                       mask[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0],
+                       frame[fy0:fy1, fx0:fx1])
+
+    def get_stats(self):
+        """Return the number of tiles and the memory they hold."""
+        return {'tiles': len(self.tiles), 'bytes': self.memory_bytes(),
+                'zoom': self.zoom, 'offset': (float(self.offset[0]), float(self.offset[1]))}
@@ -0,0 +1,263 @@
+"""
+Span tracing of the per-frame pipeline, exported as Chrome trace JSON.
+
+Spans (name, start, end) are appended to a fixed-size ring owned by the
+thread that records them, so recording never takes a lock and old spans
+are simply overwritten. A dump gathers every thread's ring and writes a
+JSON file that chrome://tracing and https://ui.perfetto.dev open directly,
+with one track per thread.
+
+Tracing is off by default. While it is disabled `span()` returns a shared
+no-op context manager and `@traced` functions call straight through, so
+the instrumentation left in the hot path costs an attribute check per call.
+
+    from src.tracing import TRACER, traced
+
+    with TRACER.span('cvtColor'):
+        ...
+
+    @traced()
+    def draw_overlay(img): ...
+
+    with TRACER.frame(frame_id):         # whole frame, checks the slow-frame trigger
+        ...
+
+    TRACER.enable(slow_frame_ms=50)      # dump automatically after slow frames
+    TRACER.dump('trace.json')            # or on demand
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class _FrameSpan(_Span):
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.end_frame(self.start, self.args)
+        return False
+
+
+class _Ring:
+    """Fixed-size span buffer written by a single thread."""
+
+    def __init__(self, capacity):
+        thread = threading.current_thread()
+        self.thread_name = thread.name
+        self.tid = threading.get_native_id()
+        self.spans = [None] * capacity
+        self.count = 0
+
+    def append(self, span):
+        self.spans[self.count % len(self.spans)] = span
+        self.count += 1
+
+    def snapshot(self):
+        """Copy the spans in recording order (safe while the owner keeps writing)."""
+        count = self.count
+        spans = list(self.spans)
+        if count > len(spans):
+            start = count % len(spans)
+            spans = spans[start:] + spans[:start]
+        return [span for span in spans if span is not None]
+
+
+class Tracer:
+    """Records spans per thread and writes them as Chrome trace JSON."""
+
+    def __init__(self, capacity=20000):
+        """
+        Args:
+            capacity: Spans kept per thread; older spans are overwritten
+        """
+        self.capacity = capacity
+        self.enabled = False
+        self.slow_frame_ms = None
+        self.output_dir = 'traces'
+        self.cooldown = 5.0
+        self.dumps = []
+
+        self._local = threading.local()
+        self._rings = []
+        self._rings_lock = threading.Lock()
+        self._last_slow_dump = float('-inf')
+
+    def enable(self, slow_frame_ms=None, output_dir='traces', cooldown=5.0):
+        """Start recording spans.
+
+        Args:
+            slow_frame_ms: Dump a trace automatically when a frame span takes
+                           longer than this (None: only dump on demand)
+            output_dir: Directory for automatic and unnamed dumps
+            cooldown: Minimum seconds between two automatic dumps
+        """
+        self.slow_frame_ms = slow_frame_ms
+        self.output_dir = output_dir
+        self.cooldown = cooldown
+        self.enabled = True
+        return self
+
+    def disable(self):
+        """Stop recording spans (the rings keep what they hold)."""
+        self.enabled = False
+
+    def _ring(self):
+        ring = getattr(self._local, 'ring', None)
+        if ring is None:
+            ring = _Ring(self.capacity)
+            self._local.ring = ring
+            # Only registration takes a lock, once per thread
+            with self._rings_lock:
+                self._rings.append(ring)
+        return ring
+
+    def record(self, name, start, end, args=None):
+        """Record a finished span (perf_counter seconds) on the calling thread's ring."""
+        if self.enabled:
+            self._ring().append((name, start, end, args))
+
+    def span(self, name, args=None):
+        """Context manager timing the enclosed block.
+
+        Args:
+            name: Span name
+            args: Optional dict shown with the span in the trace viewer
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def frame(self, frame_id=None):
+        """Context manager for one whole frame; checks the slow-frame trigger when it ends."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _FrameSpan(self, 'frame', {'frame': frame_id} if frame_id is not None else None)
+
+    def end_frame(self, start, args=None):
+        """Record a frame span that started at `start` and ends now.
+
+        For loops with several exits, where a `with frame()` block does
+        not fit. Dumps a trace in the background if the frame was slow.
+        """
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        self.record('frame', start, end, args)
+        if self.slow_frame_ms is None or (end - start) * 1000 < self.slow_frame_ms:
+            return
+        if end - self._last_slow_dump < self.cooldown:
+            return
+        self._last_slow_dump = end
+        # Copy the rings now, while the slow frame is still in them; format
+        # and write on another thread so the frame loop is not held up
+        snapshot = self._snapshot()
+        name = f"slow_frame_{time.strftime('%Y%m%d_%H%M%S')}_{(end - start) * 1000:.0f}ms.json"
+        path = os.path.join(self.output_dir, name)
+        t = threading.Thread(target=lambda: self._write(path, self.events(snapshot)),
+                             name="trace-writer")
+        t.daemon = True
+        t.start()
+
+    def _snapshot(self):
+        with self._rings_lock:
+            rings = list(self._rings)
+        return [(ring.tid, ring.thread_name, ring.snapshot()) for ring in rings]
+
+    def events(self, snapshot=None):
+        """Return every recorded span as Chrome trace events.
+
+        Args:
+            snapshot: Ring contents taken earlier (defaults to the current contents)
+        """
+        pid = os.getpid()
+        events = []
+        for tid, thread_name, spans in snapshot if snapshot is not None else self._snapshot():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+            for name, start, end, args in spans:
+                event = {'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                         'ts': start * 1e6, 'dur': (end - start) * 1e6}
+                if args:
+                    event['args'] = args
+                events.append(event)
+        return events
+
+    def dump(self, path=None):
+        """Write the recorded spans to a Chrome trace JSON file.
+
+        Args:
+            path: Output file (defaults to a timestamped file in output_dir)
+
+        Returns:
+            str: Path written
+        """
+        if path is None:
+            path = os.path.join(self.output_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        return self._write(path, self.events())
+
+    def _write(self, path, events):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        self.dumps.append(path)
+        return path
+
+
+# Shared tracer used by the instrumented modules
+TRACER = Tracer()
+
+
+def traced(name=None):
+    """Decorator recording a span for every call while TRACER is enabled.
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+    """
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                TRACER.record(span_name, start, time.perf_counter())
+        return wrapper
+    return decorate
@@ -1,5 +1,7 @@
 import time
 import cv2
+import numpy as np
+from .tracing import traced
 
 class FPSMeter:
     def __init__(self):
@@ -16,6 +18,23 @@ class FPSMeter:
         return int(self.fps)
 
 
+def landmarks_to_array(landmark_list, out=None):
+    """Copy MediaPipe landmarks into an (N, 3) float32 array of x, y, z.
+
+    Args:
+        landmark_list: MediaPipe NormalizedLandmarkList
+        out: Optional preallocated (N, 3) array to fill
+
+    Returns:
+        np.ndarray: Landmark coordinates
+    """
+    coords = [(lm.x, lm.y, lm.z) for lm in landmark_list.landmark]
+    if out is None:
+        return np.array(coords, dtype=np.float32)
+    out[:] = coords
+    return out
+
+
 class VolumeBarDrawer:
     """Draws a volume bar with percentage display."""
     
@@ -24,6 +43,7 @@ class VolumeBarDrawer:
         self.height = height
         self.padding = padding
     
+    @traced()
     def draw(self, img, volume_level):
         """Draw volume bar on image.
         
@@ -87,6 +107,7 @@ class VolumeBarDrawer:
         
         cv2.putText(img, text, (text_x, text_y), font, font_scale, (255, 255, 255), thickness)
 
+@traced()
 def draw_text_with_background(img, text, pos, font_scale=0.8, thickness=2, text_color=(255, 255, 255), bg_color=(0, 0, 0), padding=5):
     """Draws text with a background rectangle for better visibility."""
     font = cv2.FONT_HERSHEY_SIMPLEX
@@ -96,6 +117,7 @@ def draw_text_with_background(img, text, pos, font_scale=0.8, thickness=2, text_
     cv2.putText(img, text, (x, y), font, font_scale, text_color, thickness)
 
 
+@traced()
 def draw_rotation_indicator(img, wrist_pos, middle_mcp_pos, rotation_direction='none'):
     """Draw a line showing palm orientation and rotation direction.
     
@@ -146,6 +168,7 @@ def draw_rotation_indicator(img, wrist_pos, middle_mcp_pos, rotation_direction='
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
 
 
+@traced()
 def draw_gesture_status(img, rotation_direction, palm_angle=0, pos=(20, 120)):
     """Draw gesture control status indicator.
     
@@ -168,6 +191,122 @@ def draw_gesture_status(img, rotation_direction, palm_angle=0, pos=(20, 120)):
     draw_text_with_background(img, status_text, pos, bg_color=(0, 0, 0), text_color=color)
 
 
+@traced()
+def draw_gesture_event(img, gesture_name, pos=(20, 160)):
+    """Draw the name of a recognized dynamic gesture.
+    
+    Args:
+        img: Image to draw on
+        gesture_name: Gesture name, e.g. 'swipe_left'
+        pos: Position (x, y) for the text
+    """
+    text = f"Gesture: {gesture_name.replace('_', ' ').upper()}"
+    draw_text_with_background(img, text, pos, bg_color=(0, 0, 0), text_color=(255, 0, 255))
+
+
+@traced()
+def draw_hand_label(img, label, wrist_pos, hand_id=None):
+    """Draw a pose label just below the wrist.
+    
+    Args:
+        img: Image to draw on
+        label: Text to draw
+        wrist_pos: Tuple (x, y) in normalized coordinates (0-1)
+        hand_id: Optional tracked hand ID shown before the label
+    """
+    h, w = img.shape[:2]
+    x = int(wrist_pos[0] * w) - 40
+    y = min(h - 10, int(wrist_pos[1] * h) + 40)
+    color = (128, 128, 128) if label == 'unknown' else (0, 255, 255)
+    text = label.upper() if hand_id is None else f"{hand_id}: {label.upper()}"
+    draw_text_with_background(img, text, (max(10, x), y), font_scale=0.7,
+                              text_color=color, bg_color=(0, 0, 0))
+
+
+@traced()
+def draw_face_metrics(img, metrics, pos=(20, 120)):
+    """Draw eye, mouth and head-pose metrics of one face.
+    
+    Args:
+        img: Image to draw on
+        metrics: Dictionary from FaceAnalyzer.analyze
+        pos: Position (x, y) of the first line
+    """
+    x, y = pos
+    eyes = "CLOSED" if metrics['eyes_closed'] else "open"
+    eye_color = (0, 0, 255) if metrics['blink'] else (255, 255, 255)
+    draw_text_with_background(img, f"EAR: {metrics['ear']:.2f} ({eyes}) | Blinks: {metrics['blinks']}",
+                              (x, y), font_scale=0.6, text_color=eye_color)
+    mouth = "OPEN" if metrics['mouth_open'] else "closed"
+    draw_text_with_background(img, f"Mouth: {metrics['mouth_open_ratio']:.2f} ({mouth})",
+                              (x, y + 30), font_scale=0.6)
+    if metrics['yaw'] is not None:
+        draw_text_with_background(img, f"Yaw {metrics['yaw']:+.0f}  Pitch {metrics['pitch']:+.0f}  "
+                                  f"Roll {metrics['roll']:+.0f}", (x, y + 60), font_scale=0.6)
+
+
+@traced()
+def draw_pose_metrics(img, metrics, pos=(20, 120)):
+    """Draw exercise rep counts and the main joint angles.
+    
+    Args:
+        img: Image to draw on
+        metrics: Dictionary from PoseAnalyzer.update
+        pos: Position (x, y) of the first line
+    """
+    x, y = pos
+    reps = metrics['reps']
+    color = (0, 255, 0) if metrics['completed'] else (255, 255, 255)
+    draw_text_with_background(img, f"Curls L: {reps['left_curl']}  R: {reps['right_curl']} | "
+                              f"Squats: {reps['squat']}", (x, y), font_scale=0.6, text_color=color)
+
+    def fmt(angle):
+        return "--" if angle is None else f"{angle:.0f}"
+
+    angles = metrics['angles']
+    draw_text_with_background(img, f"Elbow L {fmt(angles['left_elbow'])} R {fmt(angles['right_elbow'])} | "
+                              f"Knee L {fmt(angles['left_knee'])} R {fmt(angles['right_knee'])}",
+                              (x, y + 30), font_scale=0.6)
+
+
+# Skeleton color of each person (by ID)
+PERSON_COLORS = [(0, 255, 255), (255, 128, 0), (0, 200, 0), (255, 0, 255), (0, 128, 255), (255, 255, 0)]
+
+
+@traced()
+def draw_multi_pose(img, people, connections, min_visibility=0.5):
+    """Draw the skeletons of several people in one pass.
+    
+    Pixel coordinates and visibility of every landmark of every person are
+    computed at once; each person's bones are then drawn with a single
+    polylines call.
+    
+    Args:
+        img: Image to draw on
+        people: List of (person_id, (33, 4) landmarks x, y, z, visibility)
+        connections: (C, 2) array of landmark index pairs
+        min_visibility: Landmarks below this visibility are not drawn
+    """
+    if not people:
+        return
+    h, w = img.shape[:2]
+    points = np.stack([landmarks for _, landmarks in people])
+    pixels = np.rint(points[..., :2] * (w, h)).astype(np.int32)
+    visible = points[..., 3] >= min_visibility
+    bones = pixels[:, connections]
+    bone_visible = visible[:, connections[:, 0]] & visible[:, connections[:, 1]]
+
+    for i, (person_id, _) in enumerate(people):
+        color = PERSON_COLORS[person_id % len(PERSON_COLORS)]
+        cv2.polylines(img, list(bones[i][bone_visible[i]]), False, color, 2, cv2.LINE_AA)
+        for x, y in pixels[i][visible[i]]:
+            cv2.circle(img, (int(x), int(y)), 3, (255, 255, 255), -1)
+        head_x, head_y = pixels[i, 0]
+        draw_text_with_background(img, f"P{person_id}", (max(10, int(head_x) - 15), max(20, int(head_y) - 30)),
+                                  font_scale=0.6, text_color=color, bg_color=(0, 0, 0))
+
+
+@traced()
 def draw_finger_count(img, total_count, hand_details=None):
     """Draw large finger count display.
     
@@ -192,14 +331,13 @@ def draw_finger_count(img, total_count, hand_details=None):
     y = (h + text_h) // 2
     
     # Draw semi-transparent background
+    # Blending black at 60% only changes the box, so darken that ROI in place
+    # instead of blending a full-size copy of the frame
     padding = 40
-    overlay = img.copy()
-    cv2.rectangle(overlay, 
-                 (x - padding, y - text_h - padding),
-                 (x + text_w + padding, y + padding),
-                 (0, 0, 0),
-                 -1)
-    cv2.addWeighted(overlay, 0.6, img, 0.4, 0, img)
+    x0, y0 = max(0, x - padding), max(0, y - text_h - padding)
+    x1, y1 = min(w, x + text_w + padding + 1), min(h, y + padding + 1)
+    roi = img[y0:y1, x0:x1]
+    cv2.convertScaleAbs(roi, dst=roi, alpha=0.4)
     
     # Draw count with gradient color based on number
     if total_count == 0:
@@ -233,6 +371,7 @@ def draw_finger_count(img, total_count, hand_details=None):
             detail_y += 35
 
 
+@traced()
 def draw_air_writing_controls(img):
     """Draw air writing mode controls and instructions.
     
@@ -243,7 +382,8 @@ def draw_air_writing_controls(img):
         "AIR WRITING MODE",
         "Point index finger UP to draw",
         "Fold middle finger DOWN while drawing",
-        "Press 'x' to clear canvas",
+        "Raise index + middle to pan (both hands to zoom)",
+        "Press '+'/'-' to zoom, '0' to reset view, 'x' to clear",
         "Press 'r' for red, 'b' for blue, 'g' for green"
     ]
     
@@ -261,3 +401,23 @@ def draw_air_writing_controls(img):
                                      font_scale=0.6, text_color=(255, 255, 255), 
                                      bg_color=(0, 0, 0))
             y_pos += 30
+
+
+@traced()
+def draw_recognized_text(img, text, last_event=None):
+    """Draw the text recognized from air-written strokes along the bottom.
+    
+    Args:
+        img: Image to draw on
+        text: Recognized text so far
+        last_event: Most recent recognition event, shown with its score
+    """
+    h = img.shape[0]
+    if last_event is not None:
+        label = last_event['label']
+        color = (128, 128, 128) if label == 'unknown' else (0, 255, 255)
+        draw_text_with_background(img, f"Last stroke: {label} ({last_event['score']:.2f})",
+                                  (20, h - 70), font_scale=0.6, text_color=color, bg_color=(0, 0, 0))
+    if text:
+        draw_text_with_background(img, f"Text: {text}", (20, h - 25), font_scale=1.0,
+                                  text_color=(255, 255, 255), bg_color=(0, 0, 0), thickness=2)
@@ -0,0 +1,50 @@
+"""
+Steady-state allocation checks for the per-frame pipeline.
+
+Every mode runs on the fake backend under tracemalloc (the same
+measurement as `benchmark.py --check-allocations`). After the warm-up, a
+frame must not allocate anything the size of a frame, and must not need
+new buffers from the frame pool.
+"""
+import tracemalloc
+import numpy as np
+import pytest
+from benchmark import MODES, make_frame, run_mode
+from src.buffer_pool import FRAME_POOL, BufferPool
+from src.inference import create_backend
+from src.processor import VisionProcessor
+
+WIDTH, HEIGHT = 640, 480
+
+
+@pytest.fixture(scope='module')
+def processor():
+    backend = create_backend('fake', num_hands=2, swap_hands=True, num_people=4)
+    return VisionProcessor(backend=backend, max_num_hands=2, max_num_people=4)
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_steady_state_frames_do_not_allocate(processor, mode):
+    tracemalloc.start()
+    try:
+        report = run_mode(processor, mode, make_frame(WIDTH, HEIGHT), frames=60,
+                          check_allocations=True)
+    finally:
+        tracemalloc.stop()
+    # Anything smaller than one single-channel frame is bookkeeping, not a frame copy
+    assert report['max_peak_bytes'] < WIDTH * HEIGHT
+    assert report['pool_allocations'] == 0
+    assert FRAME_POOL.outstanding == 0
+
+
+def test_release_ignores_foreign_buffers():
+    pool = BufferPool()
+    buffer = pool.acquire((4, 4, 3))
+    pool.release(None)
+    pool.release(np.empty((4, 4, 3), dtype=np.uint8))
+    assert pool.outstanding == 1
+    pool.release(buffer)
+    pool.release(buffer)
+    assert pool.outstanding == 0
+    assert pool.get_stats()['idle'] == 1
+    assert pool.acquire((4, 4, 3)) is buffer